@@ -0,0 +1,144 @@
+"""
+ASGI 负载基准：在 uvicorn 下用保持连接的并发客户端分别请求同步视图和异步视图，输出每秒请求数与 p99 延迟
+
+    pip install uvicorn
+    python benchmarks/async_load.py [-c 64] [-n 5000] [--server http://127.0.0.1:8000]
+
+默认启动 uvicorn 加载 drf_lessions.asgi（使用 settings 中配置的数据库，请先准备好数据）；
+传入 --server 时请求已经运行的服务
+"""
+import argparse
+import asyncio
+import importlib.util
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+# (名称, 同步视图路径, 异步视图路径)
+ENDPOINTS = [
+    ('post list', '/posts/rest/posts/', '/posts/async/rest/posts/'),
+    ('hero list', '/v3/heros/', '/v3/async/heros/'),
+]
+
+
+async def read_response(reader):
+    """读取一个响应，返回 (状态码, 连接是否可以复用)"""
+    head = await reader.readuntil(b'\r\n\r\n')
+    status = int(head.split(b' ', 2)[1])
+    length, chunked = None, False
+    for line in head.split(b'\r\n')[1:]:
+        name, _, value = line.partition(b':')
+        name = name.strip().lower()
+        if name == b'content-length':
+            length = int(value)
+        elif name == b'transfer-encoding' and b'chunked' in value.lower():
+            chunked = True
+    if chunked:
+        while True:
+            size = int((await reader.readline()).split(b';')[0], 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                return status, True
+    if length is None:
+        # 没有长度的流式响应，读到连接关闭为止
+        await reader.read()
+        return status, False
+    await reader.readexactly(length)
+    return status, True
+
+
+async def worker(host, port, request, count, latencies):
+    writer = None
+    try:
+        for _ in range(count):
+            start = time.perf_counter()
+            if writer is None:
+                reader, writer = await asyncio.open_connection(host, port)
+            writer.write(request)
+            status, keep_alive = await read_response(reader)
+            latencies.append(time.perf_counter() - start)
+            assert status == 200, status
+            if not keep_alive:
+                writer.close()
+                writer = None
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+async def load(host, port, path, concurrency, requests):
+    request = (f'GET {path} HTTP/1.1\r\nHost: {host}\r\nAccept: application/json\r\n'
+               f'Connection: keep-alive\r\n\r\n').encode()
+    # 预热：填充对象缓存、响应缓存与编译的 URL 模板
+    await worker(host, port, request, 10, [])
+
+    latencies = []
+    per_worker, extra = divmod(requests, concurrency)
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(host, port, request, per_worker + (index < extra), latencies)
+                           for index in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return len(latencies) / elapsed, latencies[int(len(latencies) * 0.99) - 1] * 1000
+
+
+def start_server(port):
+    process = subprocess.Popen([sys.executable, '-m', 'uvicorn', 'drf_lessions.asgi:application',
+                                '--port', str(port), '--log-level', 'warning', '--no-access-log'],
+                               cwd=BASE_DIR, env=dict(os.environ, DJANGO_SETTINGS_MODULE='drf_lessions.settings'))
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            sys.exit('uvicorn exited with code %s' % process.returncode)
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.2).close()
+            return process
+        except OSError:
+            time.sleep(0.1)
+    process.terminate()
+    sys.exit('uvicorn did not start within 30 seconds')
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-c', '--concurrency', type=int, default=64)
+    parser.add_argument('-n', '--requests', type=int, default=5000)
+    parser.add_argument('--server', help='already running server, e.g. http://127.0.0.1:8000')
+    args = parser.parse_args()
+
+    process = None
+    if args.server:
+        url = urlsplit(args.server)
+        host, port = url.hostname, url.port or 80
+    else:
+        if importlib.util.find_spec('uvicorn') is None:
+            sys.exit('uvicorn is not installed: pip install uvicorn')
+        host, port = '127.0.0.1', free_port()
+        process = start_server(port)
+
+    try:
+        print('%-12s %-6s %10s %10s' % ('endpoint', 'view', 'req/s', 'p99 ms'))
+        for name, sync_path, async_path in ENDPOINTS:
+            for kind, path in (('sync', sync_path), ('async', async_path)):
+                rate, p99 = asyncio.run(load(host, port, path, args.concurrency, args.requests))
+                print('%-12s %-6s %10.1f %10.2f' % (name, kind, rate, p99))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""
+Basic 认证吞吐基准：在测试数据库中创建用户，分别用 DRF 的 BasicAuthentication 与
+CachedBasicAuthentication 反复请求同一个视图，输出每秒请求数
+
+    python benchmarks/basic_auth.py [-n 200]
+"""
+import argparse
+import os
+import sys
+import time
+from base64 import b64encode
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+
+def measure(view, request_factory, header, requests):
+    start = time.perf_counter()
+    for _ in range(requests):
+        response = view(request_factory.get('/v4/basic/', HTTP_AUTHORIZATION=header))
+        assert response.data['user'] == 'bench', response.data
+    return requests / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('-n', '--requests', type=int, default=200)
+    args = parser.parse_args()
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'drf_lessions.settings')
+    import django
+    django.setup()
+
+    from django.contrib.auth.models import User
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+    from rest_framework.authentication import BasicAuthentication
+    from rest_framework.test import APIRequestFactory
+
+    from booktest4.authentication import CachedBasicAuthentication, credentials_cache
+    from booktest4.views import basic_view
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        User.objects.create_user(username='bench', password='bench-password')
+        header = 'Basic ' + b64encode(b'bench:bench-password').decode()
+        request_factory = APIRequestFactory()
+        view_class = basic_view.cls
+
+        results = []
+        for authentication_class in (BasicAuthentication, CachedBasicAuthentication):
+            credentials_cache.clear()
+            view_class.authentication_classes = [authentication_class]
+            results.append((authentication_class.__name__,
+                            measure(view_class.as_view(), request_factory, header, args.requests)))
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    for name, rate in results:
+        print('%-28s %10.1f req/s' % (name, rate))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""
+编译后的序列化器基准：在测试数据库中生成数据，分别用默认的 list() 和 CompiledListModelMixin 请求
+各个列表接口，检查输出完全相同，输出每次请求的耗时
+
+    python benchmarks/compiled_serializer.py [-r 5000] [-n 5]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+
+def measure(view, request, runs):
+    timings, content = [], None
+    for _ in range(runs):
+        start = time.perf_counter()
+        response = view(request)
+        response.render()
+        timings.append((time.perf_counter() - start) * 1000)
+        content = response.content
+    return statistics.median(timings), content
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('-r', '--rows', type=int, default=5000)
+    parser.add_argument('-n', '--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'drf_lessions.settings')
+    import django
+    django.setup()
+
+    from django.contrib.auth.models import Group, User
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+    from rest_framework.mixins import ListModelMixin
+    from rest_framework.test import APIRequestFactory, force_authenticate
+
+    from booktest.models import BookInfo, HeroInfo
+    from booktest2.views import BookInfoViewSet
+    from booktest3.views import HeroModelViewSet
+    from quickstart.views import GroupViewSet
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        BookInfo.objects.bulk_create([BookInfo(btitle=f'book-{i}', bpub_date='1980-01-01', image=f'upload/{i}.png')
+                                      for i in range(args.rows)])
+        book = BookInfo.objects.first()
+        HeroInfo.objects.bulk_create([HeroInfo(hname=f'hero-{i}', hgender=i % 2, hcomment=f'comment-{i}', hbook=book)
+                                      for i in range(args.rows)])
+        Group.objects.bulk_create([Group(name=f'group-{i}') for i in range(args.rows)])
+        user = User.objects.create_user(username='bench')
+
+        factory = APIRequestFactory()
+        results = []
+        for name, viewset, url in [('booktest2 books', BookInfoViewSet, '/v2/books/'),
+                                   ('booktest3 heroes', HeroModelViewSet, '/v3/heros-modelviewset/'),
+                                   ('quickstart groups', GroupViewSet, '/quickstart/groups/')]:
+            request = factory.get(url, HTTP_ACCEPT='application/json')
+            force_authenticate(request, user)
+            compiled = viewset.as_view({'get': 'list'})
+            # 跳过 CompiledListModelMixin.list()，直接调用默认实现
+            default = type(viewset.__name__, (viewset,), {'list': ListModelMixin.list}).as_view({'get': 'list'})
+            default_ms, default_content = measure(default, request, args.runs)
+            compiled_ms, compiled_content = measure(compiled, request, args.runs)
+            assert default_content == compiled_content, name
+            results.append((name, default_ms, compiled_ms))
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    print('%-20s %12s %12s %8s' % ('%d rows' % args.rows, 'default', 'compiled', 'speedup'))
+    for name, default_ms, compiled_ms in results:
+        print('%-20s %10.1fms %10.1fms %7.1fx' % (name, default_ms, compiled_ms, default_ms / compiled_ms))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""
+JSON 渲染、解析基准：在测试数据库中生成文章、代码片段、图书数据，序列化后分别用 DRF 的
+JSONRenderer/JSONParser 与 FastJSONRenderer/FastJSONParser 编码、解码，输出中位耗时
+
+    python benchmarks/json_renderer.py [-r 2000] [-n 10]
+"""
+import argparse
+import io
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+
+def measure(func, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('-r', '--rows', type=int, default=2000)
+    parser.add_argument('-n', '--runs', type=int, default=10)
+    args = parser.parse_args()
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'drf_lessions.settings')
+    import django
+    django.setup()
+
+    from django.contrib.auth.models import User
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+    from rest_framework.parsers import JSONParser
+    from rest_framework.renderers import JSONRenderer
+    from rest_framework.test import APIRequestFactory
+
+    from booktest.models import BookInfo, HeroInfo
+    from booktest2.serializers import BookInfoSerializer
+    from booktest3.serializers import HeroInfoModelSerializer
+    from drf_lessions.json_backends import orjson
+    from drf_lessions.parsers import FastJSONParser
+    from drf_lessions.renderers import FastJSONRenderer
+    from posts.models import Post
+    from posts.serializers import PostSerializer
+    from snippets.models import Snippet
+    from snippets.serializers import SnippetSerializer
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        user = User.objects.create_user(username='bench')
+        Post.objects.bulk_create([Post(title=f'标题 {i}', content='内容 ' * 50, slug=f'post-{i}', author=user)
+                                  for i in range(args.rows)])
+        # bulk_create 不调用 save()，不会渲染高亮
+        Snippet.objects.bulk_create([Snippet(title=f'snippet {i}', code='print("hello")\n' * 20, owner=user,
+                                             highlighted='', highlight_status='ready')
+                                     for i in range(args.rows)])
+        BookInfo.objects.bulk_create([BookInfo(btitle=f'图书{i}', bpub_date='1980-01-01', image=f'upload/{i}.png')
+                                      for i in range(args.rows)])
+        book = BookInfo.objects.first()
+        HeroInfo.objects.bulk_create([HeroInfo(hname=f'英雄{i}', hcomment='备注', hbook=book)
+                                      for i in range(args.rows)])
+
+        context = {'request': APIRequestFactory().get('/')}
+        payloads = [
+            ('posts', PostSerializer(PostSerializer.setup_eager_loading(Post.objects.all()), many=True,
+                                     context=context).data),
+            ('snippets', SnippetSerializer(Snippet.objects.select_related('owner'), many=True, context=context).data),
+            ('booktest books', BookInfoSerializer(BookInfo.objects.all(), many=True, context=context).data),
+            ('booktest heroes', HeroInfoModelSerializer(HeroInfo.objects.all(), many=True).data),
+        ]
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    print('backend: %s' % ('orjson' if orjson is not None else 'stdlib (orjson is not installed)'))
+    print('%-18s %9s %9s %9s %9s' % ('%d rows' % args.rows, 'render', 'fast', 'parse', 'fast'))
+    for name, data in payloads:
+        content = JSONRenderer().render(data)
+        assert FastJSONRenderer().render(data) == content, name
+        render = measure(lambda: JSONRenderer().render(data), args.runs)
+        fast_render = measure(lambda: FastJSONRenderer().render(data), args.runs)
+        parse = measure(lambda: JSONParser().parse(io.BytesIO(content)), args.runs)
+        fast_parse = measure(lambda: FastJSONParser().parse(io.BytesIO(content)), args.runs)
+        print('%-18s %7.1fms %7.1fms %7.1fms %7.1fms' % (name, render, fast_render, parse, fast_parse))
+
+
+if __name__ == '__main__':
+    main()
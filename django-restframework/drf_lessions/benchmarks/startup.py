@@ -0,0 +1,64 @@
+"""
+启动耗时基准：分别在有、无 snippets 选项快照的情况下，启动新的解释器执行 django.setup()
+以及首次读取 LANGUAGE_CHOICES / STYLE_CHOICES（相当于系统检查、序列化器初始化时的开销）
+
+    python benchmarks/startup.py [-n 10]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+SETUP = """
+import os, django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'drf_lessions.settings')
+django.setup()
+"""
+CHOICES = SETUP + """
+from snippets.models import LANGUAGE_CHOICES, STYLE_CHOICES
+len(LANGUAGE_CHOICES), len(STYLE_CHOICES)
+"""
+
+
+def measure(code, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', code], cwd=BASE_DIR, check=True)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('-n', '--runs', type=int, default=10)
+    args = parser.parse_args()
+
+    from snippets.choices import SNAPSHOT_PATH, write_snapshot
+
+    backup = SNAPSHOT_PATH.read_bytes() if SNAPSHOT_PATH.exists() else None
+    try:
+        if SNAPSHOT_PATH.exists():
+            SNAPSHOT_PATH.unlink()
+        without = measure(SETUP, args.runs), measure(CHOICES, args.runs)
+        write_snapshot()
+        with_snapshot = measure(SETUP, args.runs), measure(CHOICES, args.runs)
+    finally:
+        if backup is None:
+            SNAPSHOT_PATH.unlink(missing_ok=True)
+        else:
+            SNAPSHOT_PATH.write_bytes(backup)
+
+    print('%-12s %14s %14s' % ('', 'django.setup', '+ choices'))
+    print('%-12s %12.1fms %12.1fms' % ('no snapshot', *without))
+    print('%-12s %12.1fms %12.1fms' % ('snapshot', *with_snapshot))
+
+
+if __name__ == '__main__':
+    main()
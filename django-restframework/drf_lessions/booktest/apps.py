@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class BooktestConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'booktest'
+
+    def ready(self):
+        # 注册对象缓存，连接失效信号
+        from . import caches  # noqa
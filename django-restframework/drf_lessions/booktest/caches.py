@@ -0,0 +1,10 @@
+from drf_lessions.object_cache import ObjectCache
+from drf_lessions.response_cache import TableVersion
+from .models import BookInfo, HeroInfo
+
+book_cache = ObjectCache(BookInfo)
+hero_cache = ObjectCache(HeroInfo)
+
+# 列表响应缓存的表版本号
+book_version = TableVersion(BookInfo)
+hero_version = TableVersion(HeroInfo)
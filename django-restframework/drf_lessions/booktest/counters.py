@@ -0,0 +1,13 @@
+from drf_lessions.counters import BufferedCounter
+from .caches import book_cache, book_version
+from .models import BookInfo
+
+
+def bread_flushed(pks):
+    # 阅读量通过 UPDATE 写回，不发送信号，手动使对象缓存和列表响应缓存失效
+    book_cache.invalidate(*pks)
+    book_version.bump()
+
+
+# 图书阅读量
+bread_counter = BufferedCounter(BookInfo, 'bread', on_flush=bread_flushed)
@@ -1,3 +1,41 @@
-from django.test import TestCase
+import json
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.http import JsonResponse
+from django.test import TestCase, override_settings
+
+from drf_lessions.json_backends import orjson
+from .models import BookInfo
+from .views import BookListView
+
+
+class BookListViewTest(TestCase):
+    """values_list() + 流式输出的图书列表与原来 JsonResponse 的输出相同"""
+
+    @classmethod
+    def setUpTestData(cls):
+        BookInfo.objects.create(btitle='天龙八部', bpub_date='1986-07-24', image='upload/天龙 八部.png')
+        for i in range(4):
+            BookInfo.objects.create(btitle=f'book-{i}', bpub_date='1980-01-01', bread=i)
+
+    def expected(self):
+        return JsonResponse([{
+            'id': book.id,
+            'btitle': book.btitle,
+            'bpub_date': book.bpub_date,
+            'bread': book.bread,
+            'bcomment': book.bcomment,
+            'image': book.image.url if book.image else ''
+        } for book in BookInfo.objects.all()], safe=False).content
+
+    @mock.patch.object(BookListView, 'chunk_size', 2)
+    def test_same_as_json_response(self):
+        response = self.client.get('/v1/books/')
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertEqual(b''.join(response.streaming_content), self.expected())
+
+    @skipUnless(orjson, 'orjson is not installed')
+    @override_settings(JSON_BACKEND='orjson')
+    def test_orjson_backend(self):
+        response = self.client.get('/v1/books/')
+        self.assertEqual(json.loads(b''.join(response.streaming_content)), json.loads(self.expected()))
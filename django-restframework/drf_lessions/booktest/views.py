@@ -1,31 +1,71 @@
 import json
-from django.http import JsonResponse, HttpResponse
+from django.core.files.storage import FileSystemStorage
+from django.http import JsonResponse, HttpResponse, StreamingHttpResponse
+from django.utils.encoding import filepath_to_uri
 from django.views import View
+from drf_lessions.json_backends import get_json_backend
 from .models import BookInfo, HeroInfo
 
 
+def file_url_function(model_field):
+    """
+    返回 name -> URL 的函数，与 FieldFile.url 相同
+    本地文件存储时预先计算 MEDIA_URL 前缀，只做字符串拼接，不再逐行构造 FieldFile、调用 urljoin
+    """
+    storage = model_field.storage
+    if type(storage) is not FileSystemStorage:
+        return storage.url
+    prefix = storage.base_url
+
+    def url(name):
+        if './' in name:
+            # 包含 . 或 .. 路径段时 urljoin 会规范化路径
+            return storage.url(name)
+        return prefix + filepath_to_uri(name).lstrip('/')
+
+    return url
+
+
 class BookListView(View):
     """
     查询所有图书、增加图书
     """
+    # 每次从数据库读取、编码并输出的行数
+    chunk_size = 2000
 
     def get(self, request):
         """
         查询所有图书
         路由：GET /books/
+
+        只查询输出需要的列，不实例化模型，按块编码后流式输出，内容与 JsonResponse(book_list, safe=False) 相同
+        JSON 编码器由 settings.JSON_BACKEND 选择
         """
-        queryset = BookInfo.objects.all()
-        book_list = []
-        for book in queryset:
-            book_list.append({
-                'id': book.id,
-                'btitle': book.btitle,
-                'bpub_date': book.bpub_date,
-                'bread': book.bread,
-                'bcomment': book.bcomment,
-                'image': book.image.url if book.image else ''
-            })
-        return JsonResponse(book_list, safe=False)
+        rows = BookInfo.objects.values_list('id', 'btitle', 'bpub_date', 'bread', 'bcomment', 'image') \
+            .iterator(chunk_size=self.chunk_size)
+        return StreamingHttpResponse(self.stream(rows, get_json_backend()), content_type='application/json')
+
+    def stream(self, rows, backend):
+        image_url = file_url_function(BookInfo._meta.get_field('image'))
+        separator = backend.item_separator
+        chunk = []
+        first = True
+        yield b'['
+        for id, btitle, bpub_date, bread, bcomment, image in rows:
+            chunk.append(backend.dumps({
+                'id': id,
+                'btitle': btitle,
+                'bpub_date': bpub_date.isoformat(),
+                'bread': bread,
+                'bcomment': bcomment,
+                'image': image_url(image) if image else ''
+            }))
+            if len(chunk) >= self.chunk_size:
+                yield (b'' if first else separator) + separator.join(chunk)
+                chunk, first = [], False
+        if chunk:
+            yield (b'' if first else separator) + separator.join(chunk)
+        yield b']'
 
     def post(self, request):
         """
@@ -1,3 +1,46 @@
 from django.test import TestCase
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
 
-# Create your tests here.
+from booktest.models import BookInfo
+from drf_lessions.compiled import compile_serializer
+from .serializers import BookInfoSerializer
+
+
+class CompiledBookListTest(TestCase):
+    """编译后的序列化器与默认序列化器输出完全相同"""
+
+    @classmethod
+    def setUpTestData(cls):
+        BookInfo.objects.create(btitle='天龙八部', bpub_date='1986-07-24', image='upload/tlbb.png')
+        BookInfo.objects.create(btitle='连城诀', bpub_date='1963-01-01', bread=10, is_delete=True)
+
+    def test_byte_identical(self):
+        with self.assertNumQueries(1):
+            response = self.client.get('/v2/books/', HTTP_ACCEPT='application/json')
+        request = APIRequestFactory().get('/v2/books/')
+        expected = BookInfoSerializer(BookInfo.objects.all(), many=True, context={'request': request}).data
+        self.assertEqual(response.content, JSONRenderer().render(expected))
+        self.assertIn(b'"http://testserver/upload/tlbb.png"', response.content)
+
+    def test_compiled_columns(self):
+        request = APIRequestFactory().get('/v2/books/')
+        compiled = compile_serializer(BookInfoSerializer(context={'request': request}), BookInfo)
+        self.assertEqual(compiled.columns, ['id', 'btitle', 'bpub_date', 'bread', 'bcomment', 'is_delete', 'image'])
+
+    def test_identity_lookup_field(self):
+        class BookLinkSerializer(serializers.ModelSerializer):
+            url = serializers.HyperlinkedIdentityField(view_name='booktest_v2:books-detail', lookup_field='id',
+                                                       lookup_url_kwarg='pk')
+
+            class Meta:
+                model = BookInfo
+                fields = ['url', 'btitle']
+
+        request = APIRequestFactory().get('/v2/books/')
+        serializer = BookLinkSerializer(context={'request': request})
+        compiled = compile_serializer(serializer, BookInfo)
+        queryset = BookInfo.objects.order_by('pk')
+        self.assertEqual(compiled.to_representation(compiled.project(queryset)),
+                         BookLinkSerializer(queryset, many=True, context={'request': request}).data)
@@ -1,8 +1,10 @@
 from rest_framework.viewsets import ModelViewSet
 from .serializers import BookInfoSerializer
 from booktest.models import BookInfo
+from drf_lessions.mixins import CompiledListModelMixin
 
 
-class BookInfoViewSet(ModelViewSet):
+class BookInfoViewSet(CompiledListModelMixin, ModelViewSet):
+    """列表使用编译后的序列化器，只查询需要的列，不实例化模型"""
     queryset = BookInfo.objects.all()  # 指明该视图集在查询数据时使用的查询集
     serializer_class = BookInfoSerializer  # 指明该视图在进行序列化或反序列化时使用的序列化器
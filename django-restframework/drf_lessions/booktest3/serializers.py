@@ -1,5 +1,7 @@
 from rest_framework import serializers
 from booktest.models import BookInfo, HeroInfo
+from drf_lessions.serializers import BatchUniqueListSerializer, BatchUniqueMixin, PartialUpdateMixin, \
+    SparseFieldsetsMixin
 
 BOOKS = ["飞狐外传", "雪山飞狐", "连城诀", "天龙八部",
          "射雕英雄传", "白马啸西风", "鹿鼎记", "笑傲江湖",
@@ -7,8 +9,11 @@ BOOKS = ["飞狐外传", "雪山飞狐", "连城诀", "天龙八部",
                                  "碧血剑", "鸳鸯刀", "越女剑"]
 
 
-class BookInfoSerializer(serializers.Serializer):
-    """图书数据序列化器"""
+class BookInfoSerializer(PartialUpdateMixin, BatchUniqueMixin, serializers.Serializer):
+    """图书数据序列化器，many=True 批量导入时标题的唯一性只查询一次数据库"""
+    unique_model = BookInfo
+    unique_fields = ['btitle']
+
     id = serializers.IntegerField(label='ID', read_only=True)
     btitle = serializers.CharField(label='名称', max_length=20)
     bpub_date = serializers.DateField(label='发布日期')
@@ -19,13 +24,18 @@ class BookInfoSerializer(serializers.Serializer):
     # heroinfo_set = serializers.PrimaryKeyRelatedField(many=True)
     # heroinfo_set = HeroInfoSerializer(many=True)  # 如果一里面关联序列化多时, 需要多指定many=True
 
+    class Meta:
+        list_serializer_class = BatchUniqueListSerializer
+
     def validate_btitle(self, value):
         """单个字段验证，validate_<field_name>"""
         if value not in BOOKS:
             raise serializers.ValidationError("该图书不是金庸的小说")
-        book = BookInfo.objects.filter(btitle=value).first()
-        if book:
+        conflict = self.unique_conflict('btitle', value)
+        if conflict == 'exists':
             raise serializers.ValidationError("该图书已存在")
+        if conflict == 'duplicate':
+            raise serializers.ValidationError("该图书在提交的数据中重复")
         return value
 
     def validate(self, attrs):
@@ -40,16 +50,14 @@ class BookInfoSerializer(serializers.Serializer):
         return BookInfo.objects.create(**validated_data)
 
     def update(self, instance, validated_data):
-        """更新，instance 为要更新的对象实例"""
-        instance.btitle = validated_data.get('btitle', instance.btitle)
-        instance.bpub_date = validated_data.get('bpub_date', instance.bpub_date)
-        instance.bread = validated_data.get('bread', instance.bread)
-        instance.bcomment = validated_data.get('bcomment', instance.bcomment)
-        instance.save()
-        return instance
+        """更新，instance 为要更新的对象实例，只写入值发生变化的字段（图片不在更新范围内）"""
+        fields = ['btitle', 'bpub_date', 'bread', 'bcomment']
+        changed = self.assign_changed(instance, {name: validated_data[name] for name in fields
+                                                 if name in validated_data})
+        return self.save_changed(instance, changed)
 
 
-class HeroInfoSerializer(serializers.Serializer):
+class HeroInfoSerializer(PartialUpdateMixin, serializers.Serializer):
     """英雄数据序列化器"""
     GENDER_CHOICES = (
         (0, 'male'),
@@ -75,18 +83,31 @@ class HeroInfoSerializer(serializers.Serializer):
         return HeroInfo.objects.create(**validated_data)
 
     def update(self, instance, validated_data):
-        """更新，instance 为要更新的对象实例"""
-        instance.hname = validated_data.get('hname', instance.hname)
-        instance.hgender = validated_data.get('hgender', instance.hgender)
-        instance.hcomment = validated_data.get('hcomment', instance.hcomment)
-        instance.hbook = validated_data.get('hbook', instance.hbook)
-        instance.save()
-        return instance
+        """更新，instance 为要更新的对象实例，只写入值发生变化的字段"""
+        fields = ['hname', 'hgender', 'hcomment', 'hbook']
+        changed = self.assign_changed(instance, {name: validated_data[name] for name in fields
+                                                 if name in validated_data})
+        return self.save_changed(instance, changed)
 
 
-class HeroInfoModelSerializer(serializers.ModelSerializer):
+class HeroBookSerializer(serializers.ModelSerializer):
+    """英雄所属图书的嵌套表示，?expand=hbook 时使用"""
+
+    class Meta:
+        model = BookInfo
+        fields = '__all__'
+
+
+class HeroInfoModelSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
+    """
+    ?fields= 只输出指定字段，?expand=hbook 展开图书，只有展开时才 JOIN 图书表
+    """
     hbook = serializers.PrimaryKeyRelatedField(label='书籍', queryset=BookInfo.objects.all())
 
+    expandable_fields = {'hbook': (HeroBookSerializer, {'read_only': True})}
+    select_related_fields = ('hbook',)
+    related_fields = {'hbook': ('hbook',)}
+
     class Meta:
         model = HeroInfo
         fields = '__all__'
@@ -1,3 +1,319 @@
-from django.test import TestCase
+import json
+import tempfile
+import threading
+import time
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import caches
+from django.core.cache.backends.filebased import FileBasedCache
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
+
+from booktest.caches import hero_cache
+from booktest.counters import bread_counter
+from booktest.models import BookInfo, HeroInfo
+from drf_lessions.counters import BufferedCounter
+from drf_lessions.object_cache import ObjectCache
+from .serializers import BookInfoSerializer, HeroBookSerializer, HeroInfoModelSerializer, HeroInfoSerializer
+from .views import HeroListAPIView
+
+
+@mock.patch.object(HeroListAPIView, 'stream_chunk_size', 10)
+class HeroStreamingListTest(TestCase):
+    """英雄列表流式输出，结果与一次性序列化完全一致"""
+
+    @classmethod
+    def setUpTestData(cls):
+        book = BookInfo.objects.create(btitle='天龙八部', bpub_date='1986-07-24')
+        HeroInfo.objects.bulk_create([HeroInfo(hname=f'英雄{i}', hbook=book) for i in range(25)])
+
+    def setUp(self):
+        caches['responses'].clear()
+
+    def test_stream_json(self):
+        response = self.client.get('/v3/heros/', HTTP_ACCEPT='application/json')
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        content = b''.join(response.streaming_content)
+        expected = JSONRenderer().render(HeroInfoModelSerializer(HeroInfo.objects.all(), many=True).data)
+        self.assertEqual(content, expected)
+
+    def test_stream_ndjson(self):
+        response = self.client.get('/v3/heros/?format=ndjson')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = b''.join(response.streaming_content).splitlines()
+        self.assertEqual(len(lines), 25)
+        self.assertEqual(json.loads(lines[0])['hname'], '英雄0')
+
+    def test_cached_stream(self):
+        response = self.client.get('/v3/heros/', HTTP_ACCEPT='application/json')
+        content = b''.join(response.streaming_content)
+        with self.assertNumQueries(0):
+            cached = self.client.get('/v3/heros/', HTTP_ACCEPT='application/json')
+        self.assertEqual(cached.content, content)
+        self.assertEqual(cached['Content-Type'], 'application/json')
+
+        response = self.client.get('/v3/heros/', HTTP_ACCEPT='application/json', HTTP_IF_NONE_MATCH=cached['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+        # 修改英雄后版本号变化
+        HeroInfo.objects.first().save()
+        response = self.client.get('/v3/heros/', HTTP_ACCEPT='application/json', HTTP_IF_NONE_MATCH=cached['ETag'])
+        self.assertEqual(response.status_code, 200)
+
+    def test_browsable_api_is_not_streamed(self):
+        response = self.client.get('/v3/heros/', HTTP_ACCEPT='text/html')
+        self.assertFalse(response.streaming)
+
+
+class AsyncHeroViewTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        book = BookInfo.objects.create(btitle='天龙八部', bpub_date='1986-07-24')
+        cls.hero = HeroInfo.objects.create(hname='乔峰', hbook=book)
+
+    def setUp(self):
+        caches['objects'].clear()
+        caches['responses'].clear()
+
+    async def test_list(self):
+        # Django 3.2 的 AsyncClient.get() 不会把 data 放到查询字符串中
+        response = await self.async_client.get('/v3/async/heros/?fields=id,hname')
+        self.assertEqual(json.loads(response.content), [{'id': self.hero.pk, 'hname': '乔峰'}])
+        self.assertTrue(response.has_header('ETag'))
+
+    async def test_detail(self):
+        response = await self.async_client.get(f'/v3/async/heros/{self.hero.pk}/')
+        self.assertEqual(response.content, JSONRenderer().render(HeroInfoSerializer(self.hero).data))
+        with mock.patch('drf_lessions.object_cache.sync_to_async') as to_thread:
+            await self.async_client.get(f'/v3/async/heros/{self.hero.pk}/')
+        to_thread.assert_not_called()
+
+        response = await self.async_client.get('/v3/async/heros/0/')
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(json.loads(response.content), {'error': '没有该英雄'})
+
+    async def test_blocking_cache_read_in_thread(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = FileBasedCache(directory, {})
+            threads = []
+            cache_get = cache.get
+
+            def record_thread(*args, **kwargs):
+                threads.append(threading.current_thread())
+                return cache_get(*args, **kwargs)
+
+            # 文件、网络缓存的读取不在事件循环的线程中执行
+            with mock.patch.object(ObjectCache, 'cache', new_callable=mock.PropertyMock, return_value=cache), \
+                    mock.patch.object(cache, 'get', side_effect=record_thread):
+                self.assertEqual((await hero_cache.aget(self.hero.pk)).hname, '乔峰')
+                self.assertEqual((await hero_cache.aget(self.hero.pk)).hname, '乔峰')
+            self.assertEqual(len(threads), 2)
+            self.assertNotIn(threading.current_thread(), threads)
+
+
+class BookObjectCacheTest(TestCase):
+
+    def setUp(self):
+        caches['objects'].clear()
+        self.book = BookInfo.objects.create(btitle='天龙八部', bpub_date='1986-07-24')
+        self.url = f'/v3/fbv/books/{self.book.pk}/'
+
+    def test_read_through_and_invalidate(self):
+        self.assertEqual(self.client.get(self.url).data['btitle'], '天龙八部')
+        with self.assertNumQueries(0):
+            self.client.get(self.url)
+
+        self.book.btitle = '连城诀'
+        self.book.save()
+        self.assertEqual(self.client.get(self.url).data['btitle'], '连城诀')
+
+        self.book.delete()
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+
+class BookBatchUniqueTest(TestCase):
+    """批量校验图书标题唯一性"""
+
+    def test_single_query(self):
+        BookInfo.objects.create(btitle='天龙八部', bpub_date='1986-07-24')
+        data = [{'btitle': title, 'bpub_date': '1980-01-01'} for title in ['天龙八部', '鹿鼎记', '连城诀', '鹿鼎记']]
+        serializer = BookInfoSerializer(data=data, many=True)
+        with self.assertNumQueries(1):
+            self.assertFalse(serializer.is_valid())
+        errors = [item.get('btitle') for item in serializer.errors]
+        self.assertEqual(errors, [['该图书已存在'], None, None, ['该图书在提交的数据中重复']])
+
+    def test_single_object(self):
+        serializer = BookInfoSerializer(data={'btitle': '鹿鼎记', 'bpub_date': '1980-01-01'})
+        with self.assertNumQueries(1):
+            self.assertTrue(serializer.is_valid())
+
+
+class HeroSparseFieldsetTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.book = BookInfo.objects.create(btitle='天龙八部', bpub_date='1986-07-24')
+        HeroInfo.objects.bulk_create([HeroInfo(hname=f'英雄{i}', hbook=cls.book) for i in range(5)])
+
+    def setUp(self):
+        caches['responses'].clear()
+
+    def get(self, params):
+        response = self.client.get('/v3/heros/', params, HTTP_ACCEPT='application/json')
+        return json.loads(b''.join(response.streaming_content))
+
+    def test_fields(self):
+        data = self.get({'fields': 'id,hname'})
+        self.assertEqual(list(data[0]), ['id', 'hname'])
+
+    def test_expand(self):
+        with CaptureQueriesContext(connection) as queries:
+            data = self.get({'fields': 'hname', 'expand': 'hbook'})
+        self.assertEqual(data[0], {'hname': '英雄0', 'hbook': HeroBookSerializer(self.book).data})
+        self.assertTrue(any('JOIN' in query['sql'] for query in queries))
+
+        data = self.get({})
+        self.assertEqual(data[0]['hbook'], self.book.pk)
+
+
+class CompiledHeroListTest(TestCase):
+
+    def test_byte_identical(self):
+        book = BookInfo.objects.create(btitle='天龙八部', bpub_date='1986-07-24')
+        HeroInfo.objects.create(hname='乔峰', hbook=book)
+        HeroInfo.objects.create(hname='阿朱', hgender=1, hcomment=None, hbook=book)
+        response = self.client.get('/v3/heros-modelviewset/', HTTP_ACCEPT='application/json')
+        expected = HeroInfoSerializer(HeroInfo.objects.all(), many=True).data
+        self.assertEqual(response.content, JSONRenderer().render(expected))
+
+
+@mock.patch.multiple(bread_counter, flush_interval=3600, max_pending=1000)
+class BookReadCounterTest(TestCase):
+
+    def setUp(self):
+        caches['objects'].clear()
+        bread_counter.flush()
+        # 定时器线程使用自己的数据库连接，看不到测试事务中的数据，测试中手动写回
+        self.schedule = mock.patch.object(bread_counter, '_schedule').start()
+        self.addCleanup(mock.patch.stopall)
+        self.book = BookInfo.objects.create(btitle='天龙八部', bpub_date='1986-07-24', bread=10)
+        self.url = f'/v3/books/{self.book.pk}/read/'
+
+    def test_coalesced_flush(self):
+        for expected in (11, 12, 13):
+            self.assertEqual(self.client.put(self.url).data['bread'], expected)
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.bread, 10)
+
+        # 缓存的图书在写回后失效
+        self.client.get(f'/v3/fbv/books/{self.book.pk}/')
+        with self.assertNumQueries(3):  # 创建、释放保存点 + 一条 UPDATE
+            self.assertEqual(bread_counter.flush(), 1)
+        self.assertEqual(self.client.get(f'/v3/fbv/books/{self.book.pk}/').data['bread'], 13)
+
+    def test_threshold_flushes_in_background(self):
+        bread_counter.incr(self.book.pk, 4)
+        self.schedule.assert_called_with(3600)
+        # 达到 MAX_PENDING 时只安排后台立即写回，不在请求中写回
+        with mock.patch.object(bread_counter, 'max_pending', 1):
+            self.assertEqual(self.client.put(self.url).data['bread'], 15)
+        self.schedule.assert_called_with(0)
+        self.assertEqual(bread_counter.pending(self.book.pk), 5)
+
+        bread_counter.flush()
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.bread, 15)
+
+    def test_flush_failure_keeps_increments(self):
+        bread_counter.incr(self.book.pk, 2)
+        with mock.patch.object(BookInfo._default_manager, 'filter', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                bread_counter.flush()
+        self.assertEqual(bread_counter.pending(self.book.pk), 2)
+        bread_counter.flush()
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.bread, 12)
+
+
+class BufferedCounterStressTest(TransactionTestCase):
+    """多个线程并发累加、写回，所有增量都写入数据库"""
+
+    def test_timed_flush_without_further_increments(self):
+        book = BookInfo.objects.create(btitle='天龙八部', bpub_date='1986-07-24')
+        counter = BufferedCounter(BookInfo, 'bread', flush_interval=0.05, max_pending=1000)
+        counter.incr(book.pk, 3)
+        # 之后没有新的增量，由定时器写回
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            book.refresh_from_db()
+            if book.bread:
+                break
+            time.sleep(0.02)
+        self.assertEqual(book.bread, 3)
+        self.assertEqual(counter.pending(book.pk), 0)
+
+    def test_no_lost_increments(self):
+        books = [BookInfo.objects.create(btitle=f'图书{i}', bpub_date='1980-01-01') for i in range(5)]
+        # 缓冲 3 个对象即写回，写回与累加交错进行
+        counter = BufferedCounter(BookInfo, 'bread', flush_interval=3600, max_pending=3)
+        threads, per_thread = 8, 250
+
+        def work(offset):
+            try:
+                for i in range(per_thread):
+                    counter.incr(books[(offset + i) % len(books)].pk)
+            finally:
+                connection.close()
+
+        workers = [threading.Thread(target=work, args=(i,)) for i in range(threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        counter.flush()
+
+        breads = list(BookInfo.objects.filter(pk__in=[book.pk for book in books]).values_list('bread', flat=True))
+        self.assertEqual(sum(breads), threads * per_thread)
+        self.assertEqual(breads, [threads * per_thread // len(books)] * len(books))
+
+
+class PartialUpdateTest(TestCase):
+
+    def setUp(self):
+        caches['objects'].clear()
+        self.book = BookInfo.objects.create(btitle='天龙八部', bpub_date='1986-07-24', image='upload/cover.png')
+        self.hero = HeroInfo.objects.create(hname='乔峰', hbook=self.book)
+
+    def update(self, serializer_class, instance, data):
+        serializer = serializer_class(instance, data=data, partial=True)
+        serializer.is_valid(raise_exception=True)
+        with CaptureQueriesContext(connection) as queries:
+            with self.assertLogs('drf_lessions.serializers', 'INFO') as logs:
+                serializer.save()
+        return [query['sql'] for query in queries if query['sql'].startswith('UPDATE')], logs.output[0]
+
+    def test_book_changed_columns(self):
+        updates, log = self.update(BookInfoSerializer, self.book, {'bcomment': 5, 'bread': 0})
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"bcomment"', updates[0])
+        self.assertNotIn('"image"', updates[0])
+        self.assertIn('wrote 1 columns: bcomment', log)
+        self.book.refresh_from_db()
+        self.assertEqual((self.book.bcomment, self.book.image.name), (5, 'upload/cover.png'))
+
+    def test_unchanged_skips_write(self):
+        updates, log = self.update(HeroInfoSerializer, self.hero, {'hname': '乔峰', 'hbook': self.book.pk})
+        self.assertEqual(updates, [])
+        self.assertIn('unchanged, skipped save', log)
+
+    def test_hero_foreign_key(self):
+        other = BookInfo.objects.create(btitle='鹿鼎记', bpub_date='1969-10-24')
+        hero = HeroInfo.objects.get(pk=self.hero.pk)
+        updates, log = self.update(HeroInfoSerializer, hero, {'hbook': other.pk, 'hgender': 0})
+        self.assertIn('wrote 1 columns: hbook', log)
+        self.assertEqual(HeroInfo.objects.get(pk=self.hero.pk).hbook_id, other.pk)
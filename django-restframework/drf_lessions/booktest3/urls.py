@@ -14,6 +14,8 @@ urlpatterns = [
     path('gcbv/heros/<int:pk>/', views.GCBVHeroDetailView.as_view(), name='GCBVHeroDetailView'),
 
     path('heros/', views.HeroListAPIView.as_view(), name='HeroListAPIView'),
+    path('async/heros/', views.AsyncHeroListAPIView.as_view(), name='AsyncHeroListAPIView'),
+    path('async/heros/<int:pk>/', views.AsyncHeroDetail.as_view(), name='AsyncHeroDetail'),
 
     path('heros-viewset/', views.HeroViewSet.as_view({'get': 'list', 'post': 'create'}), name='HeroViewSet'),
     path('heros-viewset/<int:pk>/',
@@ -31,6 +33,11 @@ urlpatterns = [
     path('heros-modelviewset/<int:pk>/',
          views.HeroModelViewSet.as_view({'get': 'retrieve', 'delete': 'destroy', 'put': 'update'}),
          name='HeroModelViewSet'),
+
+    path('books/', views.BookInfoViewSet.as_view({'get': 'list'}), name='BookInfoViewSet-list'),
+    path('books/latest/', views.BookInfoViewSet.as_view({'get': 'latest'}), name='BookInfoViewSet-latest'),
+    path('books/<int:pk>/', views.BookInfoViewSet.as_view({'get': 'retrieve'}), name='BookInfoViewSet-detail'),
+    path('books/<int:pk>/read/', views.BookInfoViewSet.as_view({'put': 'read'}), name='BookInfoViewSet-read'),
 ]
 
 from rest_framework import routers
@@ -3,6 +3,7 @@ from rest_framework.response import Response
 from rest_framework import status
 from .serializers import BookInfoSerializer, HeroInfoSerializer, HeroInfoModelSerializer
 from booktest.models import BookInfo, HeroInfo
+from booktest.caches import book_cache, book_version, hero_cache, hero_version
 
 
 @api_view(['GET', 'POST'])
@@ -24,7 +25,11 @@ def fbv_book_list_view(request):
 
 @api_view(['GET', 'PUT', 'DELETE'])
 def fbv_book_detail_view(request, pk):
-    book = BookInfo.objects.filter(pk=pk).first()
+    # 只读请求走对象缓存
+    if request.method == "GET":
+        book = book_cache.get_or_none(pk)
+    else:
+        book = BookInfo.objects.filter(pk=pk).first()
     if not book:
         return Response(data={'error': '没有该图书'}, status=status.HTTP_404_NOT_FOUND)
     if request.method == "GET":
@@ -61,7 +66,7 @@ class CBVHeroListView(APIView):
 class CBVGHeroDetailView(APIView):
 
     def get(self, request, pk):
-        hero = HeroInfo.objects.filter(pk=pk).first()
+        hero = hero_cache.get_or_none(pk)
         if not hero:
             return Response(data={'error': '没有该英雄'}, status=status.HTTP_404_NOT_FOUND)
         serializer = HeroInfoSerializer(instance=hero)
@@ -140,10 +145,55 @@ from rest_framework.generics import ListAPIView, ListCreateAPIView, RetrieveAPIV
     RetrieveUpdateDestroyAPIView, RetrieveDestroyAPIView, CreateAPIView, DestroyAPIView
 
 
-class HeroListAPIView(ListAPIView):
+from drf_lessions.mixins import CompiledListModelMixin, StreamingListModelMixin
+from drf_lessions.response_cache import cache_response
+
+
+class HeroListAPIView(StreamingListModelMixin, ListAPIView):
+    queryset = HeroInfo.objects.all()
+    serializer_class = HeroInfoModelSerializer
+
+    def get_queryset(self):
+        return self.get_serializer_class().setup_eager_loading(super().get_queryset(), self.request)
+
+    @cache_response(hero_version, book_version)
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+
+from drf_lessions.async_views import AsyncListAPIView, AsyncRetrieveAPIView, database_sync_to_async
+
+
+class AsyncHeroListAPIView(AsyncListAPIView):
+    """
+    HeroListAPIView 的异步版本，不使用流式输出：Django 3.2 的 ASGIHandler 在事件循环中迭代流式响应，
+    生成器中的查询会抛出 SynchronousOnlyOperation
+    """
     queryset = HeroInfo.objects.all()
     serializer_class = HeroInfoModelSerializer
 
+    def get_queryset(self):
+        return self.get_serializer_class().setup_eager_loading(super().get_queryset(), self.request)
+
+    async def get(self, request, *args, **kwargs):
+        return await database_sync_to_async(self.cached_list)(request, *args, **kwargs)
+
+    @cache_response(hero_version, book_version)
+    def cached_list(self, request, *args, **kwargs):
+        return self.list(request, *args, **kwargs)
+
+
+class AsyncHeroDetail(AsyncRetrieveAPIView):
+    """CBVGHeroDetailView.get 的异步版本，对象缓存命中时不切换线程"""
+    serializer_class = HeroInfoSerializer
+
+    async def get(self, request, pk):
+        hero = await hero_cache.aget_or_none(pk)
+        if not hero:
+            return Response(data={'error': '没有该英雄'}, status=status.HTTP_404_NOT_FOUND)
+        serializer = self.get_serializer(instance=hero)
+        return Response(data=serializer.data, status=status.HTTP_200_OK)
+
 
 # -------------------------------------------------------------------------------------------------
 from rest_framework.viewsets import ViewSet
@@ -176,11 +226,11 @@ from rest_framework.viewsets import GenericViewSet
 from rest_framework import mixins
 
 
-class HeroGenericViewSet(mixins.ListModelMixin, mixins.RetrieveModelMixin,
+class HeroGenericViewSet(CompiledListModelMixin, mixins.ListModelMixin, mixins.RetrieveModelMixin,
                          mixins.UpdateModelMixin, mixins.DestroyModelMixin,
                          mixins.CreateModelMixin,
                          GenericViewSet):
-    """GenericViewSet 结合 mixins"""
+    """GenericViewSet 结合 mixins，列表使用编译后的序列化器"""
     queryset = HeroInfo.objects.all()
     serializer_class = HeroInfoSerializer
 
@@ -189,7 +239,7 @@ class HeroGenericViewSet(mixins.ListModelMixin, mixins.RetrieveModelMixin,
 from rest_framework.viewsets import ModelViewSet
 
 
-class HeroModelViewSet(ModelViewSet):
+class HeroModelViewSet(CompiledListModelMixin, ModelViewSet):
     queryset = HeroInfo.objects.all()
     serializer_class = HeroInfoSerializer
 
@@ -199,6 +249,7 @@ class HeroModelViewSet(ModelViewSet):
 from rest_framework import mixins
 from rest_framework.viewsets import GenericViewSet
 from rest_framework.decorators import action
+from booktest.counters import bread_counter
 
 
 class BookInfoViewSet(mixins.ListModelMixin, mixins.RetrieveModelMixin, GenericViewSet):
@@ -212,6 +263,7 @@ class BookInfoViewSet(mixins.ListModelMixin, mixins.RetrieveModelMixin, GenericV
         else:
             # return OrderDataSerializer
             pass
+        return super().get_serializer_class()
 
     def latest(self, request):
         """
@@ -223,11 +275,12 @@ class BookInfoViewSet(mixins.ListModelMixin, mixins.RetrieveModelMixin, GenericV
 
     def read(self, request, pk):
         """
-        修改图书的阅读量数据
+        阅读量加一
+        增量在进程内合并后批量写回（booktest.counters），不再读出、修改、保存整行，并发阅读不会丢失计数
         """
         book = self.get_object()
-        book.bread = request.data.get('read')
-        book.save()
+        # 返回数据库中的值加上当前进程尚未写回的增量；incr() 触发写回时返回的是写回前的增量
+        book.bread += bread_counter.incr(book.pk)
         serializer = self.get_serializer(book)
         return Response(serializer.data)
 
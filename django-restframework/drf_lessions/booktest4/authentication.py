@@ -0,0 +1,156 @@
+import copy
+import uuid
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db.models.signals import post_delete, post_save
+from django.utils.crypto import salted_hmac
+from rest_framework.authentication import BasicAuthentication, TokenAuthentication, get_authorization_header
+from rest_framework.authtoken.models import Token
+
+from drf_lessions.local_cache import LocalCache
+
+_options = getattr(settings, 'BASIC_AUTH_CACHE', {})
+
+# HMAC(用户名 + 密码 + 密码哈希) -> 用户 id，只保存校验成功的组合
+credentials_cache = LocalCache(max_entries=_options.get('MAX_ENTRIES', 1024), timeout=_options.get('TIMEOUT', 60))
+
+_token_options = getattr(settings, 'TOKEN_AUTH_CACHE', {})
+
+# 令牌 -> (用户, 令牌)
+token_cache = LocalCache(max_entries=_token_options.get('MAX_ENTRIES', 4096),
+                         timeout=_token_options.get('LOCAL_TIMEOUT', _token_options.get('TIMEOUT', 300)))
+
+
+def credentials_key(userid, password, password_hash):
+    """用 SECRET_KEY 派生的密钥计算 HMAC，缓存中不出现明文密码"""
+    return salted_hmac('booktest4.credentials', f'{userid}\0{password}\0{password_hash}',
+                       algorithm='sha256').hexdigest()
+
+
+class CachedBasicAuthentication(BasicAuthentication):
+    """
+    缓存校验成功的 Basic 认证凭据，TIMEOUT 内重复请求不再计算密码哈希（PBKDF2）
+
+    每次请求仍按用户名读取一次用户（主键索引查询），缓存键包含数据库中当前的密码哈希：
+    任何进程修改密码后旧凭据立即失效，禁用用户也立即生效（包括 queryset.update()）
+    """
+
+    def authenticate_credentials(self, userid, password, request=None):
+        UserModel = get_user_model()
+        try:
+            user = UserModel._default_manager.get_by_natural_key(userid)
+        except UserModel.DoesNotExist:
+            user = None
+        if user is not None and user.is_active and \
+                credentials_cache.get(credentials_key(userid, password, user.password)) == user.pk:
+            return user, None
+        user, auth = super().authenticate_credentials(userid, password, request)
+        credentials_cache.set(credentials_key(userid, password, user.password), user.pk)
+        return user, auth
+
+
+def shared_token_cache():
+    """TOKEN_AUTH_CACHE['SHARED_ALIAS'] 指定的 Django 缓存，用于多进程之间共享，未配置时返回 None"""
+    alias = getattr(settings, 'TOKEN_AUTH_CACHE', {}).get('SHARED_ALIAS')
+    return caches[alias] if alias else None
+
+
+def token_cache_key(key):
+    return f'auth-token:{key}'
+
+
+# 共享缓存中的撤销版本号，任何进程撤销令牌时更新
+REVOCATIONS_KEY = 'auth-token:revocations'
+
+
+def revocation_version(shared):
+    if shared is None:
+        return None
+    return shared.get_or_set(REVOCATIONS_KEY, uuid.uuid4().hex, None)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    缓存令牌对应的用户，热点令牌不再查询 authtoken_token
+
+    - 进程内 LRU + TTL 缓存；配置 SHARED_ALIAS 后未命中时再查共享缓存
+    - 令牌保存、删除以及用户保存（禁用、修改密码等）时撤销缓存
+    - 配置 SHARED_ALIAS 时，撤销会更新共享的撤销版本号，本地命中时比较版本号（读取一个很小的键），
+      其他进程撤销的令牌立即失效；未配置时其他进程的本地条目最多保留 LOCAL_TIMEOUT 秒
+    """
+
+    def authenticate_credentials(self, key):
+        shared = shared_token_cache()
+        version = revocation_version(shared)
+        cached = token_cache.get(key)
+        if cached is not None and cached[2] != version:
+            # 缓存之后有进程撤销过令牌
+            token_cache.delete(key)
+            cached = None
+        if cached is None and shared is not None:
+            entry = shared.get(token_cache_key(key))
+            if entry is not None:
+                cached = (*entry, version)
+                token_cache.set(key, cached)
+        if cached is not None:
+            user, token, _ = cached
+            return copy.copy(user), copy.copy(token)
+
+        user, token = super().authenticate_credentials(key)
+        token_cache.set(key, (user, token, version))
+        if shared is not None:
+            shared.set(token_cache_key(key), (user, token), getattr(settings, 'TOKEN_AUTH_CACHE', {}).get('TIMEOUT', 300))
+            if revocation_version(shared) != version:
+                # 查询数据库期间有进程撤销了令牌，不能让可能已撤销的结果留在共享缓存中
+                shared.delete(token_cache_key(key))
+        return user, token
+
+    async def aauthenticate(self, request):
+        """
+        异步视图（drf_lessions.async_views）使用：没有共享缓存且本地缓存命中时在事件循环中完成认证，
+        否则在线程中查询共享缓存和数据库
+        """
+        auth = get_authorization_header(request).split()
+        if shared_token_cache() is None and len(auth) == 2 and auth[0].lower() == self.keyword.lower().encode():
+            try:
+                cached = token_cache.get(auth[1].decode())
+            except UnicodeError:
+                cached = None
+            if cached is not None:
+                user, token, _ = cached
+                return copy.copy(user), copy.copy(token)
+        return await sync_to_async(self.authenticate, thread_sensitive=True)(request)
+
+
+def revoke_tokens(*keys):
+    token_cache.delete(*keys)
+    shared = shared_token_cache()
+    if shared is not None:
+        shared.delete_many([token_cache_key(key) for key in keys])
+        # 先删除条目再更新版本号，其他进程的本地条目在下次命中时失效
+        shared.set(REVOCATIONS_KEY, uuid.uuid4().hex, None)
+
+
+def token_changed(sender, instance, **kwargs):
+    revoke_tokens(instance.key)
+
+
+def user_changed(sender, instance, update_fields=None, **kwargs):
+    # 登录只更新 last_login，不影响认证结果，不清除缓存也不撤销令牌
+    if update_fields is not None and not set(update_fields) & {'password', 'is_active', sender.USERNAME_FIELD}:
+        return
+    # 旧密码哈希的条目已经不会命中，这里只是释放内存
+    credentials_cache.delete_if(lambda pk: pk == instance.pk)
+    token_cache.delete_if(lambda entry: entry[0].pk == instance.pk)
+    if shared_token_cache() is not None and kwargs['signal'] is post_save:
+        # 共享缓存无法遍历，按用户查出令牌后删除；删除用户时令牌被级联删除，由 token_changed 处理
+        revoke_tokens(*Token.objects.filter(user=instance).values_list('key', flat=True))
+
+
+post_save.connect(user_changed, sender=get_user_model(), dispatch_uid='booktest4-credentials-save')
+post_delete.connect(user_changed, sender=get_user_model(), dispatch_uid='booktest4-credentials-delete')
+post_save.connect(token_changed, sender=Token, dispatch_uid='booktest4-token-save')
+post_delete.connect(token_changed, sender=Token, dispatch_uid='booktest4-token-delete')
@@ -1,3 +1,141 @@
-from django.test import TestCase
+from base64 import b64encode
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.hashers import check_password
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.test import RequestFactory, TestCase, override_settings
+from rest_framework.authtoken.models import Token
+
+from drf_lessions.local_cache import LocalCache
+from .authentication import CachedTokenAuthentication, credentials_cache, revocation_version, token_cache
+
+
+def basic_auth(username, password):
+    return 'Basic ' + b64encode(f'{username}:{password}'.encode()).decode()
+
+
+class CachedBasicAuthenticationTest(TestCase):
+
+    def setUp(self):
+        credentials_cache.clear()
+        self.user = User.objects.create_user(username='alice', password='secret')
+
+    def get(self, password):
+        return self.client.get('/v4/basic/', HTTP_AUTHORIZATION=basic_auth('alice', password))
+
+    def test_cached_credentials(self):
+        self.assertEqual(self.get('secret').data['user'], 'alice')
+        # 只按用户名读取一次用户，不再计算密码哈希
+        with mock.patch('django.contrib.auth.base_user.check_password', wraps=check_password) as check, \
+                self.assertNumQueries(1):
+            self.assertEqual(self.get('secret').data['user'], 'alice')
+        check.assert_not_called()
+        # 缓存中不保存明文
+        self.assertNotIn('secret', repr(list(credentials_cache._data)))
+
+    def test_wrong_password_not_cached(self):
+        self.assertEqual(self.get('wrong').status_code, 401)
+        self.assertEqual(len(credentials_cache), 0)
+
+    def test_password_change_invalidates(self):
+        self.get('secret')
+        self.user.set_password('changed')
+        self.user.save()
+        self.assertEqual(self.get('secret').status_code, 401)
+        self.assertEqual(self.get('changed').data['user'], 'alice')
+
+    def test_password_change_in_other_process(self):
+        self.get('secret')
+        # 其他进程修改密码：本进程没有收到信号，缓存条目仍在
+        with mock.patch('booktest4.authentication.credentials_cache.delete_if'):
+            self.user.set_password('changed')
+            self.user.save()
+        self.assertEqual(len(credentials_cache), 1)
+        self.assertEqual(self.get('secret').status_code, 401)
+
+        self.get('changed')
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.assertEqual(self.get('changed').status_code, 401)
+
+
+class CachedTokenAuthenticationTest(TestCase):
+
+    def setUp(self):
+        token_cache.clear()
+        caches['default'].clear()
+        self.user = User.objects.create_user(username='alice', password='secret')
+        self.token = Token.objects.create(user=self.user)
+
+    def get(self, key=None):
+        return self.client.get('/v4/token/', HTTP_AUTHORIZATION=f'Token {key or self.token.key}')
+
+    def test_hot_token_no_queries(self):
+        self.assertEqual(self.get().data['user'], 'alice')
+        with self.assertNumQueries(0):
+            self.assertEqual(self.get().data['auth'], self.token.key)
+
+    def test_revoke_on_token_delete(self):
+        self.get()
+        self.token.delete()
+        self.assertEqual(self.get().status_code, 401)
+
+    def test_revoke_on_user_deactivate(self):
+        self.get()
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.get().status_code, 401)
+
+    @override_settings(TOKEN_AUTH_CACHE={'SHARED_ALIAS': 'default'})
+    def test_login_keeps_tokens(self):
+        self.get()
+        version = revocation_version(caches['default'])
+        # 登录只保存 last_login
+        self.assertTrue(self.client.login(username='alice', password='secret'))
+        self.assertEqual(revocation_version(caches['default']), version)
+        self.assertEqual(len(token_cache), 1)
+
+        self.user.is_active = False
+        self.user.save(update_fields=['is_active'])
+        self.assertNotEqual(revocation_version(caches['default']), version)
+        self.assertEqual(self.get().status_code, 401)
+
+    @override_settings(TOKEN_AUTH_CACHE={'SHARED_ALIAS': 'default'})
+    def test_shared_cache(self):
+        self.get()
+        # 模拟另一个进程：本地缓存为空，从共享缓存读取
+        token_cache.clear()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.get().data['user'], 'alice')
+
+        token_cache.clear()
+        self.user.is_active = False
+        self.user.save()
+        token_cache.clear()
+        self.assertEqual(self.get().status_code, 401)
+
+    async def test_async_authenticate(self):
+        request = RequestFactory().get('/', HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        authentication = CachedTokenAuthentication()
+        user, token = await authentication.aauthenticate(request)
+        self.assertEqual(user.username, 'alice')
+        # 命中本地缓存，不切换线程也不查询数据库
+        with mock.patch('booktest4.authentication.sync_to_async') as to_thread:
+            user, token = await authentication.aauthenticate(request)
+        to_thread.assert_not_called()
+        self.assertEqual(token.key, self.token.key)
+
+    @override_settings(TOKEN_AUTH_CACHE={'SHARED_ALIAS': 'default'})
+    def test_revoke_in_other_process(self):
+        # 用另一个本地缓存模拟另一个进程
+        other_process = LocalCache(max_entries=16, timeout=300)
+        with mock.patch('booktest4.authentication.token_cache', other_process):
+            self.assertEqual(self.get().data['user'], 'alice')
+        self.assertEqual(len(other_process), 1)
+
+        # 本进程撤销令牌，另一个进程没有收到信号，本地条目仍在
+        self.get()
+        self.token.delete()
+        self.assertEqual(len(other_process), 1)
+        with mock.patch('booktest4.authentication.token_cache', other_process):
+            self.assertEqual(self.get().status_code, 401)
@@ -1,11 +1,13 @@
-from rest_framework.authentication import SessionAuthentication, BasicAuthentication, TokenAuthentication
+from rest_framework.authentication import SessionAuthentication
 from rest_framework.decorators import api_view, authentication_classes, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
+from .authentication import CachedBasicAuthentication, CachedTokenAuthentication
+
 
 @api_view(['GET'])
-@authentication_classes([SessionAuthentication, BasicAuthentication])
+@authentication_classes([SessionAuthentication, CachedBasicAuthentication])
 @permission_classes([IsAuthenticated])
 def example_view(request, format=None):
     content = {
@@ -16,7 +18,7 @@ def example_view(request, format=None):
 
 
 @api_view(['GET'])
-@authentication_classes([BasicAuthentication])
+@authentication_classes([CachedBasicAuthentication])
 def basic_view(request):
     content = {
         'user': str(request.user),  # `django.contrib.auth.User` instance.
@@ -36,7 +38,7 @@ def session_view(request):
 
 
 @api_view(['GET'])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 def token_view(request):
     content = {
         'user': str(request.user),  # `django.contrib.auth.User` instance.
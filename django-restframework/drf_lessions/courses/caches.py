@@ -0,0 +1,11 @@
+from django.contrib.auth.models import User
+
+from drf_lessions.response_cache import TableVersion
+from .models import Course, Module, Subject
+
+# 课程目录响应缓存的表版本号，任何学科、课程、章节以及课程作者的用户名变化时失效；
+# 用户只跟踪目录中输出的用户名，登录更新 last_login 等不会使目录缓存失效
+subject_version = TableVersion(Subject)
+course_version = TableVersion(Course)
+module_version = TableVersion(Module)
+owner_version = TableVersion(User, fields=['username'])
@@ -0,0 +1,104 @@
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.db.models.signals import post_delete, post_init, post_save, pre_delete, pre_save
+
+from .models import Course, Module
+
+# 外键被 only()/defer() 延迟加载，没有记录加载时的值
+NOT_LOADED = object()
+
+
+class Counter(object):
+    """
+    父模型上冗余的子对象计数，子对象创建、删除、更换父对象时用 F() 表达式原子地加减，
+    不需要先读出计数；bulk_create、queryset.update()/delete() 不发送信号，由 repair() 修复
+    """
+
+    def __init__(self, model, fk_name, field):
+        self.model = model
+        self.fk = model._meta.get_field(fk_name)
+        self.parent_model = self.fk.related_model
+        self.field = field
+        # 记录加载时的父对象 id，保存时判断是否更换了父对象
+        self.loaded_attr = f'_{self.fk.attname}_loaded'
+
+        # 所有接收器只接收子模型的信号，加载其他模型的实例没有额外开销
+        uid = f'{model._meta.label_lower}-{field}-counter'
+        post_init.connect(self.loaded, sender=model, dispatch_uid=f'{uid}-init', weak=False)
+        pre_save.connect(self.saving, sender=model, dispatch_uid=f'{uid}-pre-save', weak=False)
+        post_save.connect(self.saved, sender=model, dispatch_uid=f'{uid}-save', weak=False)
+        pre_delete.connect(self.deleting, sender=model, dispatch_uid=f'{uid}-pre-delete', weak=False)
+        post_delete.connect(self.deleted, sender=model, dispatch_uid=f'{uid}-delete', weak=False)
+
+    def add(self, parent_id, delta):
+        if parent_id is None:
+            return
+        parents = self.parent_model._default_manager.filter(pk=parent_id)
+        if delta < 0:
+            # 计数有偏差时（例如 bulk_create 的子对象被级联删除）不减成负数，留给 repair() 修复
+            parents = parents.filter(**{f'{self.field}__gte': -delta})
+        parents.update(**{self.field: F(self.field) + delta})
+
+    def loaded(self, instance, **kwargs):
+        # 延迟加载的外键不在 __dict__ 中，不能为了记录它触发查询
+        instance.__dict__[self.loaded_attr] = instance.__dict__.get(self.fk.attname, NOT_LOADED)
+
+    def saves_fk(self, update_fields):
+        return update_fields is None or self.fk.name in update_fields or self.fk.attname in update_fields
+
+    def saving(self, instance, raw=False, update_fields=None, **kwargs):
+        # 延迟加载的外键被赋了新值时，保存前从数据库读出原来的父对象
+        if raw or instance._state.adding or not self.saves_fk(update_fields):
+            return
+        if instance.__dict__.get(self.loaded_attr, NOT_LOADED) is NOT_LOADED:
+            instance.__dict__[self.loaded_attr] = self.model._default_manager.filter(pk=instance.pk) \
+                .values_list(self.fk.attname, flat=True).first()
+
+    def saved(self, instance, created, raw=False, update_fields=None, **kwargs):
+        if raw:
+            return
+        parent_id = getattr(instance, self.fk.attname)
+        if created:
+            self.add(parent_id, 1)
+        elif self.saves_fk(update_fields):
+            old_id = instance.__dict__.get(self.loaded_attr, NOT_LOADED)
+            if old_id is not NOT_LOADED and old_id != parent_id:
+                with transaction.atomic():
+                    self.add(old_id, -1)
+                    self.add(parent_id, 1)
+        else:
+            return
+        instance.__dict__[self.loaded_attr] = parent_id
+
+    def deleting(self, instance, **kwargs):
+        # 删除前行还存在，延迟加载的外键可以读出
+        if instance.__dict__.get(self.loaded_attr, NOT_LOADED) is NOT_LOADED:
+            instance.__dict__[self.loaded_attr] = getattr(instance, self.fk.attname)
+
+    def deleted(self, instance, **kwargs):
+        # 级联删除父对象时更新的是即将删除的行，没有影响
+        parent_id = instance.__dict__.get(self.loaded_attr, NOT_LOADED)
+        if parent_id is not NOT_LOADED:
+            self.add(parent_id, -1)
+
+    def actual_count(self):
+        return Coalesce(Subquery(
+            self.model._default_manager.filter(**{self.fk.name: OuterRef('pk')}).order_by()
+            .values(self.fk.name).annotate(count=Count('pk')).values('count')
+        ), 0)
+
+    def repair(self):
+        """重新计算有偏差的计数，返回修复的行数"""
+        parents = self.parent_model._default_manager.order_by()
+        drifted = list(parents.annotate(actual=self.actual_count()).exclude(**{self.field: F('actual')})
+                       .values_list('pk', flat=True))
+        if drifted:
+            # 在 UPDATE 语句中重新计数，不会覆盖读出偏差之后发生的增减
+            parents.filter(pk__in=drifted).update(**{self.field: self.actual_count()})
+        return len(drifted)
+
+
+# 在 CoursesConfig.ready() 中导入，管理命令、后台等所有入口都会维护计数
+course_counter = Counter(Course, 'subject', 'course_count')
+module_counter = Counter(Module, 'course', 'module_count')
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from courses.caches import course_version, subject_version
+from courses.counters import course_counter, module_counter
+
+
+class Command(BaseCommand):
+    help = 'Recompute Subject.course_count and Course.module_count rows that drifted from the actual counts.'
+
+    def handle(self, *args, **options):
+        subjects = course_counter.repair()
+        courses = module_counter.repair()
+        # UPDATE 不发送信号，手动让目录的响应缓存失效
+        if subjects:
+            subject_version.bump()
+        if courses:
+            course_version.bump()
+        self.stdout.write(self.style.SUCCESS(
+            'Repaired %d subject course counts and %d course module counts' % (subjects, courses)))
@@ -0,0 +1,38 @@
+# Generated by Django 3.2.7 on 2026-10-18 17:53
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_counters(apps, schema_editor):
+    Subject = apps.get_model('courses', 'Subject')
+    Course = apps.get_model('courses', 'Course')
+    Module = apps.get_model('courses', 'Module')
+    courses = Course.objects.filter(subject=OuterRef('pk')).order_by().values('subject') \
+        .annotate(count=Count('pk')).values('count')
+    modules = Module.objects.filter(course=OuterRef('pk')).order_by().values('course') \
+        .annotate(count=Count('pk')).values('count')
+    Subject.objects.update(course_count=Coalesce(Subquery(courses), 0))
+    Course.objects.update(module_count=Coalesce(Subquery(modules), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='module_count',
+            field=models.PositiveIntegerField(db_index=True, default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='subject',
+            name='course_count',
+            field=models.PositiveIntegerField(db_index=True, default=0, editable=False),
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
@@ -3,9 +3,33 @@ from django.contrib.auth.models import User
 from django.db import models
 
 
-class Subject(models.Model):
+class CounterFieldsMixin(object):
+    """
+    冗余计数由 courses.counters 用 UPDATE ... SET field = field + 1 维护，
+    普通保存不写计数列，避免内存中较早加载的实例把过期的计数写回数据库
+    """
+    counter_fields = ()
+
+    def save(self, force_insert=False, force_update=False, using=None, update_fields=None):
+        if not self._state.adding and not force_insert:
+            if update_fields is None:
+                deferred = self.get_deferred_fields()
+                update_fields = [field.name for field in self._meta.concrete_fields
+                                 if not field.primary_key and field.attname not in deferred]
+            update_fields = [name for name in update_fields if name not in self.counter_fields]
+            if not update_fields:
+                return
+        super().save(force_insert=force_insert, force_update=force_update, using=using,
+                     update_fields=update_fields)
+
+
+class Subject(CounterFieldsMixin, models.Model):
     title = models.CharField(max_length=200)
     slug = models.SlugField(max_length=200, unique=True)
+    # 冗余的课程数，由 courses.counters 维护，repair_counters 命令修复偏差
+    course_count = models.PositiveIntegerField(default=0, editable=False, db_index=True)
+
+    counter_fields = ('course_count',)
 
     class Meta:
         ordering = ['title']
@@ -14,13 +38,17 @@ class Subject(models.Model):
         return self.title
 
 
-class Course(models.Model):
+class Course(CounterFieldsMixin, models.Model):
     owner = models.ForeignKey(User, related_name='courses_created', on_delete=models.CASCADE)
     subject = models.ForeignKey(Subject, related_name='courses', on_delete=models.CASCADE)
     title = models.CharField(max_length=120)
     slug = models.SlugField(max_length=200, unique=True)
     overview = models.TextField()
     created = models.DateTimeField(auto_now_add=True)
+    # 冗余的章节数
+    module_count = models.PositiveIntegerField(default=0, editable=False, db_index=True)
+
+    counter_fields = ('module_count',)
 
     class Meta:
         ordering = ['-created']
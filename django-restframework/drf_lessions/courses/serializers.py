@@ -0,0 +1,56 @@
+from rest_framework import serializers
+
+from .models import Course, Module, Subject
+
+
+class TreeSerializerMixin(object):
+    """
+    目录树中的一层，nested_field 为下一层的嵌套字段
+    context['depth'] 限制从根序列化器开始输出的层数，达到深度的一层不输出 nested_field
+    """
+    nested_field = None
+
+    @property
+    def tree_level(self):
+        # 根序列化器为 0 层，many=True 时的 ListSerializer 不计入层数
+        level, parent = 0, self.parent
+        while parent is not None:
+            if not isinstance(parent, serializers.ListSerializer):
+                level += 1
+            parent = parent.parent
+        return level
+
+    def get_fields(self):
+        fields = super().get_fields()
+        depth = self.context.get('depth')
+        if self.nested_field and depth is not None and self.tree_level >= depth:
+            fields.pop(self.nested_field, None)
+        return fields
+
+
+class ModuleSerializer(TreeSerializerMixin, serializers.ModelSerializer):
+    class Meta:
+        model = Module
+        fields = ['id', 'title', 'description']
+
+
+class CourseSerializer(TreeSerializerMixin, serializers.ModelSerializer):
+    nested_field = 'modules'
+
+    owner = serializers.ReadOnlyField(source='owner.username')
+    subject = serializers.SlugRelatedField(slug_field='slug', read_only=True)
+    modules = ModuleSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Course
+        fields = ['id', 'title', 'slug', 'overview', 'owner', 'subject', 'created', 'module_count', 'modules']
+
+
+class SubjectSerializer(TreeSerializerMixin, serializers.ModelSerializer):
+    nested_field = 'courses'
+
+    courses = CourseSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Subject
+        fields = ['id', 'title', 'slug', 'course_count', 'courses']
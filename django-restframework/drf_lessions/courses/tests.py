@@ -1,3 +1,172 @@
-from django.test import TestCase
+import io
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.management import call_command
+from django.test import Client, TestCase
+
+from .models import Course, Module, Subject
+
+
+class CatalogueTreeTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(username='teacher', password='teacher123')
+        for i in range(3):
+            subject = Subject.objects.create(title=f'学科{i}', slug=f'subject-{i}')
+            for j in range(3):
+                course = Course.objects.create(owner=cls.owner, subject=subject, title=f'课程{i}-{j}',
+                                               slug=f'course-{i}-{j}', overview='overview')
+                Module.objects.bulk_create([Module(course=course, title=f'章节{k}', description='')
+                                            for k in range(3)])
+
+    def setUp(self):
+        caches['responses'].clear()
+
+    def get(self, url, **params):
+        return self.client.get(url, params, HTTP_ACCEPT='application/json')
+
+    def test_full_tree_bounded_queries(self):
+        # 学科、课程（JOIN 作者）、章节各一次，与节点数量无关
+        with self.assertNumQueries(3):
+            data = self.get('/catalogue/subjects/').json()
+        self.assertEqual(len(data), 3)
+        course = data[0]['courses'][0]
+        self.assertEqual(course['owner'], 'teacher')
+        self.assertEqual(course['subject'], 'subject-0')
+        self.assertEqual([module['title'] for module in course['modules']], ['章节0', '章节1', '章节2'])
+
+    def test_depth(self):
+        with self.assertNumQueries(1):
+            data = self.get('/catalogue/subjects/', depth=0).json()
+        self.assertNotIn('courses', data[0])
+
+        with self.assertNumQueries(2):
+            data = self.get('/catalogue/subjects/subject-1/', depth=1).json()
+        self.assertEqual(len(data['courses']), 3)
+        self.assertNotIn('modules', data['courses'][0])
+
+        with self.assertNumQueries(1):
+            data = self.get('/catalogue/courses/course-0-0/', depth=0).json()
+        self.assertNotIn('modules', data)
+
+        self.assertEqual(self.get('/catalogue/subjects/', depth=3).status_code, 400)
+        self.assertEqual(self.get('/catalogue/courses/', depth='x').status_code, 400)
+
+    def test_cache_invalidation(self):
+        url = '/catalogue/courses/course-2-2/'
+        self.get(url)
+        with self.assertNumQueries(0):
+            self.get(url)
+
+        module = Module.objects.filter(course__slug='course-2-2').first()
+        module.title = '新章节'
+        module.save()
+        self.assertEqual(self.get(url).json()['modules'][0]['title'], '新章节')
+
+        Course.objects.filter(slug='course-2-2').first().delete()
+        self.assertEqual(self.get(url).status_code, 404)
+
+    def test_owner_changes(self):
+        url = '/catalogue/courses/course-0-0/'
+        self.get(url)
+        # 作者在别处登录只更新 last_login，目录缓存仍然有效
+        self.assertTrue(Client().login(username='teacher', password='teacher123'))
+        owner = User.objects.get(pk=self.owner.pk)
+        owner.email = 'teacher@example.com'
+        owner.save()
+        with self.assertNumQueries(0):
+            self.get(url)
+
+        owner.username = 'professor'
+        owner.save()
+        self.assertEqual(self.get(url).json()['owner'], 'professor')
+
+
+class CounterTest(TestCase):
+
+    def setUp(self):
+        caches['responses'].clear()
+        self.owner = User.objects.create_user(username='teacher', password='teacher123')
+        self.python = Subject.objects.create(title='Python', slug='python')
+        self.django = Subject.objects.create(title='Django', slug='django')
+        self.course = Course.objects.create(owner=self.owner, subject=self.python, title='入门', slug='intro',
+                                            overview='')
+
+    def counts(self):
+        return (Subject.objects.get(pk=self.python.pk).course_count,
+                Subject.objects.get(pk=self.django.pk).course_count,
+                Course.objects.get(pk=self.course.pk).module_count)
+
+    def test_create_move_delete(self):
+        module = Module.objects.create(course=self.course, title='第一章', description='')
+        Module.objects.create(course=self.course, title='第二章', description='')
+        self.assertEqual(self.counts(), (1, 0, 2))
+
+        # 重新读取后更换学科
+        course = Course.objects.get(pk=self.course.pk)
+        course.subject = self.django
+        course.save()
+        self.assertEqual(self.counts(), (0, 1, 2))
+
+        module.delete()
+        self.assertEqual(self.counts(), (0, 1, 1))
+
+        course.delete()
+        self.assertEqual(Subject.objects.get(pk=self.django.pk).course_count, 0)
+
+    def test_deferred_foreign_key(self):
+        Module.objects.create(course=self.course, title='第一章', description='')
+        # 只加载标题，保存标题不会改动计数
+        course = Course.objects.only('title').get(pk=self.course.pk)
+        course.title = '新标题'
+        course.save()
+        self.assertEqual(self.counts(), (1, 0, 1))
+
+        # 延迟加载的外键被修改时读出原来的学科
+        course = Course.objects.defer('subject').get(pk=self.course.pk)
+        course.subject = self.django
+        course.save()
+        self.assertEqual(self.counts(), (0, 1, 1))
+
+        Module.objects.only('title').get(course=self.course).delete()
+        self.assertEqual(self.counts(), (0, 1, 0))
+        Course.objects.only('title').get(pk=self.course.pk).delete()
+        self.assertEqual(Subject.objects.get(pk=self.django.pk).course_count, 0)
+
+    def test_stale_parent_save(self):
+        Module.objects.create(course=self.course, title='第一章', description='')
+        Module.objects.create(course=self.course, title='第二章', description='')
+        # self.course、self.python 是加章节、课程之前加载的，保存时不写回过期的计数
+        self.course.title = '改名'
+        self.course.save()
+        self.python.title = 'Python 3'
+        self.python.save()
+        self.assertEqual(self.counts(), (1, 0, 2))
+        self.assertEqual(Course.objects.get(pk=self.course.pk).title, '改名')
+
+        self.course.save(update_fields=['title', 'module_count'])
+        self.assertEqual(self.counts(), (1, 0, 2))
+
+    def test_no_read_before_write(self):
+        # 只有 INSERT 和一条 UPDATE ... SET module_count = module_count + 1
+        with self.assertNumQueries(2):
+            Module.objects.create(course=self.course, title='第一章', description='')
+
+    def test_repair_command(self):
+        Module.objects.bulk_create([Module(course=self.course, title=str(i), description='') for i in range(3)])
+        Subject.objects.filter(pk=self.django.pk).update(course_count=5)
+        out = io.StringIO()
+        call_command('repair_counters', stdout=out)
+        self.assertIn('Repaired 1 subject course counts and 1 course module counts', out.getvalue())
+        self.assertEqual(self.counts(), (1, 0, 3))
+
+    def test_filter_and_order(self):
+        Course.objects.create(owner=self.owner, subject=self.python, title='进阶', slug='advanced', overview='')
+        with self.assertNumQueries(1):
+            data = self.client.get('/catalogue/subjects/', {'depth': 0, 'ordering': '-course_count'}).json()
+        self.assertEqual([(item['slug'], item['course_count']) for item in data], [('python', 2), ('django', 0)])
+
+        data = self.client.get('/catalogue/subjects/', {'depth': 0, 'course_count__gte': 1}).json()
+        self.assertEqual([item['slug'] for item in data], ['python'])
@@ -0,0 +1,10 @@
+from django.urls import path
+from . import views
+
+app_name = 'courses'
+urlpatterns = [
+    path('subjects/', views.SubjectList.as_view(), name='subject-list'),
+    path('subjects/<slug:slug>/', views.SubjectDetail.as_view(), name='subject-detail'),
+    path('courses/', views.CourseList.as_view(), name='course-list'),
+    path('courses/<slug:slug>/', views.CourseDetail.as_view(), name='course-detail'),
+]
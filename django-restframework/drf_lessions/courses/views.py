@@ -1,3 +1,103 @@
-from django.shortcuts import render
+from django.db.models import Prefetch
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework import filters, generics, serializers
 
-# Create your views here.
+from drf_lessions.response_cache import cache_response
+from .caches import course_version, module_version, owner_version, subject_version
+from .models import Course, Module, Subject
+from .serializers import CourseSerializer, SubjectSerializer
+
+
+class CatalogueTreeMixin(object):
+    """
+    按 ?depth= 输出目录树，默认输出完整的树
+    每一层用一个 prefetch_related 查询加载，查询次数只与深度有关，与节点数量无关
+    """
+    depth_query_param = 'depth'
+    # 各层的 Prefetch，第 n 个元素加载第 n + 1 层
+    tree = []
+
+    def get_depth(self):
+        if not hasattr(self, '_depth'):
+            value = self.request.query_params.get(self.depth_query_param)
+            if value is None:
+                self._depth = len(self.tree)
+            else:
+                field = serializers.IntegerField(min_value=0, max_value=len(self.tree))
+                try:
+                    self._depth = field.run_validation(value)
+                except serializers.ValidationError as exc:
+                    raise serializers.ValidationError({self.depth_query_param: exc.detail})
+        return self._depth
+
+    def get_queryset(self):
+        return super().get_queryset().prefetch_related(*self.tree[:self.get_depth()])
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['depth'] = self.get_depth()
+        return context
+
+
+# 学科下的课程与章节，课程 JOIN 作者；反向预加载会把学科设置到每门课程上，不需要再 JOIN 学科
+subject_tree = [
+    Prefetch('courses', queryset=Course.objects.select_related('owner')),
+    Prefetch('courses__modules', queryset=Module.objects.order_by('pk')),
+]
+course_tree = [Prefetch('modules', queryset=Module.objects.order_by('pk'))]
+
+
+catalogue_versions = (subject_version, course_version, module_version, owner_version)
+
+
+class SubjectList(CatalogueTreeMixin, generics.ListAPIView):
+    """
+    学科 -> 课程 -> 章节，?depth=0 只输出学科，?depth=1 输出到课程
+    按冗余的课程数过滤、排序，例如 ?course_count__gte=3&ordering=-course_count，不需要聚合查询
+    """
+    queryset = Subject.objects.all()
+    serializer_class = SubjectSerializer
+    tree = subject_tree
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
+    filterset_fields = {'course_count': ['exact', 'gte', 'lte']}
+    ordering_fields = ['title', 'course_count']
+
+    @cache_response(*catalogue_versions)
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+
+class SubjectDetail(CatalogueTreeMixin, generics.RetrieveAPIView):
+    queryset = Subject.objects.all()
+    serializer_class = SubjectSerializer
+    lookup_field = 'slug'
+    tree = subject_tree
+
+    @cache_response(*catalogue_versions)
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+
+class CourseList(CatalogueTreeMixin, generics.ListAPIView):
+    """课程 -> 章节，?depth=0 不输出章节，按章节数过滤、排序"""
+    queryset = Course.objects.select_related('owner', 'subject')
+    serializer_class = CourseSerializer
+    tree = course_tree
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
+    filterset_fields = {'module_count': ['exact', 'gte', 'lte'], 'subject__slug': ['exact']}
+    ordering_fields = ['created', 'title', 'module_count']
+
+    @cache_response(*catalogue_versions)
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+
+class CourseDetail(CatalogueTreeMixin, generics.RetrieveAPIView):
+    queryset = Course.objects.select_related('owner', 'subject')
+    serializer_class = CourseSerializer
+    lookup_field = 'slug'
+    tree = course_tree
+
+    @cache_response(*catalogue_versions)
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
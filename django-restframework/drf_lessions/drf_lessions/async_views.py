@@ -0,0 +1,167 @@
+"""
+ASGI 下的异步只读视图
+
+DRF 3.12 与 Django 3.2 都没有异步的 APIView 和异步 ORM，这里的 AsyncAPIView 在事件循环中完成
+内容协商、认证、权限、限流与 JSON 渲染，只把访问数据库的部分放到线程中执行：
+
+- 认证类实现了 aauthenticate()、限流类实现了 aallow_request() 时直接在事件循环中调用，
+  否则通过 sync_to_async 调用同步版本
+- 同步的处理方法（例如继承自同步视图的 post）整体放到线程中执行
+- 权限类在事件循环中同步调用，不能访问数据库
+- JSON 响应在视图中渲染成普通的 HttpResponse，Django 不必再切换到线程中调用 render()；
+  可浏览 API 等其他渲染器仍由 Django 在线程中渲染
+"""
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponse
+from rest_framework import exceptions, generics, mixins
+from rest_framework.authentication import BasicAuthentication, SessionAuthentication, get_authorization_header
+from rest_framework.renderers import JSONRenderer
+from rest_framework.views import APIView
+
+try:
+    # Django 3.2 通过 asyncio.iscoroutinefunction() 判断视图是否异步
+    from asyncio.coroutines import _is_coroutine
+except ImportError:  # Python 3.12+
+    _is_coroutine = None
+
+
+def database_sync_to_async(func):
+    """访问数据库的同步函数，与 Django 的 ORM 一样在 thread_sensitive 的线程中执行"""
+    return sync_to_async(func, thread_sensitive=True)
+
+
+class AsyncSessionAuthentication(SessionAuthentication):
+    """没有会话 Cookie 的请求直接视为匿名，不必为读取会话切换线程"""
+
+    async def aauthenticate(self, request):
+        if settings.SESSION_COOKIE_NAME not in request._request.COOKIES:
+            return None
+        return await database_sync_to_async(self.authenticate)(request)
+
+
+class AsyncBasicAuthentication(BasicAuthentication):
+    """没有 Basic 认证头的请求不切换线程"""
+
+    async def aauthenticate(self, request):
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() != b'basic':
+            return None
+        return await database_sync_to_async(self.authenticate)(request)
+
+
+class AsyncAPIView(APIView):
+    # DRF 默认认证类的异步版本
+    authentication_classes = [AsyncSessionAuthentication, AsyncBasicAuthentication]
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+        if _is_coroutine is not None:
+            view._is_coroutine = _is_coroutine
+        else:
+            from inspect import markcoroutinefunction
+            markcoroutinefunction(view)
+        return view
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await self.ainitial(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+
+            if asyncio.iscoroutinefunction(handler):
+                response = await handler(request, *args, **kwargs)
+            else:
+                response = await database_sync_to_async(handler)(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.render_json(self.response)
+
+    async def ainitial(self, request, *args, **kwargs):
+        """与 APIView.initial() 相同，认证与限流使用异步版本"""
+        self.format_kwarg = self.get_format_suffix(**kwargs)
+
+        neg = self.perform_content_negotiation(request)
+        request.accepted_renderer, request.accepted_media_type = neg
+
+        version, scheme = self.determine_version(request, *args, **kwargs)
+        request.version, request.versioning_scheme = version, scheme
+
+        await self.aperform_authentication(request)
+        self.check_permissions(request)
+        await self.acheck_throttles(request)
+
+    async def aperform_authentication(self, request):
+        """与 Request._authenticate() 相同，结果写入 request.user / request.auth"""
+        for authenticator in request.authenticators:
+            try:
+                if hasattr(authenticator, 'aauthenticate'):
+                    user_auth_tuple = await authenticator.aauthenticate(request)
+                else:
+                    user_auth_tuple = await database_sync_to_async(authenticator.authenticate)(request)
+            except exceptions.APIException:
+                request._not_authenticated()
+                raise
+
+            if user_auth_tuple is not None:
+                request._authenticator = authenticator
+                request.user, request.auth = user_auth_tuple
+                return
+
+        request._not_authenticated()
+
+    async def acheck_throttles(self, request):
+        throttle_durations = []
+        for throttle in self.get_throttles():
+            if hasattr(throttle, 'aallow_request'):
+                allowed = await throttle.aallow_request(request, self)
+            else:
+                allowed = await database_sync_to_async(throttle.allow_request)(request, self)
+            if not allowed:
+                throttle_durations.append(throttle.wait())
+
+        if throttle_durations:
+            durations = [duration for duration in throttle_durations if duration is not None]
+            self.throttled(request, max(durations, default=None))
+
+    def render_json(self, response):
+        if not isinstance(getattr(response, 'accepted_renderer', None), JSONRenderer):
+            return response
+        response.render()
+        rendered = HttpResponse(response.content, status=response.status_code)
+        for header, value in response.items():
+            rendered[header] = value
+        rendered.cookies = response.cookies
+        return rendered
+
+
+class AsyncGenericAPIView(AsyncAPIView, generics.GenericAPIView):
+    pass
+
+
+class AsyncListAPIView(mixins.ListModelMixin, AsyncGenericAPIView):
+    """只读列表，查询、分页与序列化在一次线程切换中完成"""
+
+    async def get(self, request, *args, **kwargs):
+        return await database_sync_to_async(self.list)(request, *args, **kwargs)
+
+
+class AsyncRetrieveAPIView(mixins.RetrieveModelMixin, AsyncGenericAPIView):
+    """只读详情"""
+
+    async def get(self, request, *args, **kwargs):
+        return await database_sync_to_async(self.retrieve)(request, *args, **kwargs)
@@ -0,0 +1,119 @@
+import atexit
+import logging
+import threading
+import time
+import weakref
+from collections import Counter as _Counter
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import F
+
+logger = logging.getLogger(__name__)
+
+# 进程退出时写回所有缓冲中的计数
+_instances = weakref.WeakSet()
+
+
+class BufferedCounter(object):
+    """
+    在进程内合并计数器增量，定期用 UPDATE ... SET field = field + n 写回，每个对象一条语句
+
+    - incr() 只在内存中累加，不在调用方（请求）的线程和事务中写回：有缓冲的增量时后台定时器在
+      FLUSH_INTERVAL 秒后写回，距上次写回超过 FLUSH_INTERVAL 秒或缓冲的对象数超过 MAX_PENDING 时立即在后台写回
+    - 写回在一个事务中执行，失败时增量放回缓冲区，不会丢失；进程退出时写回剩余的增量
+    - 每个对象的写回都是原子的自增，多个进程同时写回也不会相互覆盖
+    - 进程异常终止时丢失尚未写回的增量（最多 FLUSH_INTERVAL 秒）
+    - on_flush(pks) 在写回成功后调用，用于使缓存失效（UPDATE 不发送模型信号）
+    """
+
+    def __init__(self, model, field, flush_interval=None, max_pending=None, on_flush=None):
+        options = getattr(settings, 'VIEW_COUNTER', {})
+        self.model = model
+        self.field = field
+        self.flush_interval = flush_interval if flush_interval is not None else options.get('FLUSH_INTERVAL', 5)
+        self.max_pending = max_pending if max_pending is not None else options.get('MAX_PENDING', 1000)
+        self.on_flush = on_flush
+        self._pending = _Counter()
+        self._lock = threading.Lock()
+        # 同一进程内串行写回，避免多个线程同时持有写锁
+        self._flush_lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self._timer = None
+        _instances.add(self)
+
+    def incr(self, pk, amount=1):
+        """
+        累加增量，返回累加后该对象尚未写回的增量（包括本次）；
+        写回失败不会影响调用方，增量留在缓冲区中由定时器重试
+        """
+        with self._lock:
+            self._pending[pk] += amount
+            total = self._pending[pk]
+            due = (len(self._pending) >= self.max_pending
+                   or time.monotonic() - self._last_flush >= self.flush_interval)
+            self._schedule(0 if due else self.flush_interval)
+        return total
+
+    def _schedule(self, delay):
+        # 调用方持有 self._lock；已有更早触发的定时器时不重复创建
+        timer = self._timer
+        if timer is not None:
+            if timer.interval <= delay:
+                return
+            timer.cancel()
+        self._timer = threading.Timer(delay, self._timed_flush)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _timed_flush(self):
+        with self._lock:
+            # 被取消的定时器可能已经开始执行，不能清除替换它的定时器
+            if self._timer is threading.current_thread():
+                self._timer = None
+        try:
+            self.flush()
+        except Exception:
+            logger.exception('failed to flush %s.%s', self.model._meta.label, self.field)
+            with self._lock:
+                if self._pending:
+                    self._schedule(self.flush_interval)
+        finally:
+            # 定时器线程中打开的数据库连接不会被请求结束信号关闭
+            connections.close_all()
+
+    def pending(self, pk):
+        """尚未写回数据库的增量，读取时加到数据库中的值上"""
+        with self._lock:
+            return self._pending.get(pk, 0)
+
+    def flush(self):
+        """写回所有缓冲中的增量，返回写回的对象数"""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, _Counter()
+                self._last_flush = time.monotonic()
+            pending = {pk: amount for pk, amount in pending.items() if amount}
+            if not pending:
+                return 0
+            try:
+                with transaction.atomic(using=self.model._default_manager.db):
+                    for pk, amount in pending.items():
+                        self.model._default_manager.filter(pk=pk).update(**{self.field: F(self.field) + amount})
+            except Exception:
+                with self._lock:
+                    self._pending.update(pending)
+                raise
+        logger.debug('flushed %s.%s for %d objects', self.model._meta.label, self.field, len(pending))
+        if self.on_flush is not None:
+            self.on_flush(list(pending))
+        return len(pending)
+
+
+@atexit.register
+def flush_all():
+    for counter in list(_instances):
+        try:
+            counter.flush()
+        except Exception:
+            logger.exception('failed to flush %s.%s', counter.model._meta.label, counter.field)
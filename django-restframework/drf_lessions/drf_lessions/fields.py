@@ -0,0 +1,19 @@
+from rest_framework import serializers
+
+from .reverse import cached_reverse
+
+
+class CachedHyperlinkedRelatedField(serializers.HyperlinkedRelatedField):
+    """使用 cached_reverse() 生成链接的 HyperlinkedRelatedField"""
+
+    def __init__(self, view_name=None, **kwargs):
+        super().__init__(view_name, **kwargs)
+        self.reverse = cached_reverse
+
+
+class CachedHyperlinkedIdentityField(serializers.HyperlinkedIdentityField):
+    """使用 cached_reverse() 生成链接的 HyperlinkedIdentityField，可作为 serializer_url_field"""
+
+    def __init__(self, view_name=None, **kwargs):
+        super().__init__(view_name, **kwargs)
+        self.reverse = cached_reverse
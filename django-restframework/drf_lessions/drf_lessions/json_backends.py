@@ -0,0 +1,97 @@
+"""
+可替换的 JSON 编解码后端，通过 settings.JSON_BACKEND 选择：
+
+    - 'stdlib'  标准库 json（C 加速），输出与 JsonResponse / DjangoJSONEncoder 完全相同（默认）
+    - 'orjson'  orjson，需要安装 orjson，输出紧凑的 UTF-8，日期时间格式与 DjangoJSONEncoder 一致
+    - 'auto'    安装了 orjson 时使用 orjson，否则使用标准库
+
+也可以是 JSONBackend 子类的导入路径
+"""
+import json
+import threading
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.core.signals import setting_changed
+from django.utils.module_loading import import_string
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class JSONBackend(object):
+    name = None
+    # 流式输出 JSON 数组时元素之间的分隔符，与 dumps(list) 的输出保持一致
+    item_separator = b','
+
+    def dumps(self, obj):
+        """返回 bytes"""
+        raise NotImplementedError('`dumps()` must be implemented.')
+
+    def loads(self, data):
+        raise NotImplementedError('`loads()` must be implemented.')
+
+
+class StdlibJSONBackend(JSONBackend):
+    """参数默认与 JsonResponse 相同"""
+    name = 'stdlib'
+
+    def __init__(self, encoder=DjangoJSONEncoder, ensure_ascii=True, separators=(', ', ': ')):
+        self.encoder = encoder(ensure_ascii=ensure_ascii, separators=separators)
+        self.item_separator = separators[0].encode()
+
+    def dumps(self, obj):
+        return self.encoder.encode(obj).encode()
+
+    def loads(self, data):
+        return json.loads(data)
+
+
+class OrjsonJSONBackend(JSONBackend):
+    name = 'orjson'
+
+    def __init__(self, default=None):
+        if orjson is None:
+            raise ImportError('OrjsonJSONBackend requires the orjson package.')
+        # UUID 由 orjson 直接编码；日期时间、Decimal 等交给 default（默认 DjangoJSONEncoder），
+        # 格式与对应的标准库编码器一致；非字符串的键与 json 模块一样转换成字符串
+        self.default = default or DjangoJSONEncoder().default
+        self.option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+    def dumps(self, obj):
+        return orjson.dumps(obj, default=self.default, option=self.option)
+
+    def loads(self, data):
+        return orjson.loads(data)
+
+
+BACKENDS = {
+    'stdlib': StdlibJSONBackend,
+    'orjson': OrjsonJSONBackend,
+}
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_json_backend():
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            name = getattr(settings, 'JSON_BACKEND', 'stdlib')
+            if name == 'auto':
+                name = 'orjson' if orjson is not None else 'stdlib'
+            _backend = (BACKENDS.get(name) or import_string(name))()
+        return _backend
+
+
+def reset_json_backend(*, setting, **kwargs):
+    global _backend
+    if setting == 'JSON_BACKEND':
+        with _backend_lock:
+            _backend = None
+
+
+setting_changed.connect(reset_json_backend)
@@ -0,0 +1,94 @@
+from itertools import islice
+
+from django.db.models import prefetch_related_objects
+from django.http import StreamingHttpResponse
+from rest_framework.pagination import LimitOffsetPagination, PageNumberPagination
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+from .compiled import NotCompilable, compile_serializer
+from .renderers import NDJSONRenderer
+
+
+class StreamingListModelMixin(object):
+    """
+    流式返回列表，替代 ListModelMixin.list()
+
+    分块迭代查询集（PostgreSQL 上使用服务端游标），逐块序列化、逐块输出 JSON 数组或 NDJSON，
+    内存占用只与块大小有关，与表的大小无关。
+    分页、或协商到 JSON 以外的渲染器（如可浏览 API）时，仍使用默认的 list()
+    """
+    stream_chunk_size = 1000
+
+    def get_renderers(self):
+        renderers = super().get_renderers()
+        if not any(isinstance(renderer, NDJSONRenderer) for renderer in renderers):
+            renderers.append(NDJSONRenderer())
+        return renderers
+
+    def list(self, request, *args, **kwargs):
+        renderer = request.accepted_renderer
+        if self.paginator is not None or not isinstance(renderer, JSONRenderer):
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        if isinstance(renderer, NDJSONRenderer):
+            content = self.stream_ndjson(queryset, renderer)
+        else:
+            content = self.stream_json(queryset, renderer)
+        return StreamingHttpResponse(content, content_type=renderer.media_type)
+
+    def iter_chunks(self, queryset):
+        """
+        Django 3.2 的 iterator() 会忽略 prefetch_related，这里按块手动预加载
+        """
+        lookups = queryset._prefetch_related_lookups
+        rows = queryset.iterator(chunk_size=self.stream_chunk_size)
+        while True:
+            chunk = list(islice(rows, self.stream_chunk_size))
+            if not chunk:
+                return
+            if lookups:
+                prefetch_related_objects(chunk, *lookups)
+            yield self.get_serializer(chunk, many=True).data
+
+    def stream_json(self, queryset, renderer):
+        context = self.get_renderer_context()
+        media_type = self.request.accepted_media_type
+        yield b'['
+        first = True
+        for data in self.iter_chunks(queryset):
+            items = b','.join(renderer.render(item, media_type, context) for item in data)
+            yield items if first else b',' + items
+            first = False
+        yield b']'
+
+    def stream_ndjson(self, queryset, renderer):
+        for data in self.iter_chunks(queryset):
+            yield b''.join(renderer.render_item(item) + b'\n' for item in data)
+
+
+class CompiledListModelMixin(object):
+    """
+    列表使用编译后的序列化器（见 drf_lessions.compiled），替代 ListModelMixin.list()
+
+    只查询输出需要的列，不实例化模型，输出与默认的 list() 完全相同。
+    序列化器包含无法编译的字段（多对多、嵌套序列化器、方法字段等），或分页类不是基于切片的分页时，
+    仍使用默认的 list()
+    """
+
+    def list(self, request, *args, **kwargs):
+        if self.paginator is not None and not isinstance(self.paginator, (PageNumberPagination,
+                                                                          LimitOffsetPagination)):
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        try:
+            compiled = compile_serializer(self.get_serializer(), queryset.model)
+        except NotCompilable:
+            return super().list(request, *args, **kwargs)
+
+        rows = compiled.project(queryset)
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(compiled.to_representation(page))
+        return Response(compiled.to_representation(rows))
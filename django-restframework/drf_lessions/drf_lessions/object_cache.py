@@ -0,0 +1,161 @@
+import threading
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+
+
+class ObjectCache(object):
+    """
+    按 (模型, 主键) 缓存模型实例的读穿透缓存，用于读多写少的详情接口
+
+    - 缓存后端为 settings.OBJECT_CACHE_ALIAS 指定的 Django 缓存（默认本地内存，可配置为文件缓存）
+    - 本模型的 post_save/post_delete 信号使对应实例失效；watch()/watch_m2m() 声明依赖的其他模型，
+      例如缓存的文章预加载了标签，标签变化时需要让相关文章失效
+    - queryset.update() 不会发送信号，依赖 TIMEOUT 兜底
+    - 命中率按模型统计，仅统计当前进程
+    """
+    key_prefix = 'object'
+
+    def __init__(self, model, select_related=(), prefetch_related=(), timeout=None):
+        self.model = model
+        self.select_related = select_related
+        self.prefetch_related = prefetch_related
+        self.timeout = timeout if timeout is not None else getattr(settings, 'OBJECT_CACHE_TIMEOUT', 300)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        uid = self.model._meta.label_lower
+        post_save.connect(self._own_changed, sender=model, dispatch_uid=f'{uid}-cache-save', weak=False)
+        post_delete.connect(self._own_changed, sender=model, dispatch_uid=f'{uid}-cache-delete', weak=False)
+        registry[self.model._meta.label] = self
+
+    @property
+    def cache(self):
+        return caches[getattr(settings, 'OBJECT_CACHE_ALIAS', 'default')]
+
+    def make_key(self, pk):
+        return f'{self.key_prefix}:{self.model._meta.label_lower}:{pk}'
+
+    def get_queryset(self):
+        queryset = self.model._default_manager.all()
+        if self.select_related:
+            queryset = queryset.select_related(*self.select_related)
+        if self.prefetch_related:
+            queryset = queryset.prefetch_related(*self.prefetch_related)
+        return queryset
+
+    def get(self, pk):
+        """
+        返回主键为 pk 的实例，未命中时查询数据库并写入缓存，不存在时抛出 DoesNotExist
+        """
+        key = self.make_key(pk)
+        instance = self.cache.get(key)
+        with self._lock:
+            if instance is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if instance is None:
+            instance = self.load(key, pk)
+        return instance
+
+    def load(self, key, pk):
+        instance = self.get_queryset().get(pk=pk)
+        self.cache.set(key, instance, self.timeout)
+        return instance
+
+    def get_or_none(self, pk):
+        try:
+            return self.get(pk)
+        except (self.model.DoesNotExist, ValueError):
+            return None
+
+    async def aget(self, pk):
+        """
+        异步版本：缓存命中时直接返回，未命中时在线程中查询数据库
+        本地内存缓存直接在事件循环中读取，文件、网络缓存的读取会阻塞，在线程中执行
+        """
+        cache, key = self.cache, self.make_key(pk)
+        if isinstance(cache, LocMemCache):
+            instance = cache.get(key)
+        else:
+            instance = await sync_to_async(cache.get, thread_sensitive=False)(key)
+        with self._lock:
+            if instance is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if instance is None:
+            return await sync_to_async(self.load, thread_sensitive=True)(key, pk)
+        return instance
+
+    async def aget_or_none(self, pk):
+        try:
+            return await self.aget(pk)
+        except (self.model.DoesNotExist, ValueError):
+            return None
+
+    def invalidate(self, *pks):
+        if pks:
+            self.cache.delete_many([self.make_key(pk) for pk in pks])
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / total if total else 0.0,
+            }
+
+    def _own_changed(self, sender, instance, **kwargs):
+        self.invalidate(instance.pk)
+
+    def watch(self, model, get_pks):
+        """
+        model 的实例保存、删除时，使 get_pks(instance) 返回的主键失效
+        删除使用 pre_delete，此时关联关系还没有被级联删除
+        """
+        def changed(sender, instance, **kwargs):
+            self.invalidate(*get_pks(instance))
+
+        uid = f'{self.model._meta.label_lower}-cache-{model._meta.label_lower}'
+        post_save.connect(changed, sender=model, dispatch_uid=f'{uid}-save', weak=False)
+        pre_delete.connect(changed, sender=model, dispatch_uid=f'{uid}-delete', weak=False)
+
+    def watch_m2m(self, through):
+        """
+        多对多关系变化时，使本模型一侧涉及的实例失效（正向、反向操作都支持）
+        """
+        own_field = next(f for f in through._meta.fields if f.related_model is self.model)
+
+        def changed(sender, instance, action, model, pk_set, **kwargs):
+            if isinstance(instance, self.model):
+                if action.startswith('post_') or action == 'pre_clear':
+                    self.invalidate(instance.pk)
+            elif model is self.model:
+                if action in ('post_add', 'post_remove'):
+                    self.invalidate(*pk_set)
+                elif action == 'pre_clear':
+                    # clear() 不提供 pk_set，清空前从中间表查询
+                    other_field = next(f for f in through._meta.fields
+                                       if f.related_model is type(instance) and f is not own_field)
+                    pks = through.objects.filter(**{other_field.name: instance}) \
+                        .values_list(own_field.attname, flat=True)
+                    self.invalidate(*pks)
+
+        uid = f'{self.model._meta.label_lower}-cache-{through._meta.label_lower}'
+        m2m_changed.connect(changed, sender=through, dispatch_uid=uid, weak=False)
+
+
+# 模型标签 -> ObjectCache
+registry = {}
+
+
+def object_cache_stats():
+    """各模型缓存命中率"""
+    return {label: object_cache.stats() for label, object_cache in registry.items()}
@@ -0,0 +1,156 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+
+from django.db.models import F, Q
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    键集（游标）分页：根据上一页最后一行的排序键取下一页，而不是 OFFSET，任意深度的翻页代价都与第一页相同
+
+    - ordering 可以是多个字段组成的复合键，最后一个字段必须唯一（通常是 id），字段允许为 NULL，
+      NULL 始终排在最后（与数据库默认的 NULL 排序无关）
+    - 游标是编码后的排序键值与翻页方向，对客户端不透明
+    - page_size 为 None 时只有传递 page_size 参数才分页，与 DRF 的分页类行为一致
+    """
+    ordering = ('-id',)
+    page_size = None
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = _('Invalid cursor')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.fields = [self.parse_field(queryset.model, name) for name in self.ordering]
+        position, reverse = self.decode_cursor(request)
+
+        queryset = queryset.order_by(*self.order_by(reverse))
+        if position is not None:
+            queryset = queryset.filter(self.after(position, reverse))
+
+        # 多取一行判断是否还有下一页
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        page = rows[:self.page_size]
+        if reverse:
+            page.reverse()
+            self.has_next, self.has_previous = position is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+        self.page = page
+        return page
+
+    def get_page_size(self, request):
+        if self.page_size_query_param:
+            try:
+                page_size = int(request.query_params[self.page_size_query_param])
+                if page_size > 0:
+                    return min(page_size, self.max_page_size) if self.max_page_size else page_size
+            except (KeyError, ValueError):
+                pass
+        return self.page_size
+
+    @staticmethod
+    def parse_field(model, name):
+        """返回 (模型字段, 是否降序)"""
+        descending = name.startswith('-')
+        return model._meta.get_field(name.lstrip('-')), descending
+
+    def order_by(self, reverse):
+        """反向翻页时排序与 NULL 的位置都要反转"""
+        ordering = []
+        for field, descending in self.fields:
+            if descending != reverse:
+                ordering.append(F(field.attname).desc(nulls_last=not reverse, nulls_first=reverse))
+            else:
+                ordering.append(F(field.attname).asc(nulls_last=not reverse, nulls_first=reverse))
+        return ordering
+
+    def after(self, position, reverse):
+        """
+        构造 (k1, k2, ...) 位于 position 之后的条件：
+        k1 在 v1 之后，或 k1 = v1 且 k2 在 v2 之后，依此类推
+        """
+        condition = Q(pk__in=[])
+        equal = Q()
+        for (field, descending), value in zip(self.fields, position):
+            name = field.attname
+            nulls_last = not reverse
+            if value is None:
+                # NULL 排在最后时，之后没有其他值；排在最前时，之后是所有非 NULL 值
+                later = Q(pk__in=[]) if nulls_last else Q(**{f'{name}__isnull': False})
+                same = Q(**{f'{name}__isnull': True})
+            else:
+                lookup = 'lt' if descending != reverse else 'gt'
+                later = Q(**{f'{name}__{lookup}': value})
+                if nulls_last and field.null:
+                    later |= Q(**{f'{name}__isnull': True})
+                same = Q(**{name: value})
+            condition |= equal & later
+            equal &= same
+        return condition
+
+    def get_position(self, instance):
+        return [getattr(instance, field.attname) for field, _ in self.fields]
+
+    def encode_cursor(self, instance, reverse):
+        position = [field.value_to_string(instance) if value is not None else None
+                    for (field, _), value in zip(self.fields, self.get_position(instance))]
+        payload = json.dumps({'p': position, 'r': int(reverse)}, separators=(',', ':'))
+        cursor = urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            payload = json.loads(urlsafe_b64decode(encoded + '=' * (-len(encoded) % 4)))
+            position = payload['p']
+            if len(position) != len(self.fields):
+                raise ValueError
+            position = [field.to_python(value) if value is not None else None
+                        for (field, _), value in zip(self.fields, position)]
+            return position, bool(payload.get('r'))
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data)
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True},
+                'previous': {'type': 'string', 'nullable': True},
+                'results': schema,
+            },
+        }
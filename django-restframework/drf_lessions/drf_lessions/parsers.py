@@ -0,0 +1,25 @@
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+
+from .json_backends import orjson
+from .renderers import FastJSONRenderer
+
+
+class FastJSONParser(JSONParser):
+    """
+    backend 为 'auto'（默认）且安装了 orjson 时使用 orjson 解析，否则与 JSONParser 相同
+    orjson 只接受 UTF-8，请求声明了其他字符集时退回到标准库；NaN/Infinity 总是被拒绝
+    """
+    renderer_class = FastJSONRenderer
+    backend = 'auto'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if orjson is None or self.backend not in ('auto', 'orjson') or encoding.lower().replace('-', '') != 'utf8':
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
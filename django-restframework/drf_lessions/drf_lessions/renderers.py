@@ -0,0 +1,62 @@
+from rest_framework.renderers import JSONRenderer
+
+from .json_backends import OrjsonJSONBackend, orjson
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    backend 为 'auto'（默认）且安装了 orjson 时使用 orjson 编码，否则与 JSONRenderer 相同（标准库 json）
+
+    输出格式与 JSONRenderer 一致：紧凑、UTF-8、日期时间和 Decimal 由 encoder_class 转换、转义 U+2028/U+2029；
+    需要缩进（可浏览 API、?indent=）、UNICODE_JSON/COMPACT_JSON 关闭、或 orjson 无法编码（如超过 64 位的整数）时
+    退回到标准库。浮点数的指数形式可能与标准库不同（1e16 / 1e+16），NaN 输出为 null
+    """
+    backend = 'auto'
+    _orjson_backends = {}
+
+    def get_orjson_backend(self):
+        if self.backend not in ('auto', 'orjson') or self.ensure_ascii or not self.compact:
+            return None
+        if orjson is None:
+            if self.backend == 'orjson':
+                raise ImportError('FastJSONRenderer with backend "orjson" requires the orjson package.')
+            return None
+        backend = self._orjson_backends.get(self.encoder_class)
+        if backend is None:
+            backend = self._orjson_backends[self.encoder_class] = OrjsonJSONBackend(self.encoder_class().default)
+        return backend
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        backend = self.get_orjson_backend()
+        if backend is None or self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = backend.dumps(data)
+        except TypeError:
+            # orjson.JSONEncodeError
+            return super().render(data, accepted_media_type, renderer_context)
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
+
+
+class NDJSONRenderer(JSONRenderer):
+    """
+    换行分隔的 JSON（NDJSON），每行一个对象，通过 ?format=ndjson 选择
+    """
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if not isinstance(data, (list, tuple)):
+            data = [data]
+        # NDJSON 每行必须是一个完整的 JSON 文本，所以忽略 indent
+        return b''.join(self.render_item(item) + b'\n' for item in data)
+
+    def render_item(self, item):
+        return super().render(item)
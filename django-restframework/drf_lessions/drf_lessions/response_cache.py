@@ -0,0 +1,199 @@
+import hashlib
+import uuid
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Count, Max
+from django.db.models.signals import m2m_changed, post_delete, post_init, post_save
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date, parse_etags, parse_http_date_safe, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+
+def get_response_cache():
+    return caches[getattr(settings, 'RESPONSE_CACHE_ALIAS', 'default')]
+
+
+class TableVersion(object):
+    """
+    表版本号：模型保存、删除（以及多对多关系变化）时更新，保存在缓存中
+    多进程部署时缓存后端需要是进程间共享的（文件、Redis 等），否则各进程的版本号互不可见
+
+    fields 指定响应中实际输出的字段时，只有这些字段的值变化才更新版本，
+    例如只输出用户名时，登录更新 last_login 不会使缓存失效
+    """
+    # 删除行也会更新最后修改时间，可以用来响应 If-Modified-Since
+    monotonic = True
+
+    def __init__(self, model, m2m=(), fields=None):
+        self.model = model
+        self.fields = tuple(fields) if fields else None
+        self.key = uid = f'table-version:{model._meta.label_lower}'
+        if self.fields:
+            uid = f'{uid}:{",".join(self.fields)}'
+            self.key = uid
+            self.snapshot_attr = f'_{uid}-snapshot'
+            post_init.connect(self.loaded, sender=model, dispatch_uid=f'{uid}-init', weak=False)
+            post_save.connect(self.saved, sender=model, dispatch_uid=f'{uid}-save', weak=False)
+        else:
+            post_save.connect(self.changed, sender=model, dispatch_uid=f'{uid}-save', weak=False)
+        post_delete.connect(self.changed, sender=model, dispatch_uid=f'{uid}-delete', weak=False)
+        for through in m2m:
+            m2m_changed.connect(self.changed, sender=through, dispatch_uid=f'{uid}-{through._meta.label_lower}',
+                                weak=False)
+
+    def changed(self, **kwargs):
+        self.bump()
+
+    def snapshot(self, instance):
+        # 延迟加载的字段记为缺失，保存时视为可能变化
+        return tuple(instance.__dict__.get(self.model._meta.get_field(name).attname, self) for name in self.fields)
+
+    def loaded(self, instance, **kwargs):
+        instance.__dict__[self.snapshot_attr] = self.snapshot(instance)
+
+    def saved(self, instance, created, update_fields=None, **kwargs):
+        previous = instance.__dict__.get(self.snapshot_attr)
+        current = self.snapshot(instance)
+        instance.__dict__[self.snapshot_attr] = current
+        if not created:
+            if update_fields is not None and not set(update_fields) & set(self.fields):
+                return
+            if previous == current and self not in current:
+                return
+        self.bump()
+
+    def bump(self):
+        # 使用随机值而不是自增，并发更新时不需要原子操作
+        value = (uuid.uuid4().hex, timezone.now())
+        get_response_cache().set(self.key, value, None)
+        return value
+
+    def get(self):
+        """返回 (版本号, 最后修改时间)，缓存丢失时生成新版本"""
+        return get_response_cache().get(self.key) or self.bump()
+
+
+class TimestampVersion(object):
+    """
+    根据模型的更新时间字段推导版本：最大更新时间 + 行数（删除不会改变最大更新时间）
+
+    删除行后最后修改时间不变，只能用于 ETag，不能用 If-Modified-Since 判断是否修改
+    """
+    monotonic = False
+
+    def __init__(self, model, field):
+        self.model = model
+        self.field = field
+
+    def get(self):
+        result = self.model._default_manager.aggregate(modified=Max(self.field), count=Count('pk'))
+        modified = result['modified']
+        return f'{modified.isoformat() if modified else ""}-{result["count"]}', modified
+
+
+def cache_response(*versions, timeout=None, max_bytes=None):
+    """
+    缓存 GET 视图渲染后的响应内容，ETag 由请求（URL、主机、协商的媒体类型）与数据版本推导
+
+    - If-None-Match / If-Modified-Since 命中时直接返回 304，不执行视图与序列化器；
+      任一版本的最后修改时间在删除行时不变（TimestampVersion）时忽略 If-Modified-Since
+    - 缓存命中时直接返回缓存的字节，不重新渲染
+    - 流式响应边输出边缓存，超过 max_bytes 时放弃缓存
+    - 缓存键与 ETag 包含当前用户，响应带 Vary: Cookie, Authorization；
+      HTML（可浏览 API）页面包含用户名和 CSRF 令牌，不缓存
+
+        class PostList(APIView):
+            @cache_response(TimestampVersion(Post, 'update_time'))
+            def get(self, request, format=None):
+                ...
+    """
+    if timeout is None:
+        timeout = getattr(settings, 'RESPONSE_CACHE_TIMEOUT', 300)
+    if max_bytes is None:
+        max_bytes = getattr(settings, 'RESPONSE_CACHE_MAX_BYTES', 4 * 1024 * 1024)
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(self, request, *args, **kwargs):
+            if request.accepted_media_type.startswith('text/html'):
+                return func(self, request, *args, **kwargs)
+
+            parts = [request.build_absolute_uri(), request.accepted_media_type, str(request.user.pk)]
+            modified = None
+            for version in versions:
+                token, version_modified = version.get()
+                parts.append(token)
+                if version_modified and (modified is None or version_modified > modified):
+                    modified = version_modified
+            etag = quote_etag(hashlib.sha1('|'.join(parts).encode()).hexdigest())
+            last_modified = http_date(modified.timestamp()) if modified else None
+
+            monotonic = all(getattr(version, 'monotonic', True) for version in versions)
+            if not_modified(request, etag, modified if monotonic else None):
+                response = Response(status=status.HTTP_304_NOT_MODIFIED)
+                return set_validators(response, etag, last_modified)
+
+            cache = get_response_cache()
+            key = f'response:{etag}'
+            cached = cache.get(key)
+            if cached is not None:
+                content, content_type = cached
+                return set_validators(HttpResponse(content, content_type=content_type), etag, last_modified)
+
+            response = func(self, request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            if isinstance(response, StreamingHttpResponse):
+                response.streaming_content = tee(response.streaming_content, key, response['Content-Type'],
+                                                 timeout, max_bytes)
+            else:
+                if isinstance(response, Response):
+                    # 提前渲染，finalize_response 不会重复渲染
+                    response.accepted_renderer = request.accepted_renderer
+                    response.accepted_media_type = request.accepted_media_type
+                    response.renderer_context = self.get_renderer_context()
+                    response.render()
+                if len(response.content) <= max_bytes:
+                    cache.set(key, (response.content, response['Content-Type']), timeout)
+            return set_validators(response, etag, last_modified)
+
+        return wrapper
+
+    return decorator
+
+
+def not_modified(request, etag, modified):
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match:
+        etags = parse_etags(if_none_match)
+        # 弱比较，忽略 W/ 前缀
+        return '*' in etags or etag in (tag[2:] if tag.startswith('W/') else tag for tag in etags)
+    if_modified_since = parse_http_date_safe(request.META.get('HTTP_IF_MODIFIED_SINCE', ''))
+    return bool(if_modified_since and modified and int(modified.timestamp()) <= if_modified_since)
+
+
+def set_validators(response, etag, last_modified):
+    response['ETag'] = etag
+    patch_vary_headers(response, ('Cookie', 'Authorization'))
+    if last_modified:
+        response['Last-Modified'] = last_modified
+    return response
+
+
+def tee(chunks, key, content_type, timeout, max_bytes):
+    buffer, size = [], 0
+    for chunk in chunks:
+        if buffer is not None:
+            size += len(chunk)
+            if size > max_bytes:
+                buffer = None
+            else:
+                buffer.append(chunk)
+        yield chunk
+    if buffer is not None:
+        get_response_cache().set(key, (b''.join(buffer), content_type), timeout)
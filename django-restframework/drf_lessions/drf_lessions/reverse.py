@@ -0,0 +1,81 @@
+from django.core.signals import setting_changed
+from django.utils.encoding import iri_to_uri
+from django.urls import NoReverseMatch, get_script_prefix, get_urlconf
+from django.urls import reverse as django_reverse
+from rest_framework.reverse import preserve_builtin_query_params
+from rest_framework.reverse import reverse as drf_reverse
+
+# 编译 URL 模板时代替参数的值，反向解析后再替换成格式化占位符
+PLACEHOLDER = 7919000000000
+
+# (视图名, 参数名, 格式后缀, 脚本前缀, URLconf) -> URL 模板，无法编译时为 None
+_templates = {}
+
+
+def compile_template(viewname, names, format):
+    """
+    用占位值反向解析一次，得到形如 '/posts/rest/posts/{pk}/' 的模板
+    占位值在结果中不是恰好出现一次（例如被转换器改写）时返回 None，调用方退回到 reverse()
+    """
+    kwargs = {name: PLACEHOLDER + index for index, name in enumerate(names)}
+    if format is not None:
+        kwargs['format'] = format
+    try:
+        url = django_reverse(viewname, kwargs=kwargs)
+    except NoReverseMatch:
+        return None
+    template = url.replace('{', '{{').replace('}', '}}')
+    for index, name in enumerate(names):
+        placeholder = str(PLACEHOLDER + index)
+        if template.count(placeholder) != 1:
+            return None
+        template = template.replace(placeholder, '{%s}' % name)
+    return template
+
+
+def url_prefix(request):
+    """请求的 scheme://host，每个请求只计算一次"""
+    prefix = getattr(request, '_url_prefix', None)
+    if prefix is None:
+        prefix = request._url_prefix = request.build_absolute_uri('/')[:-1]
+    return prefix
+
+
+def absolute_uri(request, location):
+    """与 request.build_absolute_uri(location) 相同，站内的绝对路径直接拼接 url_prefix()"""
+    if location.startswith('/') and not location.startswith('//') and \
+            '/./' not in location and '/../' not in location:
+        return url_prefix(request) + iri_to_uri(location)
+    return request.build_absolute_uri(location)
+
+
+def cached_reverse(viewname, args=None, kwargs=None, request=None, format=None, **extra):
+    """
+    与 rest_framework.reverse.reverse 相同，参数都是整数（主键）时按 (视图名, 参数名, 格式后缀) 缓存编译后的
+    URL 模板，之后只做字符串格式化，不再遍历 URL 解析器；其他情况退回到 reverse()
+    """
+    if args or extra or getattr(request, 'versioning_scheme', None) is not None or \
+            not kwargs or not all(type(value) is int for value in kwargs.values()):
+        return drf_reverse(viewname, args=args, kwargs=kwargs, request=request, format=format, **extra)
+
+    names = tuple(sorted(kwargs))
+    key = (viewname, names, format, get_script_prefix(), get_urlconf())
+    try:
+        template = _templates[key]
+    except KeyError:
+        template = _templates[key] = compile_template(viewname, names, format)
+    if template is None:
+        return drf_reverse(viewname, kwargs=kwargs, request=request, format=format)
+
+    url = template.format(**kwargs)
+    if request:
+        url = preserve_builtin_query_params(url_prefix(request) + url, request)
+    return url
+
+
+def clear_reverse_cache(*, setting=None, **kwargs):
+    if setting is None or setting == 'ROOT_URLCONF':
+        _templates.clear()
+
+
+setting_changed.connect(clear_reverse_cache)
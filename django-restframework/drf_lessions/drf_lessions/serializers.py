@@ -0,0 +1,208 @@
+import logging
+
+from django.db import models
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+
+logger = logging.getLogger(__name__)
+
+
+class BatchUniqueListSerializer(serializers.ListSerializer):
+    """
+    many=True 时在逐项校验之前，批量查询所有待校验值是否已存在，
+    子序列化器需要继承 BatchUniqueMixin
+    """
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            self.child.start_unique_batch(data)
+        try:
+            return super().to_internal_value(data)
+        finally:
+            self.child.end_unique_batch()
+
+
+class BatchUniqueMixin(object):
+    """
+    唯一性校验：单个对象时每个值查询一次数据库，
+    批量（BatchUniqueListSerializer）时每个字段只用一条 __in 查询，同时检查批量数据内部的重复
+
+        class BookInfoSerializer(BatchUniqueMixin, serializers.Serializer):
+            unique_model = BookInfo
+            unique_fields = ['btitle']
+
+            class Meta:
+                list_serializer_class = BatchUniqueListSerializer
+
+            def validate_btitle(self, value):
+                if self.unique_conflict('btitle', value):
+                    ...
+    """
+    unique_model = None
+    unique_fields = ()
+    unique_batch_size = 500
+    _unique_batch = None
+
+    def start_unique_batch(self, data):
+        manager = self.unique_model._default_manager
+        batch = {}
+        for field in self.unique_fields:
+            # 与 CharField 默认的 trim_whitespace 保持一致，未命中的值在校验时单独查询
+            candidates = list({str(item[field]).strip() for item in data
+                               if isinstance(item, dict) and item.get(field) is not None})
+            existing = set()
+            for start in range(0, len(candidates), self.unique_batch_size):
+                existing.update(manager.filter(**{f'{field}__in': candidates[start:start + self.unique_batch_size]})
+                                .values_list(field, flat=True))
+            batch[field] = {'candidates': set(candidates), 'existing': existing, 'seen': set()}
+        self._unique_batch = batch
+
+    def end_unique_batch(self):
+        self._unique_batch = None
+
+    def unique_conflict(self, field, value):
+        """
+        返回 None 表示可用，'exists' 表示数据库中已存在，'duplicate' 表示与同一批数据中前面的项重复
+        """
+        if self._unique_batch is None or field not in self._unique_batch:
+            exists = self.unique_model._default_manager.filter(**{field: value}).exists()
+            return 'exists' if exists else None
+
+        batch = self._unique_batch[field]
+        if value in batch['seen']:
+            return 'duplicate'
+        batch['seen'].add(value)
+        if value in batch['candidates']:
+            exists = value in batch['existing']
+        else:
+            exists = self.unique_model._default_manager.filter(**{field: value}).exists()
+        return 'exists' if exists else None
+
+
+class EagerLoadingMixin(object):
+    """
+    声明序列化器需要的关联关系，视图通过 setup_eager_loading() 构建查询集，
+    一次性 select_related/prefetch_related，避免逐行序列化时产生 N+1 查询
+    """
+    select_related_fields = ()  # 外键、一对一关系，使用 JOIN 加载
+    prefetch_related_fields = ()  # 多对多、反向关系，使用额外的一条查询批量加载
+
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        if cls.select_related_fields:
+            queryset = queryset.select_related(*cls.select_related_fields)
+        if cls.prefetch_related_fields:
+            queryset = queryset.prefetch_related(*cls.prefetch_related_fields)
+        return queryset
+
+
+class SparseFieldsetsMixin(EagerLoadingMixin):
+    """
+    稀疏字段集：GET 请求的 ?fields=id,title 只输出指定字段，?expand=hbook 展开 expandable_fields 中声明的字段，
+    setup_eager_loading(queryset, request) 只加载输出字段需要的关系
+
+        class HeroInfoModelSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
+            expandable_fields = {'hbook': (BookInfoModelSerializer, {'read_only': True})}
+            select_related_fields = ('hbook',)
+            related_fields = {'hbook': ('hbook',)}
+
+    只作用于根序列化器（或 many=True 时的子序列化器），嵌套的序列化器输出全部字段
+    """
+    fields_query_param = 'fields'
+    expand_query_param = 'expand'
+    # 字段名 -> (序列化器类, 参数)，展开时替换默认的字段
+    expandable_fields = {}
+    # 关系 -> 依赖该关系的字段名，这些字段都不输出时不加载该关系；依赖可展开字段的关系只在展开时加载，
+    # 没有列出的关系总是加载
+    related_fields = {}
+
+    @classmethod
+    def get_sparse_fieldset(cls, request):
+        """
+        返回 (输出字段名集合, 展开字段名集合)，输出字段为 None 表示全部输出
+        """
+        if request is None or request.method not in SAFE_METHODS:
+            return None, set()
+        params = getattr(request, 'query_params', request.GET)
+
+        def parse(name):
+            return {value.strip() for value in params.get(name, '').split(',') if value.strip()}
+
+        expand = parse(cls.expand_query_param) & set(cls.expandable_fields)
+        only = parse(cls.fields_query_param) if cls.fields_query_param in params else None
+        return (only | expand if only is not None else None), expand
+
+    @classmethod
+    def setup_eager_loading(cls, queryset, request=None):
+        only, expand = cls.get_sparse_fieldset(request)
+
+        def needed(relation):
+            if relation not in cls.related_fields:
+                return True
+            return any((name in expand if name in cls.expandable_fields else only is None or name in only)
+                       for name in cls.related_fields[relation])
+
+        select_related = [relation for relation in cls.select_related_fields if needed(relation)]
+        prefetch_related = [relation for relation in cls.prefetch_related_fields if needed(relation)]
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        if prefetch_related:
+            queryset = queryset.prefetch_related(*prefetch_related)
+        return queryset
+
+    def get_fields(self):
+        fields = super().get_fields()
+        root = self.parent.parent if isinstance(self.parent, serializers.ListSerializer) else self.parent
+        if root is not None:
+            return fields
+
+        only, expand = self.get_sparse_fieldset(self.context.get('request'))
+        for name in expand:
+            serializer_class, kwargs = self.expandable_fields[name]
+            fields[name] = serializer_class(**kwargs)
+        if only is not None:
+            fields = type(fields)((name, field) for name, field in fields.items() if name in only)
+        return fields
+
+
+class PartialUpdateMixin(object):
+    """
+    手写 update() 时只写入值发生变化的字段，没有变化时不执行 UPDATE，
+    每次写入在 drf_lessions.serializers 日志中记录写入的列数，用于统计写放大
+
+        def update(self, instance, validated_data):
+            changed = self.assign_changed(instance, validated_data)
+            return self.save_changed(instance, changed)
+    """
+
+    def assign_changed(self, instance, attrs):
+        """把 attrs 中与实例当前值不同的字段赋值给实例，返回这些字段名"""
+        deferred = instance.get_deferred_fields()
+        changed = []
+        for name, value in attrs.items():
+            field = instance._meta.get_field(name)
+            if isinstance(field, models.FileField):
+                # 上传的文件与已有文件同名时也可能是新内容，总是写入
+                pass
+            elif field.many_to_one:
+                # 比较外键 id，不为了比较加载关联对象
+                if getattr(instance, field.attname) == getattr(value, 'pk', value):
+                    continue
+            elif field.attname not in deferred and getattr(instance, field.attname) == value:
+                continue
+            setattr(instance, name, value)
+            changed.append(name)
+        return changed
+
+    def save_changed(self, instance, fields):
+        """save(update_fields=fields)，fields 为空时不写数据库"""
+        label = instance._meta.label
+        if not fields:
+            logger.info('%s pk=%s unchanged, skipped save', label, instance.pk)
+            return instance
+        fields = list(fields)
+        # update_fields 不会自动包含 auto_now 字段
+        fields += [field.name for field in instance._meta.concrete_fields
+                   if getattr(field, 'auto_now', False) and field.name not in fields]
+        instance.save(update_fields=fields)
+        logger.info('%s pk=%s wrote %d columns: %s', label, instance.pk, len(fields), ', '.join(fields))
+        return instance
@@ -87,6 +87,75 @@ DATABASES = {
     }
 }
 
+# Cache
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # 详情接口的对象缓存，多进程部署时可以换成文件缓存：
+    # 'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+    # 'LOCATION': '/var/tmp/drf_lessions_objects',
+    'objects': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'objects',
+        'TIMEOUT': 300,
+    },
+    # 列表接口渲染后的响应与表版本号，多进程部署时需要换成进程间共享的缓存
+    'responses': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'responses',
+        'TIMEOUT': 300,
+    },
+}
+
+OBJECT_CACHE_ALIAS = 'objects'
+OBJECT_CACHE_TIMEOUT = 300
+
+RESPONSE_CACHE_ALIAS = 'responses'
+RESPONSE_CACHE_TIMEOUT = 300
+RESPONSE_CACHE_MAX_BYTES = 4 * 1024 * 1024
+
+# Basic 认证凭据缓存：校验成功的用户名、密码组合在 TIMEOUT 秒内不再计算密码哈希，MAX_ENTRIES 为进程内条目上限
+BASIC_AUTH_CACHE = {
+    'TIMEOUT': 60,
+    'MAX_ENTRIES': 1024,
+}
+
+# 令牌认证缓存：进程内 LRU 缓存令牌对应的用户；SHARED_ALIAS 为缓存别名时在多进程之间共享，
+# 撤销通过共享的版本号立即在所有进程生效；未配置时其他进程的本地条目在 LOCAL_TIMEOUT 秒后过期，撤销最多延迟这么久
+TOKEN_AUTH_CACHE = {
+    'TIMEOUT': 300,
+    'LOCAL_TIMEOUT': 30,
+    'MAX_ENTRIES': 4096,
+    'SHARED_ALIAS': None,
+}
+
+# posts 中按 X-Username 请求头认证时的用户缓存，不存在的用户名缓存 NEGATIVE_TIMEOUT 秒
+USER_LOOKUP_CACHE = {
+    'TIMEOUT': 300,
+    'NEGATIVE_TIMEOUT': 30,
+    'MAX_ENTRIES': 4096,
+}
+
+# JSON 编码后端：'stdlib' 输出与 JsonResponse 完全相同，'orjson' 更快但输出为紧凑的 UTF-8，
+# 'auto' 在安装了 orjson 时使用 orjson，见 drf_lessions.json_backends
+JSON_BACKEND = 'stdlib'
+
+# 限流状态存储：'memory' 仅当前进程；'file' 为内存映射文件，同一台机器的多个进程共享，
+# PATH 放在 /dev/shm 下即为共享内存，例如 {'BACKEND': 'file', 'PATH': '/dev/shm/drf_lessions_throttle'}
+THROTTLE_STORE = {
+    'BACKEND': 'memory',
+}
+
+# 计数器（例如图书阅读量）在进程内合并增量，距上次写回超过 FLUSH_INTERVAL 秒或缓冲的对象数达到 MAX_PENDING 时
+# 每个对象执行一条 UPDATE ... SET n = n + 增量
+VIEW_COUNTER = {
+    'FLUSH_INTERVAL': 5,
+    'MAX_PENDING': 1000,
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
 
@@ -128,6 +197,35 @@ STATIC_URL = '/static/'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# 代码片段高亮执行器：'inline' 请求线程内同步渲染，'thread' 进程内线程池队列，
+# 'process' 进程池（适合 CPU 密集的词法分析），也可以是执行器类的导入路径
+SNIPPETS_HIGHLIGHT_EXECUTOR = 'thread'
+SNIPPETS_HIGHLIGHT_WORKERS = 2
+
+# 高亮结果存储方式：'fragment' 只保存高亮片段，样式表按风格共享；'full' 保存内联样式的完整 HTML 文档
+SNIPPETS_HIGHLIGHT_STORAGE = 'fragment'
+
+# 高亮结果缓存：以高亮输入的哈希为键，内存 LRU 层按字节限制大小，DIR 不为空时启用文件层
+SNIPPETS_HIGHLIGHT_CACHE = {
+    'MAX_BYTES': 16 * 1024 * 1024,
+    'DIR': None,
+    'DIR_MAX_BYTES': 256 * 1024 * 1024,
+}
+
+# 全局使用 FastJSONRenderer / FastJSONParser：安装了 orjson 时使用 orjson，否则与 DRF 默认的 JSON 渲染器、解析器相同；
+# 单个视图可以通过 renderer_classes / parser_classes 选择
+REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': [
+        'drf_lessions.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'drf_lessions.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+}
+
 # REST_FRAMEWORK = {
 #     # 解析器
 #     'DEFAULT_PARSER_CLASSES': [
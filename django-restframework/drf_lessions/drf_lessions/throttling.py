@@ -0,0 +1,241 @@
+import hashlib
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+from collections import OrderedDict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+from rest_framework.throttling import SimpleRateThrottle, UserRateThrottle
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+class MemoryThrottleStore(object):
+    """进程内限流状态，每个键保存固定个数的浮点数，条目数超过上限时淘汰最久未使用的键"""
+    # 只持有很短的线程锁，可以在事件循环中直接更新
+    blocking = False
+
+    def __init__(self, max_entries=65536):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def update(self, key, func):
+        """
+        原子地执行 state, result = func(state)，state 为 None 表示新键，返回 result
+        """
+        with self._lock:
+            state, result = func(self._data.get(key))
+            self._data[key] = state
+            self._data.move_to_end(key)
+            if len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+            return result
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class FileThrottleStore(object):
+    """
+    基于内存映射文件的限流状态，同一台机器上的多个进程共享（文件放在 /dev/shm 下即为共享内存）
+
+    文件由定长槽位组成，键的哈希决定槽位，冲突时向后探测 probes 个槽位，都被占用时覆盖最久未更新的槽位；
+    每次更新持有文件锁，读写一个槽位，代价与请求历史的长度无关
+    """
+    # 文件锁可能被其他进程持有，异步视图中在线程里更新
+    blocking = True
+    record = struct.Struct('<16s4d')  # 键哈希, 最后更新时间, 状态（3 个浮点数）
+    state_size = 3
+    probes = 4
+
+    def __init__(self, path, slots=65536):
+        if fcntl is None:
+            raise ImproperlyConfigured('FileThrottleStore requires fcntl (POSIX).')
+        self.path = path
+        self.slots = slots
+        self._lock = threading.Lock()
+        self._pid = None
+        self._fd = None
+        self._map = None
+
+    def _open(self):
+        # fork 之后重新打开：继承的文件描述与父进程共享同一个文件锁
+        if self._pid == os.getpid():
+            return
+        if self._fd is not None:
+            self._map.close()
+            os.close(self._fd)
+        size = self.slots * self.record.size
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        if os.fstat(fd).st_size < size:
+            os.ftruncate(fd, size)
+        self._fd, self._map, self._pid = fd, mmap.mmap(fd, size), os.getpid()
+
+    def update(self, key, func):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        index = int.from_bytes(digest[:8], 'little') % self.slots
+        with self._lock:
+            self._open()
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                offset, state, oldest = None, None, None
+                for probe in range(self.probes):
+                    slot_offset = (index + probe) % self.slots * self.record.size
+                    stored, updated, *values = self.record.unpack_from(self._map, slot_offset)
+                    if stored == digest:
+                        offset, state = slot_offset, tuple(values)
+                        break
+                    if updated == 0:
+                        offset = slot_offset
+                        break
+                    if oldest is None or updated < oldest[0]:
+                        oldest = (updated, slot_offset)
+                if offset is None:
+                    offset = oldest[1]
+                state, result = func(state)
+                state = tuple(state) + (0.0,) * (self.state_size - len(state))
+                self.record.pack_into(self._map, offset, digest, time.time(), *state)
+                return result
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def clear(self):
+        with self._lock:
+            self._open()
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                self._map[:] = bytes(len(self._map))
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+
+STORES = {
+    'memory': MemoryThrottleStore,
+    'file': FileThrottleStore,
+}
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_throttle_store():
+    """
+    THROTTLE_STORE 配置的限流状态存储：
+    {'BACKEND': 'memory'} 进程内，{'BACKEND': 'file', 'PATH': '/dev/shm/drf_lessions_throttle'} 多进程共享
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            options = dict(getattr(settings, 'THROTTLE_STORE', {}))
+            store_class = STORES[options.pop('BACKEND', 'memory')]
+            _store = store_class(**{name.lower(): value for name, value in options.items()})
+        return _store
+
+
+def reset_throttle_store(*, setting, **kwargs):
+    global _store
+    if setting == 'THROTTLE_STORE':
+        with _store_lock:
+            _store = None
+
+
+setting_changed.connect(reset_throttle_store)
+
+
+class SharedStateRateThrottle(SimpleRateThrottle):
+    """
+    每个键只保存固定大小状态的限流基类，替代 SimpleRateThrottle 中按请求记录的时间戳列表
+    子类实现 consume(state, now)，返回 (新状态, 需要等待的秒数)，等待 0 秒表示允许请求
+    """
+
+    def get_store(self):
+        return get_throttle_store()
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        now = self.timer()
+        self.wait_seconds = self.get_store().update(self.key, lambda state: self.consume(state, now))
+        return self.wait_seconds == 0
+
+    async def aallow_request(self, request, view):
+        # 进程内的状态直接在事件循环中更新；等待文件锁等会阻塞的存储在线程中更新，不占用事件循环
+        if getattr(self.get_store(), 'blocking', True):
+            return await sync_to_async(self.allow_request, thread_sensitive=False)(request, view)
+        return self.allow_request(request, view)
+
+    def consume(self, state, now):
+        raise NotImplementedError('.consume() must be overridden')
+
+    def wait(self):
+        # DRF 对 Retry-After 向上取整
+        return self.wait_seconds
+
+
+class TokenBucketRateThrottle(SharedStateRateThrottle):
+    """
+    令牌桶：容量为 num_requests，每秒补充 num_requests / duration 个令牌，允许短时间的突发
+    状态为 (令牌数, 上次补充时间)
+    """
+
+    def consume(self, state, now):
+        refill = self.num_requests / self.duration
+        if state is None:
+            tokens, updated = self.num_requests, now
+        else:
+            tokens, updated = state[:2]
+            tokens = min(self.num_requests, tokens + max(0.0, now - updated) * refill)
+        if tokens >= 1:
+            return (tokens - 1, now), 0
+        return (tokens, now), (1 - tokens) / refill
+
+
+class SlidingWindowRateThrottle(SharedStateRateThrottle):
+    """
+    滑动窗口计数：用上一个窗口的请求数按重叠比例加权估计最近 duration 秒的请求数
+    状态为 (当前窗口开始时间, 上一窗口请求数, 当前窗口请求数)
+    """
+
+    def consume(self, state, now):
+        duration, limit = self.duration, self.num_requests
+        window = math.floor(now / duration) * duration
+        if state is None:
+            previous, current = 0.0, 0.0
+        else:
+            start, previous, current = state
+            if window - start >= 2 * duration:
+                previous, current = 0.0, 0.0
+            elif window != start:
+                previous, current = current, 0.0
+        elapsed = now - window
+        estimate = previous * (1 - elapsed / duration) + current
+        if estimate + 1 <= limit:
+            return (window, previous, current + 1), 0
+
+        if current + 1 <= limit:
+            # 等待上一窗口的权重下降到足够小
+            wait = duration * (1 - (limit - current - 1) / previous) - elapsed
+        else:
+            # 当前窗口已满，等到下一个窗口，再等当前窗口（届时成为上一窗口）的权重下降
+            wait = duration - elapsed + max(0.0, duration * (1 - (limit - 1) / current))
+        return (window, previous, current), max(wait, 1e-3)
+
+
+class UserTokenBucketRateThrottle(TokenBucketRateThrottle, UserRateThrottle):
+    """按用户（匿名用户按 IP）限流，缓存键与 UserRateThrottle 相同"""
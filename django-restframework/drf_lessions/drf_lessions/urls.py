@@ -50,4 +50,5 @@ urlpatterns = [
     path('v2/', include('booktest2.urls', namespace='booktest_v2')),
     path('v3/', include('booktest3.urls', namespace='booktest_v3')),
     path('v4/', include('booktest4.urls', namespace='booktest_v4')),
+    path('catalogue/', include('courses.urls', namespace='courses')),
 ]
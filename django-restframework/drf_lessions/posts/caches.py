@@ -0,0 +1,73 @@
+import copy
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save
+
+from drf_lessions.local_cache import LocalCache
+from drf_lessions.object_cache import ObjectCache
+from drf_lessions.response_cache import TableVersion, TimestampVersion
+from .models import Post, Tag
+from .serializers import PostSerializer
+
+# 缓存的文章预加载了 PostSerializer 需要的作者和标签
+post_cache = ObjectCache(Post, select_related=PostSerializer.select_related_fields,
+                         prefetch_related=PostSerializer.prefetch_related_fields)
+post_cache.watch(Tag, lambda tag: list(tag.posts.values_list('pk', flat=True)))
+post_cache.watch_m2m(Tag.posts.through)
+
+# 文章列表响应缓存的版本：文章按更新时间，标签（含文章与标签的关系）按表版本号
+post_version = TimestampVersion(Post, 'update_time')
+tag_version = TableVersion(Tag, m2m=[Tag.posts.through])
+
+
+
+def related_post_ids(tag_ids):
+    """标签关联的文章 id，分批查询"""
+    through = Tag.posts.through
+    post_ids = set()
+    for start in range(0, len(tag_ids), 500):
+        post_ids.update(through.objects.filter(tag_id__in=tag_ids[start:start + 500])
+                        .values_list('post_id', flat=True))
+    return post_ids
+
+
+def tags_changed(post_ids):
+    """
+    批量操作（bulk_create/bulk_update/批量删除）不发送模型信号，手动使相关文章的缓存和标签表版本失效
+    """
+    post_cache.invalidate(*post_ids)
+    tag_version.bump()
+
+
+_user_options = getattr(settings, 'USER_LOOKUP_CACHE', {})
+
+# 用户名 -> 用户，用户不存在时保存 None（负缓存）
+user_lookup_cache = LocalCache(max_entries=_user_options.get('MAX_ENTRIES', 4096),
+                               timeout=_user_options.get('TIMEOUT', 300))
+_missing = object()
+
+
+def get_user_by_username(username):
+    """
+    按用户名查询用户，不存在时返回 None，结果（包括不存在）都会缓存，命中率见 user_lookup_cache.stats()
+    """
+    user = user_lookup_cache.get(username, _missing)
+    if user is _missing:
+        user = User.objects.filter(username=username).first()
+        if user is None:
+            user_lookup_cache.set(username, None, _user_options.get('NEGATIVE_TIMEOUT', 30))
+            return None
+        user_lookup_cache.set(username, user)
+    # 返回副本，避免请求之间共享同一个实例
+    return copy.copy(user) if user is not None else None
+
+
+def user_changed(sender, instance, **kwargs):
+    # 新用户使同名的负缓存失效，改名时旧用户名的条目按主键清除
+    user_lookup_cache.delete(instance.username)
+    user_lookup_cache.delete_if(lambda user: user is not None and user.pk == instance.pk)
+
+
+post_save.connect(user_changed, sender=User, dispatch_uid='posts-user-lookup-save')
+post_delete.connect(user_changed, sender=User, dispatch_uid='posts-user-lookup-delete')
@@ -0,0 +1,34 @@
+# Generated by Django 3.2.7 on 2026-10-18 17:28
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def create_user_last_login_index(apps, schema_editor):
+    """auth_user 不属于本应用，不能通过 Meta.indexes 声明，这里直接建索引"""
+    if schema_editor.connection.vendor == 'postgresql':
+        # 与 RecentUserKeysetPagination 的 ORDER BY last_login DESC NULLS LAST, id DESC 一致
+        columns = 'last_login DESC NULLS LAST, id DESC'
+    else:
+        columns = 'last_login, id'
+    schema_editor.execute(f'CREATE INDEX auth_user_last_login_id_idx ON auth_user ({columns})')
+
+
+def drop_user_last_login_index(apps, schema_editor):
+    schema_editor.execute('DROP INDEX auth_user_last_login_id_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0003_post_status'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['-create_time', '-id'], name='posts_create_time_id_idx'),
+        ),
+        migrations.RunPython(create_user_last_login_index, drop_user_last_login_index),
+    ]
@@ -1,8 +1,9 @@
 from django.db import models
 from django.contrib.auth.models import User
-from django.shortcuts import reverse
 from slugify import slugify
 
+from drf_lessions.reverse import cached_reverse
+
 
 class Post(models.Model):
     STATUS_CHOICES = (
@@ -17,6 +18,12 @@ class Post(models.Model):
     create_time = models.DateTimeField(auto_now_add=True)
     update_time = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # 键集分页 PostKeysetPagination 的排序键
+            models.Index(fields=['-create_time', '-id'], name='posts_create_time_id_idx'),
+        ]
+
     def __str__(self):
         return self.title
 
@@ -25,7 +32,7 @@ class Post(models.Model):
         super().save(*args, **kwargs)
 
     def get_absolute_url(self):
-        return reverse('posts:rest-post-detail', kwargs={'pk': self.id})
+        return cached_reverse('posts:rest-post-detail', kwargs={'pk': self.id})
 
 
 class Tag(models.Model):
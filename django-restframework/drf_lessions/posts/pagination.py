@@ -0,0 +1,11 @@
+from drf_lessions.pagination import KeysetPagination
+
+
+class PostKeysetPagination(KeysetPagination):
+    """文章按创建时间倒序翻页，对应索引 posts_create_time_id_idx"""
+    ordering = ('-create_time', '-id')
+
+
+class RecentUserKeysetPagination(KeysetPagination):
+    """用户按最近登录时间倒序翻页，last_login 可以为 NULL，对应索引 auth_user_last_login_id_idx"""
+    ordering = ('-last_login', '-id')
@@ -1,7 +1,11 @@
 from django.contrib.auth.models import User
 from rest_framework import serializers
+from django.db import transaction
 from django.utils import timezone
 from .models import Post, Tag
+from drf_lessions.fields import CachedHyperlinkedIdentityField, CachedHyperlinkedRelatedField
+from drf_lessions.serializers import BatchUniqueListSerializer, BatchUniqueMixin, PartialUpdateMixin, \
+    SparseFieldsetsMixin
 
 
 def isnumeric(value):
@@ -21,7 +25,10 @@ class IsNumeric(object):
         return value
 
 
-class UserSerializer(serializers.Serializer):
+class UserSerializer(PartialUpdateMixin, BatchUniqueMixin, serializers.Serializer):
+    unique_model = User
+    unique_fields = ['username']
+
     id = serializers.IntegerField(read_only=True)
     username = serializers.CharField(label='用户名', required=True)
     password = serializers.CharField(label='密码', write_only=True, validators=[isnumeric])
@@ -40,10 +47,17 @@ class UserSerializer(serializers.Serializer):
     post_set = serializers.HyperlinkedIdentityField(view_name='posts:rest-post-detail', lookup_field='pk', many=True)
 
     # snippets = serializers.HyperlinkedRelatedField(many=True, view_name='snippet-detail', read_only=True)
+
+    class Meta:
+        # many=True 时批量校验用户名唯一性
+        list_serializer_class = BatchUniqueListSerializer
+
     def validate_username(self, value):
-        user = User.objects.filter(username=value).first()
-        if user:
+        conflict = self.unique_conflict('username', value)
+        if conflict == 'exists':
             raise serializers.ValidationError("用户名已存在")
+        if conflict == 'duplicate':
+            raise serializers.ValidationError("用户名在提交的数据中重复")
         return value
 
     def validate_password(self, value):
@@ -60,12 +74,13 @@ class UserSerializer(serializers.Serializer):
         return User.objects.create_user(**validated_data)
 
     def update(self, instance, validated_data):
-        instance.username = validated_data.get('username', instance.username)
-        instance.email = validated_data.get('email', instance.email)
-        instance.set_password(validated_data.get('password', instance.password))
-        instance.save()
-
-        return instance
+        """只写入变化的字段；提交了密码时才重新设置密码（不能把已有的哈希值当作密码再哈希一次）"""
+        changed = self.assign_changed(instance, {name: validated_data[name] for name in ['username', 'email']
+                                                 if name in validated_data})
+        if 'password' in validated_data:
+            instance.set_password(validated_data['password'])
+            changed.append('password')
+        return self.save_changed(instance, changed)
 
     def save(self, **kwargs):
         """
@@ -82,7 +97,7 @@ class AuthorField(serializers.RelatedField):
         return f'{value.username}-{value.email}'
 
 
-from rest_framework.reverse import reverse
+from drf_lessions.reverse import cached_reverse
 
 
 class AuthorHyperlink(serializers.HyperlinkedRelatedField):
@@ -94,7 +109,8 @@ class AuthorHyperlink(serializers.HyperlinkedRelatedField):
         url_kwargs = {
             'pk': obj.pk
         }
-        return reverse(view_name, kwargs=url_kwargs, request=request, format=format)
+        # 缓存编译后的 URL 模板，不必每个对象都遍历一次 URL 解析器
+        return cached_reverse(view_name, kwargs=url_kwargs, request=request, format=format)
 
     def get_object(self, view_name, view_args, view_kwargs):
         lookup_kwargs = {
@@ -103,7 +119,10 @@ class AuthorHyperlink(serializers.HyperlinkedRelatedField):
         return self.get_queryset().get(**lookup_kwargs)
 
 
-class PostSerializer(serializers.ModelSerializer):
+class PostSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
+    """
+    ?fields=id,title 只输出指定字段，没有输出的关系字段不再 JOIN/预加载，也不再调用 reverse()
+    """
     # 1. 默认是将关联模型的 id 序列化
     # author = serializers.PrimaryKeyRelatedField(label='作者', read_only=True)
     # author = serializers.PrimaryKeyRelatedField(label='作者', queryset=User.objects.all())
@@ -150,10 +169,15 @@ class PostSerializer(serializers.ModelSerializer):
     # 序列化方法字段，是一个只读字段
     tag_set = serializers.SerializerMethodField()
 
+    # author 由 AuthorHyperlink 解析，tag_set 由 get_tag_set 读取
+    select_related_fields = ('author',)
+    prefetch_related_fields = ('tag_set',)
+    related_fields = {'author': ('author',), 'tag_set': ('tag_set',)}
+
     def get_tag_set(self, obj):
         """默认为get_< field_name > , obj 为 模型实例"""
         data = []
-        tags = obj.tag_set.all()
+        tags = obj.tag_set.all()  # 使用 all() 才能命中 prefetch_related 的缓存
         for tag in tags:
             data.append(tag.name)
 
@@ -186,10 +210,28 @@ class TagListSerializer(serializers.ListSerializer):
         # Instantiate the parent list serializer.
         return TagListSerializer(*args, **kwargs)
 
+    batch_size = 500
+
     def create(self, validated_data):
-        """自定义多重创建"""
+        """自定义多重创建，一个事务内批量插入"""
         tags = [Tag(**item) for item in validated_data]
-        return Tag.objects.bulk_create(tags)
+        with transaction.atomic():
+            return Tag.objects.bulk_create(tags, batch_size=self.batch_size)
+
+    def update(self, instance, validated_data):
+        """
+        自定义多重更新，instance 为与 validated_data 一一对应的标签列表，
+        只更新提交了的字段，一个事务内批量更新
+        """
+        fields = set()
+        for tag, attrs in zip(instance, validated_data):
+            for attr, value in attrs.items():
+                setattr(tag, attr, value)
+            fields.update(attrs)
+        if fields:
+            with transaction.atomic():
+                Tag.objects.bulk_update(instance, fields, batch_size=self.batch_size)
+        return instance
 
 
 class TagSerializer(serializers.HyperlinkedModelSerializer):
@@ -201,8 +243,11 @@ class TagSerializer(serializers.HyperlinkedModelSerializer):
     """
 
     # 显示设置
-    posts = serializers.HyperlinkedRelatedField(view_name='posts:rest-post-detail', lookup_field='pk', many=True,
-                                                read_only=True)
+    posts = CachedHyperlinkedRelatedField(view_name='posts:rest-post-detail', lookup_field='pk', many=True,
+                                          read_only=True)
+
+    # url 字段同样使用缓存的 URL 模板
+    serializer_url_field = CachedHyperlinkedIdentityField
 
     class Meta:
         model = Tag
@@ -212,8 +257,8 @@ class TagSerializer(serializers.HyperlinkedModelSerializer):
             # 'posts': {'view_name': 'posts:post-detail', 'lookup_field': 'pk'}
         }
 
-        # 自定义 ListSerializer 行为
-        # list_serializer_class = TagListSerializer
+        # 自定义 ListSerializer 行为，many=True 时使用批量创建、更新
+        list_serializer_class = TagListSerializer
 
 
 class TagReadOnlySerializer(serializers.BaseSerializer):
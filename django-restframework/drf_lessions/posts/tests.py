@@ -1,3 +1,598 @@
+import io
+import json
+import os
+import tempfile
+import threading
+import uuid
+from unittest import mock
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.db.models import F
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import exceptions
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.reverse import reverse as drf_reverse
+from rest_framework.test import APIClient, APIRequestFactory
+
+from drf_lessions.parsers import FastJSONParser
+from drf_lessions.renderers import FastJSONRenderer
+from drf_lessions.reverse import cached_reverse
+from drf_lessions.throttling import (FileThrottleStore, MemoryThrottleStore, SlidingWindowRateThrottle,
+                                     TokenBucketRateThrottle, get_throttle_store)
+from .caches import post_cache, user_lookup_cache
+from .models import Post, Tag
+from .serializers import UserSerializer
+from .views import CustomBasicAuthentication, UserDetailRateThrottle
+
+
+class PostQueryCountTest(TestCase):
+    """文章列表、详情的查询次数不随文章、标签数量增长"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author', password='author123')
+        tags = [Tag.objects.create(name=f'tag-{i}') for i in range(3)]
+        for i in range(20):
+            post = Post.objects.create(title=f'post-{i}', content='content', slug=f'post-{i}', author=cls.author)
+            post.tag_set.set(tags)
+
+    def setUp(self):
+        caches['objects'].clear()
+        caches['responses'].clear()
+        self.client = APIClient()
+
+    def test_post_list_query_count(self):
+        # 1. 响应缓存的版本 2. 文章 JOIN 作者 3. 预加载标签
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('posts:rest-post-list'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 20)
+        self.assertEqual(response.data[0]['tag_set'], ['tag-0', 'tag-1', 'tag-2'])
+
+    def test_post_detail_query_count(self):
+        post = Post.objects.first()
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('posts:rest-post-detail', kwargs={'pk': post.pk}))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['tag_set']), 3)
+
+    def test_sparse_fieldset(self):
+        # 1. 响应缓存的版本 2. 文章，不 JOIN 作者，不预加载标签
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('posts:rest-post-list'), {'fields': 'id,title'})
+        self.assertEqual(list(response.data[0]), ['id', 'title'])
+
+
+class TagStreamingListTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user(username='author', password='author123')
+        post = Post.objects.create(title='post', content='content', slug='post', author=author)
+        for i in range(5):
+            Tag.objects.create(name=f'tag-{i}').posts.add(post)
+
+    def test_stream_prefetches_posts(self):
+        # 1. 标签 2. 预加载文章
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('posts:rest-generics-tag-list'), HTTP_ACCEPT='application/json')
+            data = json.loads(b''.join(response.streaming_content))
+        self.assertEqual(len(data), 5)
+        self.assertEqual(len(data[0]['posts']), 1)
+
+
+class KeysetPaginationTest(TestCase):
+    """键集分页遍历的结果与完整排序一致，支持相同排序值与 NULL"""
+
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        for i in range(7):
+            # 每两个用户 last_login 相同，另有一个从未登录
+            last_login = now - timedelta(days=i // 2) if i < 6 else None
+            User.objects.create_user(username=f'user-{i}', password='user12345', last_login=last_login)
+        author = User.objects.first()
+        for i in range(5):
+            Post.objects.create(title=f'post-{i}', content='content', slug=f'post-{i}', author=author)
+        # 制造相同的创建时间
+        Post.objects.update(create_time=now)
+
+    def setUp(self):
+        caches['responses'].clear()
+        self.client = APIClient()
+
+    def walk(self, url):
+        ids, pages = [], []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            pages.append(response.data)
+            ids += [item['id'] for item in response.data['results']]
+            url = response.data['next']
+        return ids, pages
+
+    def test_recent_users(self):
+        url = reverse('posts:rest-modelviewset-user-recent-users') + '?page_size=2'
+        ids, pages = self.walk(url)
+        expected = list(User.objects.order_by(F('last_login').desc(nulls_last=True), '-id')
+                        .values_list('id', flat=True))
+        self.assertEqual(ids, expected)
+        self.assertEqual(len(pages), 4)
+
+        # 从最后一页向前翻页
+        previous_ids = []
+        url = pages[-1]['previous']
+        while url:
+            response = self.client.get(url)
+            previous_ids = [item['id'] for item in response.data['results']] + previous_ids
+            url = response.data['previous']
+        self.assertEqual(previous_ids, expected[:-1])
+
+    def test_posts(self):
+        ids, _ = self.walk(reverse('posts:rest-post-list') + '?page_size=2')
+        self.assertEqual(ids, list(Post.objects.order_by('-create_time', '-id').values_list('id', flat=True)))
+
+    def test_invalid_cursor(self):
+        response = self.client.get(reverse('posts:rest-post-list') + '?page_size=2&cursor=bad')
+        self.assertEqual(response.status_code, 404)
+
+
+class PostObjectCacheTest(TestCase):
+    """文章详情走对象缓存，文章、标签及其关系变化时失效"""
+
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user(username='author', password='author123')
+        cls.post = Post.objects.create(title='post', content='content', slug='post', author=author)
+        cls.tag = Tag.objects.create(name='tag')
+        cls.tag.posts.add(cls.post)
+
+    def setUp(self):
+        caches['objects'].clear()
+        self.url = reverse('posts:rest-post-detail', kwargs={'pk': self.post.pk})
+
+    def get(self):
+        return self.client.get(self.url).data
+
+    def test_cache_hit(self):
+        self.get()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.get()['title'], 'post')
+        self.assertGreaterEqual(post_cache.stats()['hits'], 1)
+
+    def test_invalidate_on_save(self):
+        self.get()
+        self.post.title = 'changed'
+        self.post.save()
+        self.assertEqual(self.get()['title'], 'changed')
+
+    def test_invalidate_on_tag_change(self):
+        self.get()
+        self.tag.name = 'renamed'
+        self.tag.save()
+        self.assertEqual(self.get()['tag_set'], ['renamed'])
+
+        other = Tag.objects.create(name='other')
+        self.post.tag_set.add(other)
+        self.assertEqual(self.get()['tag_set'], ['renamed', 'other'])
+
+        other.posts.clear()
+        self.assertEqual(self.get()['tag_set'], ['renamed'])
+
+        self.tag.delete()
+        self.assertEqual(self.get()['tag_set'], [])
+
+    def test_not_found(self):
+        response = self.client.get(reverse('posts:rest-post-detail', kwargs={'pk': 0}))
+        self.assertEqual(response.status_code, 404)
+
+
+class AsyncPostViewTest(TestCase):
+    """异步视图与同步视图输出一致"""
+
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user(username='author', password='author123')
+        cls.post = Post.objects.create(title='post', content='content', slug='post', author=author)
+        Tag.objects.create(name='tag').posts.add(cls.post)
+
+    def setUp(self):
+        caches['objects'].clear()
+        caches['responses'].clear()
+
+    async def test_list(self):
+        response = await self.async_client.get('/posts/async/rest/posts/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        caches['responses'].clear()
+        expected = await self.async_client.get('/posts/rest/posts/')
+        self.assertEqual(response.content, expected.content)
+
+    async def test_detail(self):
+        url = f'/posts/async/rest/posts/{self.post.pk}/'
+        response = await self.async_client.get(url)
+        self.assertEqual(json.loads(response.content)['tag_set'], ['tag'])
+        # 对象缓存命中时在事件循环中完成，不切换线程
+        with mock.patch('drf_lessions.async_views.database_sync_to_async') as to_thread, \
+                mock.patch('drf_lessions.object_cache.sync_to_async') as object_to_thread:
+            cached = await self.async_client.get(url)
+        to_thread.assert_not_called()
+        object_to_thread.assert_not_called()
+        self.assertEqual(cached.content, response.content)
+
+        response = await self.async_client.get('/posts/async/rest/posts/0/')
+        self.assertEqual(response.status_code, 404)
+
+    def test_write_falls_back_to_sync(self):
+        response = self.client.post('/posts/async/rest/posts/', {'title': 'x'}, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('content', response.json())
+
+
+class PostListResponseCacheTest(TestCase):
+    """文章列表的响应缓存与条件请求"""
+
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user(username='author', password='author123')
+        cls.post = Post.objects.create(title='post', content='content', slug='post', author=author)
+
+    def setUp(self):
+        caches['responses'].clear()
+        self.url = reverse('posts:rest-post-list')
+
+    def test_cached_bytes_and_not_modified(self):
+        response = self.client.get(self.url)
+        etag = response['ETag']
+        self.assertTrue(response.has_header('Last-Modified'))
+
+        # 只查询版本，不再序列化
+        with self.assertNumQueries(1):
+            cached = self.client.get(self.url)
+        self.assertEqual(cached.content, response.content)
+        self.assertEqual(cached['ETag'], etag)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+    def test_delete_then_if_modified_since(self):
+        Post.objects.create(title='second', content='content', slug='second', author=self.post.author)
+        response = self.client.get(self.url)
+        self.assertEqual(len(response.json()), 2)
+
+        # 删除不改变最大更新时间，不能按 If-Modified-Since 返回 304
+        self.post.delete()
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 1)
+
+    def test_not_shared_between_users(self):
+        alice = User.objects.create_user(username='alice', password='alice123')
+        bob = User.objects.create_user(username='bob', password='bob123')
+
+        self.client.force_login(alice)
+        html = self.client.get(self.url, HTTP_ACCEPT='text/html')
+        alice_json = self.client.get(self.url, HTTP_ACCEPT='application/json')
+        self.assertIn(b'alice', html.content)
+        self.assertIn('Cookie', alice_json['Vary'])
+
+        self.client.force_login(bob)
+        html = self.client.get(self.url, HTTP_ACCEPT='text/html')
+        self.assertIn(b'bob', html.content)
+        self.assertNotIn(b'alice', html.content)
+        bob_json = self.client.get(self.url, HTTP_ACCEPT='application/json', HTTP_IF_NONE_MATCH=alice_json['ETag'])
+        self.assertEqual(bob_json.status_code, 200)
+        self.assertNotEqual(bob_json['ETag'], alice_json['ETag'])
+
+    def test_etag_changes_with_data(self):
+        etag = self.client.get(self.url)['ETag']
+        self.post.title = 'changed'
+        self.post.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()[0]['title'], 'changed')
+
+        etag = response['ETag']
+        Tag.objects.create(name='tag').posts.add(self.post)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()[0]['tag_set'], ['tag'])
+
+
+class TagBulkTest(TestCase):
+    """标签批量创建、更新、删除"""
+
+    def setUp(self):
+        caches['objects'].clear()
+        self.client = APIClient()
+        self.url = reverse('posts:rest-tag-list')
+
+    def test_bulk_create(self):
+        data = [{'name': f'tag-{i}'} for i in range(1200)]
+        with self.assertNumQueries(5):  # SAVEPOINT、3 批 INSERT、RELEASE SAVEPOINT
+            response = self.client.post(self.url, data, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data, {'created': 1200})
+        self.assertEqual(Tag.objects.count(), 1200)
+
+    def test_bulk_create_errors(self):
+        response = self.client.post(self.url, [{'name': 'ok'}, {}], format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data[0], {})
+        self.assertIn('name', response.data[1])
+        self.assertEqual(Tag.objects.count(), 0)
+
+    def test_bulk_update(self):
+        tags = Tag.objects.bulk_create([Tag(name=f'tag-{i}') for i in range(3)])
+        tags = list(Tag.objects.all())
+        data = [{'id': tag.pk, 'name': f'renamed-{tag.pk}'} for tag in tags]
+        response = self.client.patch(self.url, data, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {'updated': 3})
+        self.assertEqual(sorted(Tag.objects.values_list('name', flat=True)),
+                         sorted(f'renamed-{tag.pk}' for tag in tags))
+
+        response = self.client.patch(self.url, [{'id': tags[0].pk, 'name': 'x'}, {'id': 0, 'name': 'y'}],
+                                     format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data[0], {})
+        self.assertIn('id', response.data[1])
+
+    def test_bulk_delete(self):
+        author = User.objects.create_user(username='author', password='author123')
+        post = Post.objects.create(title='post', content='content', slug='post', author=author)
+        Tag.objects.bulk_create([Tag(name=f'tag-{i}') for i in range(3)])
+        tags = list(Tag.objects.all())
+        tags[0].posts.add(post)
+        detail = reverse('posts:rest-post-detail', kwargs={'pk': post.pk})
+        self.assertEqual(self.client.get(detail).data['tag_set'], ['tag-0'])
+
+        response = self.client.delete(self.url, [tags[0].pk, {'id': tags[1].pk}], format='json')
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(list(Tag.objects.values_list('name', flat=True)), ['tag-2'])
+        self.assertEqual(self.client.get(detail).data['tag_set'], [])
+        self.assertFalse(Tag.posts.through.objects.exists())
+
+    def test_bulk_delete_queries(self):
+        author = User.objects.create_user(username='author', password='author123')
+        post = Post.objects.create(title='post', content='content', slug='post', author=author)
+        for count in (3, 200):
+            Tag.objects.bulk_create([Tag(name=f'tag-{count}-{i}') for i in range(count)])
+            tags = list(Tag.objects.all())
+            post.tag_set.add(*tags)
+            # in_bulk、关联文章、SAVEPOINT、删除关系、删除标签、RELEASE SAVEPOINT，与标签数无关
+            with self.assertNumQueries(6):
+                response = self.client.delete(self.url, [tag.pk for tag in tags], format='json')
+            self.assertEqual(response.status_code, 204)
+            self.assertFalse(Tag.objects.exists())
+            self.assertFalse(Tag.posts.through.objects.exists())
+
+    def test_bulk_invalid_ids(self):
+        tag = Tag.objects.create(name='tag')
+        response = self.client.delete(self.url, [str(tag.pk), 'abc', {'id': [1]}, 1.5, True, None], format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data[0], {})
+        for error in response.data[1:]:
+            self.assertEqual(error, {'id': ['需要整数 id']})
+        self.assertTrue(Tag.objects.filter(pk=tag.pk).exists())
+
+
+class UserPartialUpdateTest(TestCase):
+
+    def test_update(self):
+        user = User.objects.create_user(username='alice', password='secret123', email='a@example.com')
+        password = user.password
+        serializer = UserSerializer(user, data={'email': 'alice@example.com'}, partial=True)
+        serializer.is_valid(raise_exception=True)
+        # UserSerializer.save() 被覆盖为不保存，直接调用 update()
+        with self.assertLogs('drf_lessions.serializers', 'INFO') as logs:
+            serializer.update(user, serializer.validated_data)
+        self.assertIn('wrote 1 columns: email', logs.output[0])
+        user.refresh_from_db()
+        self.assertEqual((user.email, user.password), ('alice@example.com', password))
+
+        with self.assertLogs('drf_lessions.serializers', 'INFO') as logs:
+            serializer.update(user, {'password': 'changed123'})
+        self.assertIn('wrote 1 columns: password', logs.output[0])
+        user.refresh_from_db()
+        self.assertTrue(user.check_password('changed123'))
+
+
+class UserBatchUniqueTest(TestCase):
+    """批量校验用户名唯一性"""
+
+    def test_single_query(self):
+        User.objects.create_user(username='alice', password='123456')
+        data = [{'username': name, 'password': '123456'} for name in ['alice', 'bob', ' bob', 'carol']]
+        serializer = UserSerializer(data=data, many=True)
+        with self.assertNumQueries(1):
+            self.assertFalse(serializer.is_valid())
+        errors = [item.get('username') for item in serializer.errors]
+        self.assertEqual(errors, [['用户名已存在'], None, ['用户名在提交的数据中重复'], None])
+
+
+class CustomBasicAuthenticationTest(TestCase):
+    """X-Username 认证的用户缓存"""
+
+    def setUp(self):
+        user_lookup_cache.clear()
+        self.factory = APIRequestFactory()
+
+    def authenticate(self, username):
+        return CustomBasicAuthentication().authenticate(self.factory.get('/', HTTP_X_USERNAME=username))
+
+    def test_cached_lookup(self):
+        User.objects.create_user(username='alice')
+        self.assertEqual(self.authenticate('alice')[0].username, 'alice')
+        with self.assertNumQueries(0):
+            self.assertEqual(self.authenticate('alice')[0].username, 'alice')
+        self.assertEqual(user_lookup_cache.stats()['hits'], 1)
+
+    def test_negative_cache(self):
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self.authenticate('bob')
+        with self.assertNumQueries(0), self.assertRaises(exceptions.AuthenticationFailed):
+            self.authenticate('bob')
+
+        # 创建同名用户后负缓存失效
+        User.objects.create_user(username='bob')
+        self.assertEqual(self.authenticate('bob')[0].username, 'bob')
+
+    def test_rename_invalidates(self):
+        user = User.objects.create_user(username='alice')
+        self.authenticate('alice')
+        user.username = 'carol'
+        user.save()
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self.authenticate('alice')
+
+
+class SharedStateThrottleTest(TestCase):
+    """固定大小状态的限流"""
+
+    def make_throttle(self, throttle_class, rate, store, now):
+        class Throttle(throttle_class):
+            scope = 'test'
+
+            def get_cache_key(self, request, view):
+                return 'test-key'
+
+            def get_store(self):
+                return store
+
+        Throttle.rate = rate
+        Throttle.timer = lambda self: now[0]
+        return Throttle()
+
+    def test_token_bucket_wait(self):
+        now = [1000.0]
+        throttle = self.make_throttle(TokenBucketRateThrottle, '3/min', MemoryThrottleStore(), now)
+        self.assertEqual([throttle.allow_request(None, None) for _ in range(4)], [True, True, True, False])
+        # 每 20 秒补充一个令牌
+        self.assertAlmostEqual(throttle.wait(), 20)
+        now[0] += 19.9
+        self.assertFalse(throttle.allow_request(None, None))
+        self.assertAlmostEqual(throttle.wait(), 0.1)
+        now[0] += 0.1
+        self.assertTrue(throttle.allow_request(None, None))
+
+    def test_sliding_window_wait(self):
+        now = [600.0]
+        throttle = self.make_throttle(SlidingWindowRateThrottle, '2/min', MemoryThrottleStore(), now)
+        self.assertEqual([throttle.allow_request(None, None) for _ in range(3)], [True, True, False])
+        # 下一个窗口开始时上一窗口权重为 1，还要再等一半窗口
+        self.assertAlmostEqual(throttle.wait(), 90)
+        now[0] += 89
+        self.assertFalse(throttle.allow_request(None, None))
+        now[0] += 1
+        self.assertTrue(throttle.allow_request(None, None))
+
+    def test_file_store_is_shared(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'throttle')
+            now = [1000.0]
+            first = self.make_throttle(TokenBucketRateThrottle, '2/min', FileThrottleStore(path, slots=16), now)
+            second = self.make_throttle(TokenBucketRateThrottle, '2/min', FileThrottleStore(path, slots=16), now)
+            self.assertTrue(first.allow_request(None, None))
+            self.assertTrue(second.allow_request(None, None))
+            self.assertFalse(first.allow_request(None, None))
+            self.assertAlmostEqual(first.wait(), 30)
+
+    async def test_async_file_store_runs_in_thread(self):
+        now = [1000.0]
+        memory = self.make_throttle(TokenBucketRateThrottle, '2/min', MemoryThrottleStore(), now)
+        with mock.patch('drf_lessions.throttling.sync_to_async') as to_thread:
+            self.assertTrue(await memory.aallow_request(None, None))
+        to_thread.assert_not_called()
+
+        with tempfile.TemporaryDirectory() as directory:
+            store = FileThrottleStore(os.path.join(directory, 'throttle'), slots=16)
+            throttle = self.make_throttle(TokenBucketRateThrottle, '2/min', store, now)
+            threads = []
+            update = store.update
+
+            def record_thread(key, func):
+                threads.append(threading.current_thread())
+                return update(key, func)
+
+            # 文件锁不在事件循环的线程中等待
+            with mock.patch.object(store, 'update', side_effect=record_thread):
+                self.assertTrue(await throttle.aallow_request(None, None))
+            self.assertNotEqual(threads, [threading.current_thread()])
+            self.assertEqual(len(threads), 1)
+
+    def test_user_detail_throttle(self):
+        request = Request(APIRequestFactory().get('/'))
+        request.user = User.objects.create_user(username='alice')
+        get_throttle_store().clear()
+        throttle = UserDetailRateThrottle()
+        self.assertTrue(all(throttle.allow_request(request, None) for _ in range(10)))
+        self.assertFalse(throttle.allow_request(request, None))
+        # 10/minute，6 秒补充一个令牌
+        self.assertAlmostEqual(throttle.wait(), 6, places=1)
+
+
+class CachedReverseTest(TestCase):
+    """缓存的 URL 模板与 reverse() 结果一致"""
+
+    def test_matches_reverse(self):
+        request = APIRequestFactory().get('/', secure=True)
+        cases = [
+            ('posts:rest-post-detail', {'pk': 3}, None, None),
+            ('posts:rest-post-detail', {'pk': 3}, request, None),
+            ('booktest_v3:fbv_book_detail_view', {'pk': 12}, request, None),
+            ('snippet-highlight', {'pk': 7}, request, 'html'),
+            ('posts:rest-viewset-user-detail', {'pk': 5}, None, None),
+        ]
+        for viewname, kwargs, req, format in cases:
+            with self.subTest(viewname=viewname):
+                expected = drf_reverse(viewname, kwargs=dict(kwargs), request=req, format=format)
+                for _ in range(2):
+                    self.assertEqual(cached_reverse(viewname, kwargs=dict(kwargs), request=req, format=format),
+                                     expected)
+
+    def test_non_integer_falls_back(self):
+        self.assertEqual(cached_reverse('posts:rest-post-detail', kwargs={'pk': 'abc'}), '/posts/rest/posts/abc/')
+
+    def test_tag_links(self):
+        post = Post.objects.create(title='post', content='content', slug='post',
+                                   author=User.objects.create_user(username='author'))
+        tag = Tag.objects.create(name='tag')
+        tag.posts.add(post)
+        response = APIClient().get(reverse('posts:rest-generics-tag-list'), HTTP_ACCEPT='application/json')
+        data = json.loads(b''.join(response.streaming_content))
+        self.assertEqual(data[0]['posts'], [f'http://testserver/posts/rest/posts/{post.pk}/'])
+        self.assertEqual(post.get_absolute_url(), f'/posts/rest/posts/{post.pk}/')
+
+
+class FastJSONTest(TestCase):
+    """FastJSONRenderer/FastJSONParser 与 DRF 默认的 JSON 渲染器、解析器输出相同"""
+
+    def test_render_same_as_json_renderer(self):
+        data = {
+            'id': 1,
+            'title': '标题\u2028',
+            'price': Decimal('12.50'),
+            'uuid': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+            'create_time': datetime(2021, 9, 1, 12, 30, 15, 123456, tzinfo=dt_timezone.utc),
+            'date': date(2021, 9, 1),
+            'tags': [None, True, 1.5],
+        }
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+        self.assertEqual(FastJSONRenderer().render(data, 'application/json; indent=4'),
+                         JSONRenderer().render(data, 'application/json; indent=4'))
 
-# Create your tests here.
+    def test_parse(self):
+        parser = FastJSONParser()
+        self.assertEqual(parser.parse(io.BytesIO('{"title": "标题", "n": [1, 2.5]}'.encode())),
+                         {'title': '标题', 'n': [1, 2.5]})
+        with self.assertRaises(exceptions.ParseError):
+            parser.parse(io.BytesIO(b'{"title": '))
@@ -10,6 +10,8 @@ urlpatterns = [
 
     path('rest/posts/', views.PostList.as_view(), name='rest-post-list'),
     path('rest/posts/<pk>/', views.PostDetail.as_view(), name='rest-post-detail'),
+    path('async/rest/posts/', views.AsyncPostList.as_view(), name='async-rest-post-list'),
+    path('async/rest/posts/<pk>/', views.AsyncPostDetail.as_view(), name='async-rest-post-detail'),
 
     path('rest/tags/', views.TagList.as_view(), name='rest-tag-list'),
     path('rest/tags/<pk>/', views.TagDetail.as_view(), name='rest-tag-detail'),
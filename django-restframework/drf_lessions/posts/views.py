@@ -113,15 +113,29 @@ from rest_framework import status
 
 from .serializers import PostSerializer
 from .models import Post
+from .pagination import PostKeysetPagination, RecentUserKeysetPagination
+from .caches import post_cache, post_version, tag_version
+from drf_lessions.response_cache import cache_response
 
 
 class PostList(APIView):
     """
     获取所有文章、或创建新文章
+    传递 page_size 参数时按创建时间倒序键集分页，通过 next/previous 中的游标翻页
     """
+    pagination_class = PostKeysetPagination
 
+    @cache_response(post_version, tag_version)
     def get(self, request, format=None):
-        posts = Post.objects.all()
+        # 根据序列化器声明的关联关系预加载，查询次数与文章数量无关；?fields= 没有输出的关系不加载
+        posts = PostSerializer.setup_eager_loading(Post.objects.all(), request)
+
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(posts, request, view=self)
+        if page is not None:
+            serializer = PostSerializer(page, many=True, context={'request': request})
+            return paginator.get_paginated_response(serializer.data)
+
         serializer = PostSerializer(posts, many=True, context={'request': request})
         return Response(serializer.data)
 
@@ -141,12 +155,15 @@ class PostDetail(APIView):
 
     def get_object(self, pk):
         try:
-            return Post.objects.get(pk=pk)
+            return PostSerializer.setup_eager_loading(Post.objects.all()).get(pk=pk)
         except Post.DoesNotExist:
             raise Http404
 
     def get(self, request, pk, format=None):
-        snippet = self.get_object(pk)
+        # 只读请求走对象缓存，写操作仍从数据库读取最新数据
+        snippet = post_cache.get_or_none(pk)
+        if snippet is None:
+            raise Http404
         serializer = PostSerializer(snippet, context={'request': request})
         return Response(serializer.data)
 
@@ -164,17 +181,54 @@ class PostDetail(APIView):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
+# ASGI 下的异步版本，与同步视图挂载在不同的路径上；写操作沿用同步方法，由 AsyncAPIView 放到线程中执行
+from drf_lessions.async_views import AsyncAPIView, database_sync_to_async
+
+
+class AsyncPostList(AsyncAPIView, PostList):
+    """
+    查询、分页与序列化在一次线程切换中完成（Django 3.2 没有异步 ORM）
+    """
+
+    async def get(self, request, format=None):
+        return await database_sync_to_async(super().get)(request, format)
+
+
+class AsyncPostDetail(AsyncAPIView, PostDetail):
+    """
+    对象缓存命中时不切换线程；缓存的文章已预加载作者和标签，序列化不会访问数据库
+    """
+
+    async def get(self, request, pk, format=None):
+        snippet = await post_cache.aget_or_none(pk)
+        if snippet is None:
+            raise Http404
+        serializer = PostSerializer(snippet, context={'request': request})
+        return Response(serializer.data)
+
+
 """------------------------------------------------ 基于 REST framework mixin 组合视图 -------------------------------------------------------"""
 from rest_framework import mixins
 from rest_framework import generics
 
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from .caches import related_post_ids, tags_changed
 from .models import Tag
-from .serializers import TagSerializer
+from .serializers import TagListSerializer, TagSerializer
 
 
 class TagList(mixins.ListModelMixin,
               mixins.CreateModelMixin,
               generics.GenericAPIView):
+    """
+    标签列表，POST、PATCH、DELETE 接收 JSON 数组时批量操作：
+        - POST   [{"name": ...}, ...]               批量创建
+        - PATCH  [{"id": ..., "name": ...}, ...]    批量部分更新
+        - DELETE [id, ...] 或 [{"id": ...}, ...]    批量删除
+    所有写入在一个事务中完成，校验失败时返回与请求一一对应的错误列表
+    """
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
 
@@ -182,8 +236,79 @@ class TagList(mixins.ListModelMixin,
         return self.list(request, *args, **kwargs)
 
     def post(self, request, *args, **kwargs):
+        if isinstance(request.data, list):
+            return self.bulk_create(request)
         return self.create(request, *args, **kwargs)
 
+    def patch(self, request, *args, **kwargs):
+        if not isinstance(request.data, list):
+            return Response({'detail': '需要 JSON 数组'}, status=status.HTTP_400_BAD_REQUEST)
+        return self.bulk_update(request)
+
+    def delete(self, request, *args, **kwargs):
+        if not isinstance(request.data, list):
+            return Response({'detail': '需要 JSON 数组'}, status=status.HTTP_400_BAD_REQUEST)
+        return self.bulk_destroy(request)
+
+    def bulk_create(self, request):
+        serializer = self.get_serializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        tags = serializer.save()  # TagListSerializer.create
+        tags_changed(post_ids=())  # 新标签还没有关联文章
+        return Response({'created': len(tags)}, status=status.HTTP_201_CREATED)
+
+    def get_bulk_instances(self, items):
+        """
+        一次查询取出所有 id 对应的标签，返回 (标签列表, 每一项的错误)
+        id 由主键字段的 to_python() 转换，无法转换的返回错误而不是抛出异常
+        """
+        pk_field = Tag._meta.pk
+        ids = []
+        for item in items:
+            value = item.get('id') if isinstance(item, dict) else item
+            try:
+                pk = None if isinstance(value, bool) else pk_field.to_python(value)
+            except ValidationError:
+                pk = None
+            if isinstance(value, float) and pk != value:
+                # to_python() 会把 1.5 截断为 1
+                pk = None
+            ids.append(pk)
+        valid_ids = [pk for pk in ids if pk is not None]
+        tags = {}
+        for start in range(0, len(valid_ids), TagListSerializer.batch_size):
+            tags.update(self.get_queryset().in_bulk(valid_ids[start:start + TagListSerializer.batch_size]))
+        errors = [{} if pk in tags else {'id': ['需要整数 id' if pk is None else '标签不存在']}
+                  for pk in ids]
+        return [tags.get(pk) for pk in ids], errors
+
+    def bulk_update(self, request):
+        tags, errors = self.get_bulk_instances(request.data)
+        if any(errors):
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+        serializer = self.get_serializer(tags, data=request.data, many=True, partial=True)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()  # TagListSerializer.update
+        tags_changed(related_post_ids([tag.pk for tag in tags]))
+        return Response({'updated': len(tags)})
+
+    def bulk_destroy(self, request):
+        tags, errors = self.get_bulk_instances(request.data)
+        if any(errors):
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+        ids = list({tag.pk for tag in tags})
+        post_ids = related_post_ids(ids)
+        batch_size = TagListSerializer.batch_size
+        with transaction.atomic():
+            for start in range(0, len(ids), batch_size):
+                batch = ids[start:start + batch_size]
+                # QuerySet.delete() 逐个标签发送删除信号（每个标签一次查询），这里直接删除多对多关系和标签，
+                # 查询数只随批数增长；Tag 没有其他关联，不需要级联
+                Tag.posts.through.objects.filter(tag_id__in=batch)._raw_delete(Tag.objects.db)
+                Tag.objects.filter(pk__in=batch)._raw_delete(Tag.objects.db)
+        tags_changed(post_ids)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
 
 class TagDetail(mixins.RetrieveModelMixin,
                 mixins.UpdateModelMixin,
@@ -205,12 +330,13 @@ class TagDetail(mixins.RetrieveModelMixin,
 """------------------------------------------------ 基于 REST framework 通用类视图 -------------------------------------------------------"""
 
 from rest_framework import generics
+from drf_lessions.mixins import StreamingListModelMixin
 from .serializers import TagSerializer
 from .models import Tag
 
 
-class TagGenericsList(generics.ListCreateAPIView):
-    queryset = Tag.objects.all()
+class TagGenericsList(StreamingListModelMixin, generics.ListCreateAPIView):
+    queryset = Tag.objects.prefetch_related('posts')
     serializer_class = TagSerializer
 
 
@@ -320,13 +446,14 @@ class UserModelViewSet(viewsets.ModelViewSet):
 
     @action(detail=False)
     def recent_users(self, request):
-        """获取最近活动的用户 action"""
+        """获取最近活动的用户 action，使用键集分页，翻页深度不影响查询代价"""
         recent_users = User.objects.all().order_by('-last_login')
 
-        page = self.paginate_queryset(recent_users)
+        paginator = RecentUserKeysetPagination()
+        page = paginator.paginate_queryset(recent_users, request, view=self)
         if page is not None:
             serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
+            return paginator.get_paginated_response(serializer.data)
 
         serializer = self.get_serializer(recent_users, many=True)
         return Response(serializer.data)
@@ -340,6 +467,7 @@ class UserModelViewSet(viewsets.ModelViewSet):
 # --------------------------------------- TemplateHTMLRenderer ----------------------------------
 from rest_framework.authentication import BaseAuthentication, TokenAuthentication
 from rest_framework import exceptions
+from .caches import get_user_by_username
 
 
 class CustomBasicAuthentication(BaseAuthentication):
@@ -355,9 +483,9 @@ class CustomBasicAuthentication(BaseAuthentication):
         if not username:
             return None
             # raise exceptions.AuthenticationFailed('No such user')
-        try:
-            user = User.objects.get(username=username)
-        except User.DoesNotExist:
+        # 缓存查询结果，包括不存在的用户名
+        user = get_user_by_username(username)
+        if user is None:
             raise exceptions.AuthenticationFailed('No such user')
 
         return user, None
@@ -393,8 +521,13 @@ class IsOwnerOrReadOnly(permissions.BasePermission):
 from django.utils.decorators import method_decorator
 from django.views.decorators.cache import cache_page
 from django.views.decorators.vary import vary_on_cookie, vary_on_headers
-from rest_framework.throttling import UserRateThrottle
 from django_filters.rest_framework import DjangoFilterBackend
+from drf_lessions.throttling import UserTokenBucketRateThrottle
+
+
+class UserDetailRateThrottle(UserTokenBucketRateThrottle):
+    """令牌桶限流，状态保存在 THROTTLE_STORE 中，多进程部署时使用文件存储共享"""
+    rate = '10/minute'
 
 
 class UserDetailTemplateHTMLRenderer(generics.RetrieveAPIView):
@@ -412,7 +545,7 @@ class UserDetailTemplateHTMLRenderer(generics.RetrieveAPIView):
     # renderer_classes = [TemplateHTMLRenderer]
     renderer_classes = []
 
-    throttle_classes = [UserRateThrottle]
+    throttle_classes = [UserDetailRateThrottle]
 
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['id', 'username']
@@ -1,6 +1,8 @@
 from django.contrib.auth.models import User, Group
 from rest_framework import serializers
 
+from drf_lessions.fields import CachedHyperlinkedIdentityField
+
 
 class UserSerializer(serializers.HyperlinkedModelSerializer):
     class Meta:
@@ -9,6 +11,8 @@ class UserSerializer(serializers.HyperlinkedModelSerializer):
 
 
 class GroupSerializer(serializers.HyperlinkedModelSerializer):
+    serializer_url_field = CachedHyperlinkedIdentityField
+
     class Meta:
         model = Group
         fields = ['url', 'name']
@@ -1,3 +1,18 @@
+from django.contrib.auth.models import Group, User
 from django.test import TestCase
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient, APIRequestFactory
 
-# Create your tests here.
+from .serializers import GroupSerializer
+
+
+class CompiledGroupListTest(TestCase):
+
+    def test_byte_identical(self):
+        Group.objects.bulk_create([Group(name=f'group-{i}') for i in range(3)])
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user(username='alice'))
+        response = client.get('/quickstart/groups/', HTTP_ACCEPT='application/json')
+        request = APIRequestFactory().get('/quickstart/groups/')
+        expected = GroupSerializer(Group.objects.all(), many=True, context={'request': request}).data
+        self.assertEqual(response.content, JSONRenderer().render(expected))
@@ -1,21 +1,24 @@
 from django.contrib.auth.models import User, Group
 from rest_framework import viewsets
 from rest_framework import permissions
+from drf_lessions.mixins import CompiledListModelMixin, StreamingListModelMixin
 from .serializers import UserSerializer, GroupSerializer
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(StreamingListModelMixin, viewsets.ModelViewSet):
     """
     API endpoint that allows users to be viewed or edited.
+    The list is streamed row by row, see `StreamingListModelMixin`.
     """
-    queryset = User.objects.all().order_by('-date_joined')
+    queryset = User.objects.all().order_by('-date_joined').prefetch_related('groups')
     serializer_class = UserSerializer
     permission_classes = [permissions.IsAuthenticated]
 
 
-class GroupViewSet(viewsets.ModelViewSet):
+class GroupViewSet(CompiledListModelMixin, viewsets.ModelViewSet):
     """
     API endpoint that allows groups to be viewed or edited.
+    The list is built from `values_list()` rows, see `CompiledListModelMixin`.
     """
     queryset = Group.objects.all()
     serializer_class = GroupSerializer
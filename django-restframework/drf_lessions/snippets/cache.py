@@ -0,0 +1,224 @@
+"""
+Content-addressed cache for rendered snippet HTML.
+
+Entries are keyed by a hash of the inputs of `render_highlight()`, so
+re-saves and duplicate snippets reuse the HTML instead of re-lexing.
+It has a byte-bounded in-memory LRU tier and an optional file-backed
+tier, configured with the `SNIPPETS_HIGHLIGHT_CACHE` setting:
+
+    SNIPPETS_HIGHLIGHT_CACHE = {
+        'MAX_BYTES': 16 * 1024 * 1024,    # in-memory tier
+        'DIR': None,                      # directory of the file tier
+        'DIR_MAX_BYTES': 256 * 1024 * 1024,
+    }
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.signals import setting_changed
+
+DEFAULTS = {
+    'MAX_BYTES': 16 * 1024 * 1024,
+    'DIR': None,
+    'DIR_MAX_BYTES': 256 * 1024 * 1024,
+}
+
+
+def highlight_key(options):
+    """
+    Hash the arguments of `render_highlight()`.
+    """
+    payload = json.dumps(list(options), ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class MemoryTier:
+    """
+    LRU mapping bounded by the total size of the stored values in bytes.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def set(self, key, value, size):
+        if size > self.max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.size -= old[1]
+        self._entries[key] = (value, size)
+        self.size += size
+        while self.size > self.max_bytes:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self.size -= evicted
+
+    def clear(self):
+        self._entries.clear()
+        self.size = 0
+
+
+class FileTier:
+    """
+    One file per entry, evicted by least recent access (mtime) once the
+    directory grows past `max_bytes`.
+    """
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.size = None  # computed lazily with a directory scan
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key + '.html')
+
+    def _files(self):
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                if name.endswith('.html'):
+                    yield os.path.join(root, name)
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.utime(path)
+        except OSError:
+            return None
+        return data.decode('utf-8')
+
+    def set(self, key, data):
+        if len(data) > self.max_bytes:
+            return
+        if self.size is None:
+            self.size = sum(os.path.getsize(path) for path in self._files())
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temporary file first so readers never see partial HTML.
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        try:
+            self.size -= os.path.getsize(path)
+        except OSError:
+            pass
+        os.replace(tmp, path)
+        self.size += len(data)
+        if self.size > self.max_bytes:
+            self._evict()
+
+    def _evict(self):
+        entries = []
+        for path in self._files():
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+        self.size = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if self.size <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            self.size -= size
+
+    def clear(self):
+        for path in list(self._files()):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        self.size = 0
+
+
+class HighlightCache:
+    def __init__(self, max_bytes=DEFAULTS['MAX_BYTES'], directory=None,
+                 dir_max_bytes=DEFAULTS['DIR_MAX_BYTES']):
+        self.memory = MemoryTier(max_bytes)
+        self.files = FileTier(directory, dir_max_bytes) if directory else None
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            html = self.memory.get(key)
+            if html is None and self.files is not None:
+                html = self.files.get(key)
+                if html is not None:
+                    self.memory.set(key, html, len(html.encode('utf-8')))
+            if html is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return html
+
+    def set(self, key, html):
+        data = html.encode('utf-8')
+        with self._lock:
+            self.memory.set(key, html, len(data))
+            if self.files is not None:
+                self.files.set(key, data)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'memory_bytes': self.memory.size,
+                'memory_entries': len(self.memory),
+            }
+
+    def clear(self):
+        with self._lock:
+            self.memory.clear()
+            if self.files is not None:
+                self.files.clear()
+            self.hits = self.misses = 0
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_highlight_cache():
+    """
+    Return the process-wide cache configured in the settings.
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            options = dict(DEFAULTS, **getattr(settings, 'SNIPPETS_HIGHLIGHT_CACHE', {}))
+            _cache = HighlightCache(options['MAX_BYTES'], options['DIR'], options['DIR_MAX_BYTES'])
+        return _cache
+
+
+def reset_highlight_cache(*, setting, **kwargs):
+    global _cache
+    if setting == 'SNIPPETS_HIGHLIGHT_CACHE':
+        with _cache_lock:
+            _cache = None
+
+
+setting_changed.connect(reset_highlight_cache)
@@ -0,0 +1,88 @@
+"""
+Lazily computed language and style choices.
+
+`get_all_lexers()` and `get_all_styles()` walk every pygments plugin entry
+point (importing the plugins themselves), which is slow enough to show
+up in every `manage.py` run. The choices are only computed the first
+time they are iterated, and are read from a JSON snapshot when one has
+been generated for the installed pygments version:
+
+    python manage.py snapshot_choices
+"""
+import json
+import threading
+from collections.abc import Sequence
+from pathlib import Path
+
+SNAPSHOT_PATH = Path(__file__).resolve().parent / 'choices_snapshot.json'
+
+
+def compute_choices():
+    from pygments.lexers import get_all_lexers
+    from pygments.styles import get_all_styles
+
+    lexers = [item for item in get_all_lexers() if item[1]]
+    return {
+        'languages': sorted([(item[1][0], item[0]) for item in lexers]),
+        'styles': sorted([(item, item) for item in get_all_styles()]),
+    }
+
+
+def write_snapshot(path=SNAPSHOT_PATH):
+    from pygments import __version__
+
+    choices = compute_choices()
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(dict(choices, pygments=__version__), f, ensure_ascii=False)
+    return choices
+
+
+def read_snapshot(path=SNAPSHOT_PATH):
+    """
+    Return the snapshot, or `None` if it is missing or was generated
+    for another pygments version.
+    """
+    from pygments import __version__
+
+    try:
+        with open(path, encoding='utf-8') as f:
+            snapshot = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if snapshot.get('pygments') != __version__:
+        return None
+    return {key: [tuple(choice) for choice in snapshot[key]] for key in ('languages', 'styles')}
+
+
+_choices = None
+_choices_lock = threading.Lock()
+
+
+def get_choices():
+    global _choices
+    with _choices_lock:
+        if _choices is None:
+            _choices = read_snapshot() or compute_choices()
+        return _choices
+
+
+class LazyChoices(Sequence):
+    """
+    Sequence of `(value, label)` pairs loaded on first access, usable as
+    the `choices` of a model field.
+    """
+
+    def __init__(self, key):
+        self.key = key
+
+    def __getitem__(self, index):
+        return get_choices()[self.key][index]
+
+    def __len__(self):
+        return len(get_choices()[self.key])
+
+    def __iter__(self):
+        return iter(get_choices()[self.key])
+
+    def __repr__(self):
+        return '<LazyChoices: %s>' % self.key
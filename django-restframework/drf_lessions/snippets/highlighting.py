@@ -0,0 +1,200 @@
+"""
+Pluggable executors used to render the highlighted HTML of a snippet.
+
+The executor is selected with the `SNIPPETS_HIGHLIGHT_EXECUTOR` setting:
+
+    - 'inline'  render in the calling (request) thread, like before
+    - 'thread'  in-process queue served by a thread pool (default)
+    - 'process' process pool, for CPU-bound lexing of large pastes
+
+or the dotted path of a `BaseHighlightExecutor` subclass.
+"""
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.utils.module_loading import import_string
+from pygments import highlight
+from pygments.formatters.html import HtmlFormatter
+from pygments.lexers import get_lexer_by_name
+
+
+def render_highlight(code, language, style, linenos, title, full=False):
+    """
+    Use the `pygments` library to create a highlighted HTML
+    representation of the code snippet.
+
+    By default only the `<div class="highlight">` fragment is rendered
+    and the stylesheet is served once per style by `style_css()`;
+    `full=True` renders a standalone document with the inline stylesheet.
+
+    Only takes plain values so it can be shipped to a worker process.
+    """
+    lexer = get_lexer_by_name(language)
+    linenos = 'table' if linenos else False
+    options = {'title': title} if title and full else {}
+    formatter = HtmlFormatter(style=style, linenos=linenos,
+                              full=full, **options)
+    return highlight(code, lexer, formatter)
+
+
+@lru_cache(maxsize=None)
+def style_css(style):
+    """
+    Stylesheet for fragments rendered with `style`.
+    """
+    return HtmlFormatter(style=style).get_style_defs('.highlight')
+
+
+def is_full_document(html):
+    return html.startswith('<!DOCTYPE')
+
+
+def full_highlight_enabled():
+    """
+    `SNIPPETS_HIGHLIGHT_STORAGE = 'full'` stores complete documents, like
+    before; the default 'fragment' only stores the highlighted markup.
+    """
+    return getattr(settings, 'SNIPPETS_HIGHLIGHT_STORAGE', 'fragment') == 'full'
+
+
+class BaseHighlightExecutor:
+    """
+    Run `fn(*args)` and hand the outcome to `callback(result, error)`.
+    """
+    # Synchronous executors finish the job before `submit()` returns.
+    synchronous = False
+
+    def submit(self, fn, args, callback):
+        raise NotImplementedError('`submit()` must be implemented.')
+
+    def wait(self, timeout=None):
+        """
+        Block until every submitted job has run its callback.
+        Returns `False` if the timeout expired first.
+        """
+        return True
+
+    def shutdown(self):
+        pass
+
+
+class InlineHighlightExecutor(BaseHighlightExecutor):
+    synchronous = True
+
+    def submit(self, fn, args, callback):
+        try:
+            result = fn(*args)
+        except Exception as exc:
+            callback(None, exc)
+        else:
+            callback(result, None)
+
+
+class PoolHighlightExecutor(BaseHighlightExecutor):
+    """
+    Queue jobs on a `concurrent.futures` pool.
+
+    The pool is created on first use, so web servers that fork their
+    workers after importing the project get one pool per worker.
+    """
+    pool_class = None
+
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers
+        self._pool = None
+        self._lock = threading.Lock()
+        self._pending = set()
+
+    @property
+    def pool(self):
+        with self._lock:
+            if self._pool is None:
+                self._pool = self.pool_class(max_workers=self.max_workers)
+            return self._pool
+
+    def submit(self, fn, args, callback):
+        # `done` only resolves after the callback ran, so `wait()` also
+        # covers the database write that follows the rendering.
+        done = Future()
+        with self._lock:
+            self._pending.add(done)
+        done.add_done_callback(self._discard)
+
+        def finish(future):
+            try:
+                error = future.exception()
+                callback(None if error else future.result(), error)
+            finally:
+                done.set_result(None)
+
+        try:
+            future = self.pool.submit(fn, *args)
+        except Exception as exc:
+            future = Future()
+            future.set_exception(exc)
+        future.add_done_callback(finish)
+
+    def _discard(self, future):
+        with self._lock:
+            self._pending.discard(future)
+
+    def wait(self, timeout=None):
+        with self._lock:
+            pending = list(self._pending)
+        _, not_done = wait(pending, timeout=timeout)
+        return not not_done
+
+    def shutdown(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
+
+
+class ThreadPoolHighlightExecutor(PoolHighlightExecutor):
+    pool_class = ThreadPoolExecutor
+
+
+class ProcessPoolHighlightExecutor(PoolHighlightExecutor):
+    pool_class = ProcessPoolExecutor
+
+
+EXECUTORS = {
+    'inline': InlineHighlightExecutor,
+    'thread': ThreadPoolHighlightExecutor,
+    'process': ProcessPoolHighlightExecutor,
+}
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_highlight_executor():
+    """
+    Return the process-wide executor configured in the settings.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            name = getattr(settings, 'SNIPPETS_HIGHLIGHT_EXECUTOR', 'thread')
+            executor_class = EXECUTORS.get(name) or import_string(name)
+            if issubclass(executor_class, PoolHighlightExecutor):
+                _executor = executor_class(getattr(settings, 'SNIPPETS_HIGHLIGHT_WORKERS', None))
+            else:
+                _executor = executor_class()
+        return _executor
+
+
+def reset_highlight_executor(*, setting, **kwargs):
+    global _executor
+    if setting in ('SNIPPETS_HIGHLIGHT_EXECUTOR', 'SNIPPETS_HIGHLIGHT_WORKERS'):
+        with _executor_lock:
+            executor, _executor = _executor, None
+        if executor is not None:
+            executor.shutdown()
+
+
+setting_changed.connect(reset_highlight_executor)
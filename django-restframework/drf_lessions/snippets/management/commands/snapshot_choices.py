@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from snippets.choices import SNAPSHOT_PATH, write_snapshot
+
+
+class Command(BaseCommand):
+    help = 'Precompute the snippet language/style choices into a JSON snapshot.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default=str(SNAPSHOT_PATH),
+                            help='Path of the snapshot file.')
+
+    def handle(self, *args, **options):
+        choices = write_snapshot(options['output'])
+        self.stdout.write(self.style.SUCCESS(
+            'Wrote %d languages and %d styles to %s' % (
+                len(choices['languages']), len(choices['styles']), options['output'])))
@@ -0,0 +1,23 @@
+from django.db import migrations, models
+
+
+def mark_existing_ready(apps, schema_editor):
+    """Rows saved before this migration were highlighted inline."""
+    Snippet = apps.get_model('snippets', 'Snippet')
+    Snippet.objects.update(highlight_status='ready')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('snippets', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='snippet',
+            name='highlight_status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('ready', 'Ready'), ('failed', 'Failed')], default='pending', max_length=10),
+        ),
+        migrations.RunPython(mark_existing_ready, migrations.RunPython.noop),
+    ]
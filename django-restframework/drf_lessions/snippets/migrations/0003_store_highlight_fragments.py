@@ -0,0 +1,52 @@
+from django.db import migrations
+from pygments import highlight
+from pygments.formatters.html import HtmlFormatter
+from pygments.lexers import get_lexer_by_name
+
+BATCH_SIZE = 500
+
+
+def render(snippet, full):
+    lexer = get_lexer_by_name(snippet.language)
+    linenos = 'table' if snippet.linenos else False
+    options = {'title': snippet.title} if snippet.title and full else {}
+    formatter = HtmlFormatter(style=snippet.style, linenos=linenos, full=full, **options)
+    return highlight(snippet.code, lexer, formatter)
+
+
+def rewrite(apps, full):
+    Snippet = apps.get_model('snippets', 'Snippet')
+    # 只处理需要转换的行，分批更新，避免一次性加载整张表
+    queryset = Snippet.objects.only('id', 'code', 'language', 'style', 'linenos', 'title')
+    if full:
+        queryset = queryset.exclude(highlighted__startswith='<!DOCTYPE')
+    else:
+        queryset = queryset.filter(highlighted__startswith='<!DOCTYPE')
+    batch = []
+    for snippet in queryset.iterator(chunk_size=BATCH_SIZE):
+        snippet.highlighted = render(snippet, full)
+        batch.append(snippet)
+        if len(batch) >= BATCH_SIZE:
+            Snippet.objects.bulk_update(batch, ['highlighted'])
+            batch = []
+    if batch:
+        Snippet.objects.bulk_update(batch, ['highlighted'])
+
+
+def to_fragments(apps, schema_editor):
+    rewrite(apps, full=False)
+
+
+def to_documents(apps, schema_editor):
+    rewrite(apps, full=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('snippets', '0002_snippet_highlight_status'),
+    ]
+
+    operations = [
+        migrations.RunPython(to_fragments, to_documents),
+    ]
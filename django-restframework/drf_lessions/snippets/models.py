@@ -1,17 +1,29 @@
-from django.db import models
-from pygments.lexers import get_all_lexers
-from pygments.styles import get_all_styles
+from functools import partial
 
-from pygments.lexers import get_lexer_by_name
-from pygments.formatters.html import HtmlFormatter
-from pygments import highlight
+from django.db import close_old_connections, models, transaction
 
-LEXERS = [item for item in get_all_lexers() if item[1]]
-LANGUAGE_CHOICES = sorted([(item[1][0], item[0]) for item in LEXERS])
-STYLE_CHOICES = sorted([(item, item) for item in get_all_styles()])
+from snippets.cache import get_highlight_cache, highlight_key
+from snippets.choices import LazyChoices
+from snippets.highlighting import full_highlight_enabled, get_highlight_executor, render_highlight
+
+# Computed on first use, see `snippets.choices`.
+LANGUAGE_CHOICES = LazyChoices('languages')
+STYLE_CHOICES = LazyChoices('styles')
+
+# Fields that make up the input of `render_highlight()`, in order.
+HIGHLIGHT_FIELDS = ('code', 'language', 'style', 'linenos', 'title')
 
 
 class Snippet(models.Model):
+    HIGHLIGHT_PENDING = 'pending'
+    HIGHLIGHT_READY = 'ready'
+    HIGHLIGHT_FAILED = 'failed'
+    HIGHLIGHT_STATUS_CHOICES = (
+        (HIGHLIGHT_PENDING, 'Pending'),
+        (HIGHLIGHT_READY, 'Ready'),
+        (HIGHLIGHT_FAILED, 'Failed'),
+    )
+
     created = models.DateTimeField(auto_now_add=True)
     title = models.CharField(max_length=100, blank=True, default='')
     code = models.TextField()
@@ -20,19 +32,79 @@ class Snippet(models.Model):
     style = models.CharField(choices=STYLE_CHOICES, default='friendly', max_length=100)
     owner = models.ForeignKey('auth.User', related_name='snippets', on_delete=models.CASCADE)
     highlighted = models.TextField()
+    highlight_status = models.CharField(choices=HIGHLIGHT_STATUS_CHOICES, default=HIGHLIGHT_PENDING,
+                                        max_length=10)
 
     class Meta:
         ordering = ['created']
 
+    def highlight_options(self):
+        return tuple(getattr(self, name) for name in HIGHLIGHT_FIELDS)
+
     def save(self, *args, **kwargs):
         """
         Use the `pygments` library to create a highlighted HTML
         representation of the code snippet.
+
+        With an asynchronous executor the snippet is stored as `pending`
+        and `highlighted` is filled in once the transaction has committed
+        and the background job has finished.
+
+        Rendered HTML is cached by its inputs, so unchanged re-saves and
+        duplicate snippets never re-lex the code.
+
+        `update_fields` that touch a highlight input are extended with the
+        highlight columns; ones that don't skip highlighting entirely.
         """
-        lexer = get_lexer_by_name(self.language)
-        linenos = 'table' if self.linenos else False
-        options = {'title': self.title} if self.title else {}
-        formatter = HtmlFormatter(style=self.style, linenos=linenos,
-                                  full=True, **options)
-        self.highlighted = highlight(self.code, lexer, formatter)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            if not set(update_fields) & set(HIGHLIGHT_FIELDS):
+                super(Snippet, self).save(*args, **kwargs)
+                return
+            kwargs['update_fields'] = set(update_fields) | {'highlighted', 'highlight_status'}
+
+        executor = get_highlight_executor()
+        options = self.highlight_options()
+        render_args = options + (full_highlight_enabled(),)
+        key = highlight_key(render_args)
+        html = get_highlight_cache().get(key)
+        if html is not None:
+            self._set_highlight(key, html, None)
+            super(Snippet, self).save(*args, **kwargs)
+            return
+
+        if executor.synchronous:
+            executor.submit(render_highlight, render_args, partial(self._set_highlight, key))
+            super(Snippet, self).save(*args, **kwargs)
+            return
+
+        self.highlight_status = self.HIGHLIGHT_PENDING
         super(Snippet, self).save(*args, **kwargs)
+        callback = partial(store_highlight, self.pk, options, key)
+        transaction.on_commit(lambda: executor.submit(render_highlight, render_args, callback))
+
+    def _set_highlight(self, key, html, error):
+        if error is not None:
+            raise error
+        get_highlight_cache().set(key, html)
+        self.highlighted = html
+        self.highlight_status = self.HIGHLIGHT_READY
+
+
+def store_highlight(pk, options, key, html, error):
+    """
+    Write the result of a background job back to the snippet.
+
+    The update is filtered on the rendered inputs, so a job for an older
+    version of the snippet never overwrites a newer one.
+    """
+    close_old_connections()
+    try:
+        if error is None:
+            get_highlight_cache().set(key, html)
+            values = {'highlighted': html, 'highlight_status': Snippet.HIGHLIGHT_READY}
+        else:
+            values = {'highlight_status': Snippet.HIGHLIGHT_FAILED}
+        Snippet.objects.filter(pk=pk, **dict(zip(HIGHLIGHT_FIELDS, options))).update(**values)
+    finally:
+        close_old_connections()
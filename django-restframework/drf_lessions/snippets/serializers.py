@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from drf_lessions.fields import CachedHyperlinkedIdentityField, CachedHyperlinkedRelatedField
 from snippets.models import Snippet, LANGUAGE_CHOICES, STYLE_CHOICES
 
 
@@ -33,12 +34,15 @@ from snippets.models import Snippet, LANGUAGE_CHOICES, STYLE_CHOICES
 class SnippetSerializer(serializers.ModelSerializer):
     # source 参数控制该属性用于填充的字段
     owner = serializers.ReadOnlyField(source='owner.username')
-    highlight = serializers.HyperlinkedIdentityField(view_name='snippet-highlight', format='html')
+    highlight = CachedHyperlinkedIdentityField(view_name='snippet-highlight', format='html')
+    serializer_url_field = CachedHyperlinkedIdentityField
 
     class Meta:
         model = Snippet
         # fields = ['id', 'title', 'code', 'linenos', 'language', 'style', 'owner']
-        fields = ['url', 'id', 'highlight', 'owner', 'title', 'code', 'linenos', 'language', 'style']
+        fields = ['url', 'id', 'highlight', 'highlight_status', 'owner', 'title', 'code', 'linenos', 'language',
+                  'style']
+        read_only_fields = ['highlight_status']
 
 
 from django.contrib.auth.models import User
@@ -47,7 +51,8 @@ from django.contrib.auth.models import User
 class UserSerializer(serializers.ModelSerializer):
     # 因为 'snippets' 是User 模型上的反向关系，默认不会被包含，所以我们需要为它添加一个显式的字段。
     # snippets = serializers.PrimaryKeyRelatedField(many=True, queryset=Snippet.objects.all())
-    snippets = serializers.HyperlinkedRelatedField(many=True, view_name='snippet-detail', read_only=True)
+    snippets = CachedHyperlinkedRelatedField(many=True, view_name='snippet-detail', read_only=True)
+    serializer_url_field = CachedHyperlinkedIdentityField
 
     class Meta:
         model = User
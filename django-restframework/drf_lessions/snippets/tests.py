@@ -1,3 +1,154 @@
-from django.test import TestCase
+import json
+import os
+import tempfile
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.test import TestCase, TransactionTestCase, override_settings
+from rest_framework.test import APIClient
+
+from snippets.cache import HighlightCache, get_highlight_cache
+from snippets.choices import read_snapshot, write_snapshot
+from snippets.highlighting import get_highlight_executor
+from snippets.models import Snippet
+
+
+class SnippetHighlightTest(TransactionTestCase):
+    """
+    Snippets are highlighted by the default background executor.
+    """
+
+    def setUp(self):
+        get_highlight_cache().clear()
+        self.user = User.objects.create_user(username='owner', password='owner123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_create_returns_pending(self):
+        response = self.client.post('/snippets/snippets/', {'code': 'print(1)'}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['highlight_status'], Snippet.HIGHLIGHT_PENDING)
+
+        self.assertTrue(get_highlight_executor().wait(timeout=10))
+        snippet = Snippet.objects.get(pk=response.data['id'])
+        self.assertEqual(snippet.highlight_status, Snippet.HIGHLIGHT_READY)
+
+        self.assertTrue(snippet.highlighted.startswith('<div class="highlight">'))
+
+        response = self.client.get(f'/snippets/snippets/{snippet.pk}/highlight/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'<span', response.content)
+        self.assertIn(b'/snippets/styles/friendly.css', response.content)
+
+    def test_highlight_pending(self):
+        snippet = Snippet.objects.create(code='print(1)', owner=self.user)
+        Snippet.objects.filter(pk=snippet.pk).update(highlight_status=Snippet.HIGHLIGHT_PENDING)
+        response = self.client.get(f'/snippets/snippets/{snippet.pk}/highlight/')
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response['Retry-After'], '1')
+
+    def test_highlight_failed(self):
+        snippet = Snippet.objects.create(code='print(1)', owner=self.user)
+        self.assertTrue(get_highlight_executor().wait(timeout=10))
+        Snippet.objects.filter(pk=snippet.pk).update(highlight_status=Snippet.HIGHLIGHT_FAILED)
+        response = self.client.get(f'/snippets/snippets/{snippet.pk}/highlight/')
+        self.assertEqual(response.status_code, 422)
+        self.assertIn(b'Highlighting failed', response.content)
+
+    def test_stale_job_does_not_overwrite(self):
+        snippet = Snippet.objects.create(code='print(1)', owner=self.user)
+        snippet.code = 'print(2)'
+        snippet.save()
+        self.assertTrue(get_highlight_executor().wait(timeout=10))
+        snippet.refresh_from_db()
+        self.assertIn('2', snippet.highlighted)
+        self.assertNotIn('>1<', snippet.highlighted)
+
+
+@override_settings(SNIPPETS_HIGHLIGHT_EXECUTOR='inline')
+class SnippetInlineHighlightTest(TestCase):
+
+    def setUp(self):
+        get_highlight_cache().clear()
+        self.user = User.objects.create_user(username='owner', password='owner123')
+
+    def test_save_highlights_inline(self):
+        snippet = Snippet.objects.create(code='print(1)', owner=self.user)
+        self.assertEqual(snippet.highlight_status, Snippet.HIGHLIGHT_READY)
+        self.assertIn('<span', snippet.highlighted)
+
+    def test_save_with_update_fields(self):
+        snippet = Snippet.objects.create(code='print(1)', owner=self.user)
+        snippet.code = 'print(2)'
+        snippet.save(update_fields=['code'])
+        snippet.refresh_from_db()
+        self.assertIn('2', snippet.highlighted)
+        self.assertNotIn('>1<', snippet.highlighted)
+
+        snippet.linenos = True
+        snippet.save(update_fields=['linenos'])
+        snippet.refresh_from_db()
+        self.assertIn('linenos', snippet.highlighted)
+
+        # Fields outside the highlight inputs are saved without re-highlighting.
+        other = User.objects.create_user(username='other', password='other123')
+        stats = get_highlight_cache().stats()
+        snippet.owner = other
+        snippet.save(update_fields=['owner'])
+        self.assertEqual(get_highlight_cache().stats(), stats)
+        self.assertEqual(Snippet.objects.get(pk=snippet.pk).owner, other)
+
+    def test_duplicate_snippets_hit_cache(self):
+        first = Snippet.objects.create(code='print(1)', owner=self.user)
+        second = Snippet.objects.create(code='print(1)', owner=self.user)
+        first.save()
+        self.assertEqual(second.highlighted, first.highlighted)
+        self.assertEqual(get_highlight_cache().stats()['hits'], 2)
+        self.assertEqual(get_highlight_cache().stats()['misses'], 1)
+
+    @override_settings(SNIPPETS_HIGHLIGHT_STORAGE='full')
+    def test_full_storage(self):
+        snippet = Snippet.objects.create(code='print(1)', title='demo', owner=self.user)
+        self.assertTrue(snippet.highlighted.startswith('<!DOCTYPE'))
+        self.assertIn('<h2>demo</h2>', snippet.highlighted)
+
+    def test_style_css(self):
+        response = self.client.get('/snippets/styles/friendly.css')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/css; charset=utf-8')
+        self.assertIn('max-age=31536000', response['Cache-Control'])
+        self.assertIn(b'.highlight', response.content)
+        self.assertEqual(self.client.get('/snippets/styles/unknown.css').status_code, 404)
+
+
+class HighlightCacheTest(TestCase):
+
+    def test_lru_eviction_by_bytes(self):
+        cache = HighlightCache(max_bytes=10)
+        cache.set('a', 'aaaa')
+        cache.set('b', 'bbbb')
+        cache.get('a')
+        cache.set('c', 'cccc')
+        self.assertEqual(cache.get('a'), 'aaaa')
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.stats()['memory_bytes'], 8)
+
+    def test_file_tier(self):
+        with tempfile.TemporaryDirectory() as directory:
+            HighlightCache(max_bytes=1024, directory=directory).set('abcd', '<pre>x</pre>')
+            cache = HighlightCache(max_bytes=1024, directory=directory)
+            self.assertEqual(cache.get('abcd'), '<pre>x</pre>')
+            self.assertEqual(cache.stats()['hits'], 1)
+
+
+class ChoicesSnapshotTest(TestCase):
+
+    def test_snapshot_round_trip(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'choices.json')
+            choices = write_snapshot(path)
+            self.assertEqual(read_snapshot(path), choices)
+            self.assertIn(('python', 'Python'), choices['languages'])
+
+            with open(path, 'w') as f:
+                json.dump({'pygments': '0.0', 'languages': [], 'styles': []}, f)
+            self.assertIsNone(read_snapshot(path))
@@ -59,4 +59,5 @@ router.register(r'users', views.UserViewSet)
 # The API URLs are now determined automatically by the router.
 urlpatterns = [
     path('', include(router.urls)),
+    path('styles/<str:style>.css', views.snippet_style_css, name='snippet-style-css'),
 ]
@@ -277,7 +277,7 @@ class UserViewSet(viewsets.ReadOnlyModelViewSet):
 
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework import permissions
+from rest_framework import permissions, status
 
 from snippets.models import Snippet
 from snippets.serializers import SnippetSerializer
@@ -302,7 +302,51 @@ class SnippetViewSet(viewsets.ModelViewSet):
     @action(detail=True, renderer_classes=[renderers.StaticHTMLRenderer])
     def highlight(self, request, *args, **kwargs):
         snippet = self.get_object()
-        return Response(snippet.highlighted)
+        if snippet.highlight_status == Snippet.HIGHLIGHT_PENDING:
+            # The background job has not finished yet, ask the client to come back.
+            return Response('Highlighting in progress.', status=status.HTTP_202_ACCEPTED,
+                            headers={'Retry-After': '1'})
+        if snippet.highlight_status == Snippet.HIGHLIGHT_FAILED:
+            # The stored code could not be highlighted; saving the snippet again retries.
+            return Response('Highlighting failed for this snippet, update its code or language to retry.',
+                            status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+        if is_full_document(snippet.highlighted):
+            return Response(snippet.highlighted)
+        # Only the fragment is stored, link the shared stylesheet of its style.
+        return Response(render_to_string('snippets/highlight.html', {
+            'snippet': snippet,
+            'stylesheet_url': stylesheet_url(snippet.style),
+        }))
 
     def perform_create(self, serializer):
         serializer.save(owner=self.request.user)
+
+
+from django.http import Http404, HttpResponse
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import require_safe
+from pygments import __version__ as pygments_version
+
+from snippets.highlighting import is_full_document, style_css
+from snippets.models import STYLE_CHOICES
+
+
+def stylesheet_url(style):
+    """
+    The pygments version busts the long-lived cache when styles change.
+    """
+    return '%s?v=%s' % (reverse('snippet-style-css', kwargs={'style': style}), pygments_version)
+
+
+@require_safe
+def snippet_style_css(request, style):
+    """
+    Stylesheet shared by every highlighted fragment using `style`.
+    """
+    if style not in dict(STYLE_CHOICES):
+        raise Http404
+    response = HttpResponse(style_css(style), content_type='text/css; charset=utf-8')
+    patch_cache_control(response, public=True, max_age=365 * 24 * 60 * 60, immutable=True)
+    return response